@@ -0,0 +1,83 @@
+"""
+Dual Redis 브로커 pop 경로 왕복(RTT) 수 측정
+
+- consumer 브로커의 get_io_stats()로 소비한 프레임당 Redis 왕복 수(rtt_per_frame)를 출력
+- backlog: 미리 쌓인 프레임을 연속으로 pop (prefetch 효과)
+- paced: producer 스레드가 --fps로 보내는 동안 pop (프레임마다 BLPOP/XREADGROUP 대기)
+- small: inline_threshold 이하 (Control 메시지에 inline), large: blob 경로
+
+Usage:
+    redis-server --port 6379 --daemonize yes
+    redis-server --port 6380 --daemonize yes   # 없으면 Control Redis로 fallback
+    PYTHONPATH=. python benchmarks/bench_dual_redis_rtt.py [--frames 200 --fps 200]
+"""
+import argparse
+import threading
+import time
+
+from edgeflow.comms import DualRedisBroker, DualRedisListBroker, Frame
+
+TOPIC = "bench_dual_rtt"
+
+
+def make_buffers(frame_id, size):
+    frame = Frame(frame_id=frame_id, timestamp=time.time(), meta={}, data=b"x" * size)
+    return frame.to_buffers()
+
+
+def produce(broker, frames, size, fps):
+    interval = 1.0 / fps if fps else 0
+    for i in range(frames):
+        broker.push_buffers(TOPIC, make_buffers(i, size))
+        if interval:
+            time.sleep(interval)
+
+
+def run_case(cls, kwargs, frames, size, fps):
+    producer = cls(**kwargs)
+    consumer = cls(**kwargs)
+    producer.trim(TOPIC, frames)
+    consumer.pop(TOPIC, timeout=0.01)  # consumer group 생성 (stream)
+    base = consumer.get_io_stats()
+
+    if fps:
+        thread = threading.Thread(target=produce, args=(producer, frames, size, fps))
+        thread.start()
+    else:
+        produce(producer, frames, size, 0)
+        thread = None
+
+    received = 0
+    while received < frames:
+        if consumer.pop(TOPIC, timeout=1) is None:
+            break
+        received += 1
+    if thread:
+        thread.join()
+
+    stats = consumer.get_io_stats()
+    round_trips = stats["round_trips"] - base["round_trips"]
+    return received, round_trips / received if received else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--fps", type=int, default=200)
+    parser.add_argument("--ctrl-port", type=int, default=6379)
+    parser.add_argument("--data-port", type=int, default=6380)
+    args = parser.parse_args()
+
+    kwargs = {"ctrl_port": args.ctrl_port, "data_port": args.data_port}
+    print(f"{'broker':<22} {'payload':<8} {'mode':<8} {'received':>9} {'rtt/frame':>10}")
+    for cls in (DualRedisListBroker, DualRedisBroker):
+        cls(**kwargs).reset()
+        for payload, size in (("small", 1024), ("large", 256 * 1024)):
+            for mode, fps in (("backlog", 0), ("paced", args.fps)):
+                received, rtt = run_case(cls, kwargs, args.frames, size, fps)
+                print(f"{cls.__name__:<22} {payload:<8} {mode:<8} {received:>9} {rtt:>10.2f}")
+        cls(**kwargs).reset()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+REALTIME(pop_latest) 종단 지연(staleness) 측정 - 처리가 느린 consumer
+
+- producer 스레드가 --fps로 프레임을 보내고, consumer는 프레임마다 --work-ms만큼 처리(sleep)
+- staleness: consumer가 프레임을 받은 시각 - 프레임 timestamp (처리 시간은 제외)
+- --replicas > 1: 같은 consumer group의 replica 여러 개 (중복 수신 여부도 출력)
+
+Usage:
+    redis-server --port 6379 --daemonize yes
+    redis-server --port 6380 --daemonize yes   # 없으면 Control Redis로 fallback
+    PYTHONPATH=. python benchmarks/bench_realtime_staleness.py [--seconds 3 --fps 100 --work-ms 30]
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from edgeflow.comms import DualRedisBroker, Frame, RedisBroker
+
+TOPIC = "bench_realtime_staleness"
+
+
+def produce(broker, fps, stop):
+    interval = 1.0 / fps
+    frame_id = 0
+    while not stop.is_set():
+        frame = Frame(frame_id=frame_id, timestamp=time.time(), meta={}, data=b"x" * 1024)
+        broker.push_buffers(TOPIC, frame.to_buffers())
+        frame_id += 1
+        time.sleep(interval)
+
+
+def consume(broker, name, work, stop, received):
+    while not stop.is_set():
+        packet = broker.pop_latest(TOPIC, timeout=0.1, group="bench", consumer=name)
+        frame = Frame.from_bytes(packet) if packet else None
+        if not frame:
+            continue
+        received.append((frame.frame_id, time.time() - frame.timestamp))
+        time.sleep(work)
+
+
+def run_case(cls, args):
+    kwargs = {"ctrl_port": args.ctrl_port, "data_port": args.data_port} if cls is DualRedisBroker else {"port": args.ctrl_port}
+    producer = cls(**kwargs)
+    producer.trim(TOPIC, 100)
+    consumers = [cls(**kwargs) for _ in range(args.replicas)]
+    for i, consumer in enumerate(consumers):
+        consumer.pop_latest(TOPIC, timeout=0.01, group="bench", consumer=f"r{i}")  # consumer group 생성
+
+    stop = threading.Event()
+    received = []
+    threads = [threading.Thread(target=produce, args=(producer, args.fps, stop))]
+    threads += [threading.Thread(target=consume, args=(c, f"r{i}", args.work_ms / 1000, stop, received))
+                for i, c in enumerate(consumers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    # 워밍업(첫 0.5초) 제외
+    stale = [age * 1000 for _, age in received[len(received) // 6:]]
+    ids = [frame_id for frame_id, _ in received]
+    stale.sort()
+    return {
+        "received": len(received),
+        "duplicates": len(ids) - len(set(ids)),
+        "p50": statistics.median(stale) if stale else 0.0,
+        "p99": stale[int(len(stale) * 0.99) - 1] if stale else 0.0,
+        "max": stale[-1] if stale else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--fps", type=int, default=100)
+    parser.add_argument("--work-ms", type=float, default=30)
+    parser.add_argument("--replicas", type=int, default=1)
+    parser.add_argument("--ctrl-port", type=int, default=6379)
+    parser.add_argument("--data-port", type=int, default=6380)
+    args = parser.parse_args()
+
+    print(f"fps={args.fps} work={args.work_ms}ms replicas={args.replicas}")
+    print(f"{'broker':<18} {'received':>9} {'dup':>5} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for cls in (RedisBroker, DualRedisBroker):
+        result = run_case(cls, args)
+        print(f"{cls.__name__:<18} {result['received']:>9} {result['duplicates']:>5} "
+              f"{result['p50']:>9.1f} {result['p99']:>9.1f} {result['max']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
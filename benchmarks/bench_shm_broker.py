@@ -0,0 +1,120 @@
+"""
+SharedMemoryBroker vs RedisListBroker 벤치마크 (1080p, 프로세스 간 전달)
+
+- latency: producer가 --fps로 보내고 consumer가 pop할 때까지 걸린 시간 (p50/p99)
+- throughput: producer가 쉬지 않고 보낼 때 consumer가 받은 프레임 수/초
+- 각 프레임은 Frame.to_buffers()로 직렬화 (jpeg: 약 1MB 노이즈 JPEG, raw: 6.2MB ndarray)
+
+Usage:
+    redis-server --port 6379 --daemonize yes   # RedisListBroker용
+    PYTHONPATH=. python benchmarks/bench_shm_broker.py [--frames 300 --fps 30 --codec raw]
+"""
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+
+from edgeflow.comms import Frame, RedisListBroker, SharedMemoryBroker
+
+TOPIC = "bench_camera"
+
+
+def load_broker(config):
+    module_path, class_name = config['__class_path__'].rsplit('.', 1)
+    import importlib
+    return getattr(importlib.import_module(module_path), class_name).from_config(config)
+
+
+def producer(config, frames, fps, codec, width, height, ready):
+    broker = load_broker(config)
+    img = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    frame = Frame(frame_id=0, timestamp=0.0, meta={"topic": TOPIC}, data=img)
+    frame.to_buffers(codec=codec)  # 인코딩은 측정에서 제외 (캐시)
+    ready.wait()
+
+    interval = 1.0 / fps if fps else 0
+    for i in range(frames):
+        start = time.monotonic()
+        frame.frame_id = i
+        frame.timestamp = start
+        broker.push_buffers(TOPIC, frame.to_buffers(codec=codec))
+        if interval:
+            time.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+
+def consumer(config, frames, results, ready):
+    broker = load_broker(config)
+    broker.pop(TOPIC, timeout=0.01)  # 연결/세그먼트 attach
+    ready.set()
+
+    latencies = []
+    started = None
+    while len(latencies) < frames:
+        packet = broker.pop(TOPIC, timeout=2)
+        if packet is None:
+            break
+        frame = Frame.from_bytes(packet, avoid_decode=True)
+        now = time.monotonic()
+        started = started or now
+        latencies.append(now - frame.timestamp)
+    elapsed = time.monotonic() - started if started else 0
+    results.put((latencies, elapsed))
+
+
+def run_case(broker, frames, fps, codec, width, height):
+    broker.reset()
+    broker.trim(TOPIC, 8)
+    config = broker.to_config()
+
+    ready = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    cons = multiprocessing.Process(target=consumer, args=(config, frames, results, ready))
+    prod = multiprocessing.Process(target=producer, args=(config, frames, fps, codec, width, height, ready))
+    cons.start()
+    prod.start()
+    latencies, elapsed = results.get()
+    prod.join()
+    cons.join()
+
+    if not latencies:
+        return None
+    lat_ms = np.array(latencies) * 1000
+    return {
+        "received": len(latencies),
+        "p50": float(np.percentile(lat_ms, 50)),
+        "p99": float(np.percentile(lat_ms, 99)),
+        "fps": (len(latencies) - 1) / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--codec", default="raw")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--redis-host", default="localhost")
+    parser.add_argument("--redis-port", type=int, default=6379)
+    args = parser.parse_args()
+
+    brokers = (
+        ("shm", SharedMemoryBroker(namespace="edgeflow_bench", slots=4, slot_size=8 * 1024 * 1024)),
+        ("redis-list", RedisListBroker(host=args.redis_host, port=args.redis_port)),
+    )
+
+    print(f"📦 {args.width}x{args.height} codec={args.codec}, {args.frames} frames")
+    print(f"{'broker':<12} {'mode':<12} {'received':>9} {'p50 ms':>9} {'p99 ms':>9} {'fps':>9}")
+    for name, broker in brokers:
+        for mode, fps in ((f"{args.fps}fps", args.fps), ("max", 0)):
+            r = run_case(broker, args.frames, fps, args.codec, args.width, args.height)
+            if r is None:
+                print(f"{name:<12} {mode:<12} {'no frames received':>38}")
+                continue
+            print(f"{name:<12} {mode:<12} {r['received']:>9} {r['p50']:>9.2f} {r['p99']:>9.2f} {r['fps']:>9.1f}")
+        broker.reset()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,3 @@
 #edgeflow/__init__.py
 from .core import System, NodeSpec, EdgeApp, run
-from .qos import QoS
\ No newline at end of file
+from .qos import QoS, MaxLag
\ No newline at end of file
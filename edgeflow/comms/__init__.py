@@ -1,5 +1,6 @@
 #edgeflow/comms/__init__.py
-from .brokers import RedisBroker, DualRedisBroker, RedisListBroker, DualRedisListBroker, BrokerInterface 
+from .brokers import RedisBroker, DualRedisBroker, RedisListBroker, DualRedisListBroker, SharedMemoryBroker, HybridBroker, GrpcBroker, BrokerInterface, AsyncBrokerInterface, AsyncRedisBroker, AsyncRedisListBroker 
 from .frame import Frame
+from .codecs import PayloadCodec, register_codec
 
-__all__ = ["Frame", "RedisBroker", "DualRedisBroker", "RedisListBroker", "DualRedisListBroker", "BrokerInterface"]
\ No newline at end of file
+__all__ = ["Frame", "PayloadCodec", "register_codec", "RedisBroker", "DualRedisBroker", "RedisListBroker", "DualRedisListBroker", "SharedMemoryBroker", "HybridBroker", "GrpcBroker", "BrokerInterface", "AsyncBrokerInterface", "AsyncRedisBroker", "AsyncRedisListBroker"]
\ No newline at end of file
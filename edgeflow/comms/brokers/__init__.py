@@ -3,6 +3,11 @@ from .redis import RedisBroker
 from .dual_redis import DualRedisBroker
 from .redis_list import RedisListBroker
 from .dual_redis_list import DualRedisListBroker
+from .shm import SharedMemoryBroker
+from .hybrid import HybridBroker
+from .grpc import GrpcBroker
+from .aio import AsyncBrokerInterface, ThreadedAsyncBroker
+from .aio_redis import AsyncRedisBroker, AsyncRedisListBroker
 
 # 나중에 RabbitMQBroker 등이 생기면 여기에 추가
 __all__ = [
@@ -10,5 +15,12 @@ __all__ = [
     "RedisBroker", 
     "DualRedisBroker",
     "RedisListBroker",
-    "DualRedisListBroker"
+    "DualRedisListBroker",
+    "SharedMemoryBroker",
+    "HybridBroker",
+    "GrpcBroker",
+    "AsyncBrokerInterface",
+    "ThreadedAsyncBroker",
+    "AsyncRedisBroker",
+    "AsyncRedisListBroker"
 ]
\ No newline at end of file
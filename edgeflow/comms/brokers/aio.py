@@ -0,0 +1,172 @@
+#edgeflow/comms/brokers/aio.py
+"""
+Async Broker Interface (asyncio)
+- 이벤트 루프 안에서 쓰는 브로커 (Gateway, AsyncConsumerNode)
+- 동기 브로커는 BrokerInterface.to_async()로 변환
+  - Redis 계열: redis.asyncio 기반 네이티브 구현 (aio_redis.py)
+  - 그 외: ThreadedAsyncBroker (동기 호출을 스레드로 넘겨 이벤트 루프를 막지 않음)
+"""
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+
+from .base import BATCH_POLL_INTERVAL
+from ..frame import peek_timestamp
+
+
+class AsyncBrokerInterface(ABC):
+    """
+    BrokerInterface의 async 버전 (메서드 의미와 인자는 동일)
+    """
+    skipped_frames = 0  # pop_balanced()가 건너뛴 프레임 수
+
+    @abstractmethod
+    async def push(self, topic: str, data: bytes):
+        """데이터를 브로커에 푸시합니다."""
+        pass
+
+    async def push_buffers(self, topic: str, buffers: List[bytes]):
+        """Scatter-Gather 버퍼 리스트를 푸시합니다 (기본: 합쳐서 push)."""
+        await self.push(topic, b"".join(buffers))
+
+    async def push_many(self, items, limits: Optional[Dict[str, int]] = None):
+        """여러 (topic, data)를 푸시하고 limits(topic -> 큐 크기)를 적용합니다."""
+        for topic, data in items:
+            if isinstance(data, (list, tuple)):
+                await self.push_buffers(topic, data)
+            else:
+                await self.push(topic, data)
+        for topic, size in (limits or {}).items():
+            await self.trim(topic, size)
+
+    @abstractmethod
+    async def pop(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """[QoS: DURABLE] 순서대로 하나를 가져옵니다."""
+        pass
+
+    @abstractmethod
+    async def pop_latest(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """[QoS: REALTIME] 가장 최신의 데이터만 가져옵니다."""
+        pass
+
+    async def pop_balanced(self, topic: str, max_lag, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """[QoS: BALANCED] 순서대로, 밀린 정도가 max_lag를 넘으면 최신으로 (기본: pop + queue_size + pop_latest)"""
+        data = await self.pop(topic, timeout=timeout, **kwargs)
+        if not data:
+            return data
+        backlog = await self.queue_size(topic)
+        if not max_lag.exceeded(backlog + 1, peek_timestamp(data)):
+            return data
+        latest = await self.pop_latest(topic, timeout=0, **kwargs)
+        if not latest:
+            return data
+        self.skipped_frames += max(backlog, 1)
+        return latest
+
+    async def pop_batch(self, topic: str, max_items: int, max_wait_ms: float, timeout: int = 1, **kwargs) -> List[bytes]:
+        """[Micro-batching] 첫 항목 이후 max_wait_ms 안에 도착한 것까지 최대 max_items개"""
+        first = await self.pop(topic, timeout=timeout, **kwargs)
+        if not first:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + max_wait_ms / 1000
+        while len(batch) < max_items:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            item = await self.pop(topic, timeout=min(remaining, BATCH_POLL_INTERVAL), **kwargs)
+            if item:
+                batch.append(item)
+        return batch
+
+    @abstractmethod
+    async def trim(self, topic: str, size: int):
+        """토픽 대기열 크기를 제한합니다."""
+        pass
+
+    @abstractmethod
+    async def queue_size(self, topic: str) -> int:
+        """현재 토픽 대기열의 크기를 반환합니다."""
+        pass
+
+    @abstractmethod
+    async def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """모든 대기열의 상태(current, max)를 반환합니다."""
+        pass
+
+    async def close(self):
+        """연결 정리 (선택적 구현)"""
+        pass
+
+
+class ThreadedAsyncBroker(AsyncBrokerInterface):
+    """
+    동기 브로커 -> async 어댑터
+    - 블로킹 호출(BLPOP, 통계 조회 등)을 asyncio.to_thread로 실행하여 이벤트 루프를 막지 않음
+    - 여러 스레드에서 동시에 호출되므로 thread-safe한 브로커에 사용 (Redis 계열, SharedMemory, gRPC)
+    - serialize=True: thread-safe하지 않은 브로커(ZeroMQ 소켓)용
+      송신(push/trim)과 수신(pop)을 각각 전용 스레드 하나에서만 실행 (송신이 pop 대기에 막히지 않도록 분리)
+    """
+
+    def __init__(self, broker, serialize=False):
+        self.broker = broker
+        self._send_executor = None
+        self._recv_executor = None
+        if serialize:
+            self._send_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="edgeflow-send")
+            self._recv_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="edgeflow-recv")
+
+    @property
+    def skipped_frames(self):
+        return self.broker.skipped_frames
+
+    async def _send(self, func, *args):
+        if self._send_executor is None:
+            return await asyncio.to_thread(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(self._send_executor, func, *args)
+
+    async def _recv(self, func, *args, **kwargs):
+        if self._recv_executor is None:
+            return await asyncio.to_thread(func, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._recv_executor, partial(func, *args, **kwargs))
+
+    async def push(self, topic, data):
+        await self._send(self.broker.push, topic, data)
+
+    async def push_buffers(self, topic, buffers):
+        await self._send(self.broker.push_buffers, topic, buffers)
+
+    async def push_many(self, items, limits=None):
+        await self._send(self.broker.push_many, items, limits)
+
+    async def pop(self, topic, timeout=1, **kwargs):
+        return await self._recv(self.broker.pop, topic, timeout, **kwargs)
+
+    async def pop_latest(self, topic, timeout=1, **kwargs):
+        return await self._recv(self.broker.pop_latest, topic, timeout, **kwargs)
+
+    async def pop_balanced(self, topic, max_lag, timeout=1, **kwargs):
+        return await self._recv(self.broker.pop_balanced, topic, max_lag, timeout, **kwargs)
+
+    async def pop_batch(self, topic, max_items, max_wait_ms, timeout=1, **kwargs):
+        return await self._recv(self.broker.pop_batch, topic, max_items, max_wait_ms, timeout, **kwargs)
+
+    async def trim(self, topic, size):
+        await self._send(self.broker.trim, topic, size)
+
+    async def queue_size(self, topic):
+        return await self._recv(self.broker.queue_size, topic)
+
+    async def get_queue_stats(self):
+        return await asyncio.to_thread(self.broker.get_queue_stats)
+
+    async def close(self):
+        for executor in (self._send_executor, self._recv_executor):
+            if executor is not None:
+                await asyncio.to_thread(executor.shutdown)
+        close = getattr(self.broker, "close", None)
+        if close:
+            await asyncio.to_thread(close)
@@ -0,0 +1,345 @@
+#edgeflow/comms/brokers/aio_redis.py
+"""
+Async Redis Brokers (redis.asyncio)
+- AsyncRedisListBroker: RedisListBroker와 같은 키/포맷 (동기 노드와 섞어서 사용 가능)
+- AsyncRedisBroker: RedisBroker와 같은 Stream/Consumer Group 사용
+- 연결은 redis.asyncio 커넥션 풀이 관리 (끊기면 다음 명령에서 자동 재연결)
+"""
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from .aio import AsyncBrokerInterface
+from .connection import LIMIT_PREFIX, StatsCache, parse_stats, set_limit, stats_command
+from .base import BATCH_POLL_INTERVAL
+from .redis_list import _fanout_groups, _queue_fanout
+from .redis import _BALANCED_SCRIPT, _LATEST_SCRIPT, _lag_args, _latest_fields
+from ..frame import peek_timestamp
+
+_RETRY_DELAY = 1.0  # 연결 실패 시 pop 루프가 바쁘게 돌지 않도록 대기
+
+
+async def _retry_later(error):
+    """연결 오류: 호출 측 pop 루프가 바쁘게 돌며 재연결을 반복하지 않도록 대기"""
+    print(f"⚠️ Redis connection lost in pop: {error}")
+    await asyncio.sleep(_RETRY_DELAY)
+
+
+async def _aclose(r):
+    """redis-py 5: aclose(), 4.x: close()"""
+    await (getattr(r, "aclose", None) or r.close)()
+
+
+async def _stats(r, cache, length_cmd, maxlen):
+    """토픽 registry -> (limit, 길이)를 스크립트 한 번으로 조회 (STATS_TTL 동안 캐시)"""
+    cached = cache.get()
+    if cached is not None:
+        return cached
+    return cache.put(parse_stats(await r.eval(*stats_command(length_cmd)), maxlen))
+
+
+class AsyncRedisListBroker(AsyncBrokerInterface):
+    """Redis List-based async broker (RPUSH/BLPOP)"""
+
+    def __init__(self, host=None, port=None, maxlen=100):
+        self.host = host or os.getenv('REDIS_HOST', 'localhost')
+        self.port = port or int(os.getenv('REDIS_PORT', 6379))
+        self.maxlen = maxlen
+        self._redis = aioredis.Redis(host=self.host, port=self.port, socket_connect_timeout=5)
+        self._topic_limits = {}  # topic -> max size
+        self._stats = StatsCache()
+
+    async def push(self, topic: str, data: bytes):
+        if not data:
+            return
+        await self.push_many([(topic, data)])
+
+    async def push_buffers(self, topic: str, buffers: List[bytes]):
+        await self.push_many([(topic, buffers)])
+
+    async def push_many(self, items, limits=None):
+        """RPUSH + LTRIM for all items in one pipeline (same as RedisListBroker.push_many)"""
+        limits = limits or {}
+        try:
+            for topic, _ in items:
+                if topic not in limits and topic not in self._topic_limits:
+                    limit_bytes = await self._redis.get(f"{LIMIT_PREFIX}{topic}")
+                    if limit_bytes:
+                        self._topic_limits[topic] = int(limit_bytes)
+
+            pipe = self._redis.pipeline()
+            for topic, size in limits.items():
+                if self._topic_limits.get(topic) != size:
+                    set_limit(pipe, topic, size)
+                    self._topic_limits[topic] = size
+            _queue_fanout(pipe, _fanout_groups(items), self._topic_limits, self.maxlen)
+            await pipe.execute()
+        except redis.ConnectionError as e:
+            print(f"⚠️ Redis connection lost in push: {e}")
+        except Exception as e:
+            print(f"Redis Push Error: {e}")
+
+    async def pop(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """BLPOP (FIFO)"""
+        try:
+            result = await self._redis.blpop([topic], timeout=timeout)
+            return result[1] if result else None
+        except redis.ConnectionError as e:
+            await _retry_later(e)
+            return None
+        except Exception as e:
+            print(f"Redis Pop Error: {e}")
+            return None
+
+    async def pop_latest(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """With REALTIME QoS the list size is 1, so BLPOP always gets the latest"""
+        return await self.pop(topic, timeout=timeout)
+
+    async def pop_balanced(self, topic: str, max_lag, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """BLPOP + LLEN, over max_lag -> newest only (same as RedisListBroker.pop_balanced)"""
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.blpop([topic], timeout=timeout)
+            pipe.llen(topic)
+            result, backlog = await pipe.execute()
+            if not result:
+                return None
+            data = result[1]
+            if max_lag.exceeded(backlog + 1, peek_timestamp(data)):
+                pipe = self._redis.pipeline()
+                pipe.llen(topic)
+                pipe.lrange(topic, -1, -1)
+                pipe.delete(topic)
+                queued, newest, _ = await pipe.execute()
+                self.skipped_frames += queued
+                if newest:
+                    data = newest[0]
+            return data
+        except redis.ConnectionError as e:
+            await _retry_later(e)
+            return None
+        except Exception as e:
+            print(f"Redis PopBalanced Error: {e}")
+            return None
+
+    async def pop_batch(self, topic: str, max_items: int, max_wait_ms: float, timeout: int = 1, **kwargs) -> List[bytes]:
+        """
+        BLPOP for the first one, then LRANGE + LTRIM (MULTI), polling until max_wait_ms
+        - 연결 오류: pop()이 대기 후 [] (받아 둔 프레임이 있으면 그대로 반환, 다음 호출에서 대기)
+        """
+        first = await self.pop(topic, timeout=timeout)
+        if not first:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + max_wait_ms / 1000
+        try:
+            while len(batch) < max_items:
+                want = max_items - len(batch)
+                pipe = self._redis.pipeline()
+                pipe.lrange(topic, 0, want - 1)
+                pipe.ltrim(topic, want, -1)
+                items, _ = await pipe.execute()
+                if items:
+                    batch.extend(items)
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(remaining, BATCH_POLL_INTERVAL))
+        except redis.ConnectionError as e:
+            print(f"⚠️ Redis connection lost in pop: {e}")
+        except Exception as e:
+            print(f"Redis PopBatch Error: {e}")
+        return batch
+
+    async def trim(self, topic: str, size: int = 1):
+        self._topic_limits[topic] = size
+        try:
+            pipe = self._redis.pipeline()
+            set_limit(pipe, topic, size)
+            pipe.ltrim(topic, -size, -1)
+            await pipe.execute()
+        except Exception:
+            pass
+
+    async def queue_size(self, topic: str) -> int:
+        try:
+            return await self._redis.llen(topic)
+        except Exception:
+            return 0
+
+    async def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        try:
+            return await _stats(self._redis, self._stats, "LLEN", self.maxlen)
+        except Exception as e:
+            print(f"Redis Stats Error: {e}")
+            return {}
+
+    async def close(self):
+        await _aclose(self._redis)
+
+
+class AsyncRedisBroker(AsyncBrokerInterface):
+    """Redis Stream-based async broker (XADD/XREADGROUP)"""
+
+    def __init__(self, host=None, port=None, maxlen=100):
+        self.host = host or os.getenv('REDIS_HOST', 'localhost')
+        self.port = port or int(os.getenv('REDIS_PORT', 6379))
+        self.maxlen = maxlen
+        self._redis = aioredis.Redis(host=self.host, port=self.port, socket_connect_timeout=5)
+        self._consumer_groups = set()
+        self._topic_limits = {}  # topic -> MAXLEN
+        self._stats = StatsCache()
+        self._latest = self._redis.register_script(_LATEST_SCRIPT)
+        self._balanced = self._redis.register_script(_BALANCED_SCRIPT)
+
+    async def _ensure_consumer_group(self, stream: str, group: str):
+        key = f"{stream}:{group}"
+        if key in self._consumer_groups:
+            return
+        try:
+            # Start from '$' to only read NEW messages (don't process history)
+            await self._redis.xgroup_create(stream, group, id='$', mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._consumer_groups.add(key)
+
+    async def push(self, topic: str, data: bytes):
+        if not data:
+            return
+        await self.push_many([(topic, data)])
+
+    async def push_buffers(self, topic: str, buffers: List[bytes]):
+        await self.push_many([(topic, buffers)])
+
+    async def push_many(self, items, limits=None):
+        """XADD MAXLEN for all items in one pipeline (same as RedisBroker.push_many)"""
+        limits = limits or {}
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for topic, data in items:
+                if isinstance(data, (list, tuple)):
+                    data = b"".join(data)
+                if not data:
+                    continue
+                limit = limits.get(topic) or self._topic_limits.get(topic, self.maxlen)
+                pipe.xadd(topic, {'data': data}, maxlen=limit, approximate=True)
+            for topic, size in limits.items():
+                if self._topic_limits.get(topic) != size:
+                    set_limit(pipe, topic, size)
+                    self._topic_limits[topic] = size
+            await pipe.execute()
+        except Exception as e:
+            print(f"Redis Push Error: {e}")
+
+    async def _read(self, topic, group, consumer, count, block):
+        """XREADGROUP (NOACK = 읽자마자 ACK하던 동기 버전과 같은 의미)"""
+        await self._ensure_consumer_group(topic, group)
+        result = await self._redis.xreadgroup(
+            groupname=group,
+            consumername=consumer,
+            streams={topic: '>'},
+            count=count,
+            block=block,
+            noack=True
+        )
+        return [fields.get(b'data') for _, fields in result[0][1]] if result else []
+
+    async def pop(self, topic: str, timeout: int = 1, group: str = "default", consumer: str = "worker") -> Optional[bytes]:
+        try:
+            messages = await self._read(topic, group, consumer, 1, int(timeout * 1000))
+            return messages[0] if messages else None
+        except redis.ConnectionError as e:
+            await _retry_later(e)
+            return None
+        except Exception as e:
+            print(f"Redis Pop Error: {e}")
+            return None
+
+    async def pop_latest(self, topic: str, timeout: int = 1, group: str = "default", consumer: str = "worker") -> Optional[bytes]:
+        """밀린 entry는 건너뛰고 최신 것만 (RedisBroker.pop_latest와 같은 스크립트, 없으면 다음 entry 대기)"""
+        try:
+            await self._ensure_consumer_group(topic, group)
+            fields = _latest_fields(await self._latest(keys=[topic], args=[group]))
+        except redis.ConnectionError as e:
+            await _retry_later(e)
+            return None
+        except Exception as e:
+            print(f"Redis PopLatest Error: {e}")
+            return None
+        if fields is not None:
+            return fields.get(b'data')
+        return await self.pop(topic, timeout=timeout, group=group, consumer=consumer)
+
+    async def pop_balanced(self, topic: str, max_lag, timeout: int = 1, group: str = "default",
+                           consumer: str = "worker") -> Optional[bytes]:
+        """순서대로, 밀린 정도가 max_lag를 넘으면 최신으로 (RedisBroker.pop_balanced와 같은 스크립트)"""
+        try:
+            await self._ensure_consumer_group(topic, group)
+            result = await self._balanced(keys=[topic], args=_lag_args(group, max_lag))
+        except redis.ConnectionError as e:
+            await _retry_later(e)
+            return None
+        except Exception as e:
+            print(f"Redis PopBalanced Error: {e}")
+            return None
+        if result:
+            self.skipped_frames += result[1]
+            return _latest_fields(result[0]).get(b'data')
+        return await self.pop(topic, timeout=timeout, group=group, consumer=consumer)
+
+    async def pop_batch(self, topic: str, max_items: int, max_wait_ms: float, timeout: int = 1,
+                        group: str = "default", consumer: str = "worker") -> List[bytes]:
+        """첫 XREADGROUP은 timeout까지 블로킹, 이후 max_wait_ms까지 non-blocking으로 더 모음"""
+        batch = []
+        try:
+            batch = await self._read(topic, group, consumer, max_items, int(timeout * 1000))
+            deadline = time.monotonic() + max_wait_ms / 1000
+            while batch and len(batch) < max_items:
+                more = await self._read(topic, group, consumer, max_items - len(batch), None)
+                if more:
+                    batch.extend(more)
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(remaining, BATCH_POLL_INTERVAL))
+        except redis.ConnectionError as e:
+            if not batch:
+                await _retry_later(e)  # 바로 반환하면 호출 측이 연결 오류를 반복하며 돔
+            else:
+                print(f"⚠️ Redis connection lost in pop: {e}")
+        except Exception as e:
+            print(f"Redis PopBatch Error: {e}")
+        return [data for data in batch if data]
+
+    async def trim(self, topic: str, size: int = 1):
+        self._topic_limits[topic] = size
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.xtrim(topic, maxlen=size, approximate=True)
+            set_limit(pipe, topic, size)
+            await pipe.execute()
+        except Exception:
+            pass
+
+    async def queue_size(self, topic: str) -> int:
+        try:
+            return await self._redis.xlen(topic)
+        except Exception:
+            return 0
+
+    async def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        try:
+            return await _stats(self._redis, self._stats, "XLEN", self.maxlen)
+        except Exception as e:
+            print(f"Redis Stats Error: {e}")
+            return {}
+
+    async def close(self):
+        await _aclose(self._redis)
@@ -1,22 +1,120 @@
 #edgeflow/comms/brokers/base.py
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+
+from ..frame import peek_timestamp
+
+# 이 크기 이하의 버퍼(헤더, 메타데이터)는 합쳐서 전송해도 복사 비용이 무시할 만함
+COALESCE_THRESHOLD = 64 * 1024
+
+# pop_batch()의 배치 대기 중 폴링 간격 (Redis BLOCK 타임아웃은 hz 단위(기본 100ms)라 짧은 대기에 부정확)
+BATCH_POLL_INTERVAL = 0.002
+
+# Dual 브로커: 이 크기 이하의 프레임은 blob 없이 Control 메시지에 직접 담음 (pop 시 Data 조회 생략)
+INLINE_THRESHOLD = 16 * 1024
+
+
+def coalesce_buffers(buffers: List[bytes], threshold: int = COALESCE_THRESHOLD) -> List[bytes]:
+    """
+    연속된 작은 버퍼는 하나로 합치고, 큰 버퍼(이미지 payload)는 복사 없이 그대로 둡니다.
+    - 예: [header, meta, payload] -> [header + meta, payload]
+    """
+    result = []
+    pending = []
+    for buf in buffers:
+        if len(buf) == 0:
+            continue
+        if len(buf) <= threshold:
+            pending.append(buf)
+            continue
+        if pending:
+            result.append(b"".join(pending))
+            pending = []
+        result.append(buf)
+    if pending:
+        result.append(b"".join(pending))
+    return result
+
+
+def buffers_key(parts: List[bytes]) -> tuple:
+    """
+    Fan-out 판별용 key: 같은 프레임을 여러 토픽(구독자 큐)에 보내는 push_many 항목은 같은 key
+    - 큰 버퍼(payload)는 객체 identity (인코딩 캐시가 같은 버퍼를 돌려줌), 작은 버퍼는 내용으로 비교
+    """
+    return tuple(id(buf) if len(buf) > COALESCE_THRESHOLD else bytes(buf) for buf in parts)
+
 
 class BrokerInterface(ABC):
     """
     모든 Broker가 구현해야 하는 인터페이스입니다.
     노드들은 이 인터페이스에만 의존하게 됩니다.
     """
+    skipped_frames = 0  # pop_balanced()가 max_lag를 넘어 건너뛴 프레임 수 (인스턴스별 누적)
+
     @abstractmethod
     def push(self, topic: str, data: bytes):
         """데이터를 브로커에 푸시합니다."""
         pass
 
+    def push_buffers(self, topic: str, buffers: List[bytes]):
+        """
+        Scatter-Gather 버퍼 리스트(Frame.to_buffers())를 푸시합니다.
+        - 기본 구현은 하나의 bytes로 합쳐 push()를 호출합니다.
+        - 브로커가 버퍼를 나눠서 쓸 수 있다면 오버라이드하여 payload 복사를 피합니다.
+        """
+        self.push(topic, b"".join(buffers))
+
+    def push_many(self, items: Sequence[Tuple[str, Union[bytes, List[bytes]]]], limits: Optional[Dict[str, int]] = None):
+        """
+        여러 (topic, data) 를 한 번에 푸시합니다. data는 bytes 또는 to_buffers() 버퍼 리스트.
+        - limits: topic -> 큐 크기 (trim을 쓰기와 함께 적용)
+        - 기본 구현은 push_buffers() 후 trim()을 차례로 호출합니다.
+        - 네트워크 브로커는 오버라이드하여 전체를 한 번의 왕복(pipeline)으로 보냅니다.
+        """
+        for topic, data in items:
+            if isinstance(data, (list, tuple)):
+                self.push_buffers(topic, data)
+            else:
+                self.push(topic, data)
+        for topic, size in (limits or {}).items():
+            self.trim(topic, size)
+
+    def subscriber_topic(self, topic: str, subscriber: str) -> str:
+        """
+        subscriber(노드 이름)가 topic을 읽을 때 쓰는 큐 이름 (생산자와 소비자 노드가 같은 규칙으로 배선)
+        - 기본: 구독자 모두가 같은 토픽을 읽음 (Stream consumer group처럼 브로커가 구독자별로 전달)
+        - 꺼내면 사라지는 큐(List)는 구독자마다 별도 큐를 반환 -> 생산자는 push_many() 한 번으로 모두 채움
+        """
+        return topic
+
     @abstractmethod
     def pop(self, topic: str, timeout: int = 0) -> bytes | None:
         """브로커에서 데이터를 팝합니다."""
         pass
         
+    def pop_batch(self, topic: str, max_items: int, max_wait_ms: float, timeout: int = 1, **kwargs) -> List[bytes]:
+        """
+        [Micro-batching] 최대 max_items개를 순서대로 가져옵니다 (DURABLE 순서, replicas 간 분배는 pop()과 동일).
+        - 첫 항목은 timeout(초)까지 기다리고, 그 뒤 max_wait_ms 안에 도착한 항목만 함께 묶습니다.
+        - 아무것도 없으면 빈 리스트를 반환합니다.
+        - 기본 구현은 pop()을 반복 호출합니다 (한 번에 여러 개를 읽을 수 있는 브로커는 오버라이드).
+        """
+        first = self.pop(topic, timeout=timeout, **kwargs)
+        if not first:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + max_wait_ms / 1000
+        while len(batch) < max_items:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            item = self.pop(topic, timeout=remaining, **kwargs)
+            if not item:
+                break
+            batch.append(item)
+        return batch
+
     @abstractmethod
     def pop_latest(self, topic: str, timeout: int = 0) -> bytes | None:
         """
@@ -26,6 +124,26 @@ class BrokerInterface(ABC):
         """
         pass
     
+    def pop_balanced(self, topic: str, max_lag, timeout: int = 1, **kwargs) -> bytes | None:
+        """
+        [QoS: BALANCED] 순서대로 읽다가, 밀린 정도가 max_lag(qos.MaxLag)를 넘으면 최신 프레임으로 건너뜁니다.
+        - lag: 아직 받지 않은 프레임 수(받은 프레임 포함) 또는 받은 프레임의 나이(ms)
+        - 건너뛴 프레임 수는 skipped_frames에 누적합니다.
+        - 기본 구현은 pop() 후 queue_size()와 헤더 timestamp로 판단하고, 넘으면 pop_latest()로 건너뜁니다
+          (pop()과 pop_latest()가 같은 큐를 읽는 브로커용, 그 외는 오버라이드).
+        """
+        data = self.pop(topic, timeout=timeout, **kwargs)
+        if not data:
+            return data
+        backlog = self.queue_size(topic)
+        if not max_lag.exceeded(backlog + 1, peek_timestamp(data)):
+            return data
+        latest = self.pop_latest(topic, timeout=0, **kwargs)
+        if not latest:
+            return data
+        self.skipped_frames += max(backlog, 1)
+        return latest
+
     @abstractmethod
     def trim(self, topic: str, size: int):
         """스트림의 크기를 관리합니다."""
@@ -41,6 +159,22 @@ class BrokerInterface(ABC):
         """모든 대기열의 상태(current, max)를 반환합니다."""
         pass
     
+    def get_io_stats(self) -> Dict[str, float]:
+        """
+        I/O 카운터를 반환합니다 (선택적 구현).
+        - 예: {"round_trips": 120, "frames": 60, "rtt_per_frame": 2.0}
+        """
+        return {}
+
+    def to_async(self) -> 'AsyncBrokerInterface':
+        """
+        이벤트 루프에서 사용할 async 브로커를 반환합니다 (같은 설정, 별도 연결).
+        - 기본 구현은 새 인스턴스를 ThreadedAsyncBroker로 감싸 블로킹 호출을 스레드로 넘깁니다.
+        - redis.asyncio 등 네이티브 async 클라이언트가 있는 브로커는 오버라이드합니다.
+        """
+        from .aio import ThreadedAsyncBroker
+        return ThreadedAsyncBroker(type(self).from_config(self.to_config()))
+
     def reset(self):
         """
         브로커의 상태를 초기화합니다 (선택적 구현).
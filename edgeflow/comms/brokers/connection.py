@@ -0,0 +1,215 @@
+#edgeflow/comms/brokers/connection.py
+"""
+Redis Connection Manager (모든 Redis 계열 브로커 공용)
+- 같은 프로세스에서 같은 host:port는 ConnectionPool 하나를 공유
+- 매 호출 PING 없음: 유휴 연결만 health_check_interval마다 확인 (redis-py 내장)
+- 연결이 끊기면 다음 명령에서 pool이 새 연결을 만듦 (lazy reconnect)
+- 실패 후 backoff 구간에는 Redis를 호출하지 않음 (push는 즉시 드롭, pop은 자기 timeout만큼만 대기)
+- 브로커별 카운터: round_trips / frames -> rtt_per_frame
+- submit(): 다른 인스턴스로 가는 pipeline을 동시에 실행 (Dual 브로커의 blob + reference 쓰기)
+- 토픽 registry (set) + queue_stats(): KEYS 스캔 없이 스크립트 한 번으로 큐 통계 조회, 짧게 캐시
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict
+
+import redis
+from redis.client import Pipeline
+
+HEALTH_CHECK_INTERVAL = 30  # 초, 이보다 오래 쉰 연결만 사용 전에 PING
+BACKOFF_MIN = 0.5
+BACKOFF_MAX = 30.0
+CONNECTION_ERRORS = (redis.ConnectionError, redis.TimeoutError)
+
+LIMIT_PREFIX = "edgeflow:meta:limit:"  # + topic -> 큐 크기
+TOPICS_KEY = "edgeflow:meta:topics"  # limit을 기록한 토픽 set (get_queue_stats가 읽음)
+STATS_TTL = 0.5  # 초, get_queue_stats() 결과 재사용 (대시보드 클라이언트/HTTP 요청이 함께 씀)
+
+# registry의 토픽마다 topic, limit, 길이 (ARGV[1]: XLEN/LLEN, ''면 0 / 다른 타입의 키도 0)
+_STATS_SCRIPT = """
+local out = {}
+for _, topic in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    local length = 0
+    if ARGV[1] ~= '' then
+        length = redis.pcall(ARGV[1], topic)
+        if type(length) ~= 'number' then length = 0 end
+    end
+    out[#out + 1] = topic
+    out[#out + 1] = redis.call('GET', ARGV[2] .. topic)
+    out[#out + 1] = length
+end
+return out
+"""
+
+_pools = {}  # (pid, host, port) -> ConnectionPool
+_pools_lock = threading.Lock()
+_executor = None  # (pid, ThreadPoolExecutor)
+
+
+def _shared_pool(host, port):
+    """프로세스별 공유 ConnectionPool (fork된 자식은 자기 pool을 새로 만듦)"""
+    key = (os.getpid(), host, int(port))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = redis.ConnectionPool(
+                host=host,
+                port=int(port),
+                socket_timeout=5,
+                socket_connect_timeout=5,
+                health_check_interval=HEALTH_CHECK_INTERVAL
+            )
+            _pools[key] = pool
+        return pool
+
+
+def submit(fn, *args) -> Future:
+    """
+    fn을 공유 I/O 스레드에서 실행 (호출 스레드는 다른 연결의 명령을 동시에 보냄)
+    - fork된 자식은 부모의 스레드가 없으므로 자기 executor를 새로 만듦
+    """
+    global _executor
+    pid = os.getpid()
+    with _pools_lock:
+        if _executor is None or _executor[0] != pid:
+            _executor = (pid, ThreadPoolExecutor(max_workers=4, thread_name_prefix="edgeflow-redis"))
+        return _executor[1].submit(fn, *args)
+
+
+def set_limit(pipe, topic, size):
+    """limit 기록 + registry 등록 (같은 pipeline, sync/async 공용)"""
+    pipe.set(f"{LIMIT_PREFIX}{topic}", size)
+    pipe.sadd(TOPICS_KEY, topic)
+
+
+def stats_command(length_cmd):
+    """_STATS_SCRIPT EVAL 인자 (client.eval(*stats_command(...)), sync/async 공용)"""
+    return _STATS_SCRIPT, 1, TOPICS_KEY, length_cmd, LIMIT_PREFIX
+
+
+def parse_stats(values, maxlen) -> Dict[str, Dict[str, int]]:
+    """_STATS_SCRIPT 결과 -> {topic: {"current", "max"}}"""
+    return {
+        values[i].decode('utf-8'): {"current": values[i + 2], "max": int(values[i + 1]) if values[i + 1] else maxlen}
+        for i in range(0, len(values), 3)
+    }
+
+
+class StatsCache:
+    """get_queue_stats() 결과를 ttl초 동안 재사용 (None: 만료)"""
+
+    def __init__(self, ttl=STATS_TTL):
+        self.ttl = ttl
+        self._value = None
+        self._expires = 0.0
+
+    def get(self):
+        return self._value if time.monotonic() < self._expires else None
+
+    def put(self, value):
+        self._value = value
+        self._expires = time.monotonic() + self.ttl
+        return value
+
+
+class _CountingPipeline(Pipeline):
+    """execute() 한 번 = round trip 한 번"""
+
+    def execute(self, raise_on_error=True):
+        if self.command_stack:
+            self._edgeflow_conn.round_trips += 1
+        return super().execute(raise_on_error)
+
+
+class _CountingRedis(redis.Redis):
+    """명령 하나 = round trip 한 번 (pipeline은 execute 단위)"""
+
+    def execute_command(self, *args, **options):
+        self._edgeflow_conn.round_trips += 1
+        return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = _CountingPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+        pipe._edgeflow_conn = self._edgeflow_conn
+        return pipe
+
+
+class RedisConnection:
+    """
+    브로커 하나의 Redis 연결 핸들
+    - client: redis.Redis (공유 pool 사용, round trip 카운트)
+    - available(): backoff 중이면 False -> 호출 측은 Redis를 건드리지 않고 바로 반환
+    - failed(e) / ok(): 연결 오류 / 성공을 알려 backoff 갱신
+    """
+
+    def __init__(self, host, port, name="Redis"):
+        self.host = host
+        self.port = int(port)
+        self.name = name
+        self.client = _CountingRedis(connection_pool=_shared_pool(host, port))
+        self.client._edgeflow_conn = self
+        self.round_trips = 0
+        self.frames = 0
+        self._backoff = 0.0
+        self._retry_at = 0.0
+
+    def available(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def wait(self, timeout):
+        """backoff 중인 pop: 남은 backoff와 timeout 중 짧은 만큼만 대기 (호출자 timeout을 넘기지 않음)"""
+        remaining = self._retry_at - time.monotonic()
+        if remaining > 0 and timeout:
+            time.sleep(min(remaining, timeout))
+
+    def failed(self, error, announce=True):
+        """연결 오류 -> 다음 시도까지 backoff (0.5s부터 2배씩, 최대 30s)"""
+        self._backoff = min(max(self._backoff * 2, BACKOFF_MIN), BACKOFF_MAX)
+        self._retry_at = time.monotonic() + self._backoff
+        if announce:
+            print(f"⚠️ {self.name} unavailable ({self.host}:{self.port}): {error}. Retrying in {self._backoff:.1f}s")
+
+    def ok(self):
+        if self._backoff:
+            print(f"✅ {self.name} Reconnected: {self.host}:{self.port}")
+            self._backoff = 0.0
+            self._retry_at = 0.0
+
+    def ping(self) -> bool:
+        """시작 시 1회 연결 확인용 (fallback 판단 등)"""
+        try:
+            self.client.ping()
+            return True
+        except CONNECTION_ERRORS:
+            return False
+
+
+def unique(*conns):
+    """같은 RedisConnection이 여러 역할(ctrl/data)을 맡을 때 중복 제거"""
+    return list({id(conn): conn for conn in conns if conn is not None}.values())
+
+
+def mark_failed(error, *conns):
+    """여러 연결을 쓰는 작업(ctrl + data)이 실패하면 함께 backoff (로그는 한 줄)"""
+    conns = unique(*conns)
+    for conn in conns:
+        conn.failed(error, announce=False)
+    names = ", ".join(f"{conn.name} {conn.host}:{conn.port}" for conn in conns)
+    print(f"⚠️ Redis unavailable ({names}): {error}. Retrying in {conns[0]._backoff:.1f}s")
+
+
+def io_stats(*conns) -> Dict[str, float]:
+    """
+    브로커 I/O 카운터
+    - round_trips: 모든 연결의 합계, frames: 첫 번째 연결(ctrl) 기준
+    - rtt_per_frame: 프레임 하나를 보내고/받는 데 든 평균 왕복 수 (빈 pop의 대기 왕복 포함)
+    """
+    frames = conns[0].frames
+    round_trips = sum(conn.round_trips for conn in unique(*conns))
+    return {
+        "round_trips": round_trips,
+        "frames": frames,
+        "rtt_per_frame": round(round_trips / frames, 3) if frames else 0.0
+    }
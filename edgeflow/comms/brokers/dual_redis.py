@@ -2,27 +2,48 @@
 """
 Dual Redis Stream-based Broker
 - Control Redis: Stream for message ordering
-- Data Redis: Blob storage for large payloads
+- Data Redis: Blob storage for large payloads, in a fixed ring of slots per topic and producer
+  (memory is bounded by queue_size x producers, not by a TTL)
+- content_addressed=True: identical payloads are stored once (content hash key)
+  Each consumer group holds one reference to the blob (group count from XINFO GROUPS in the XADD transaction)
+  and releases it when it reads the entry; entries no group reads (skipped by pop_latest/pop_balanced,
+  trimmed, dead groups) are freed by expiry
+- Shared connection pools, lazy reconnect with non-blocking backoff (connection.py)
+- Small frames are inlined in the stream entry ('data' field, no blob, no Data round trip on pop)
+- pop() reads NOACK (no XACK round trip) and takes the next entry in the same read (prefetch)
+- pop_latest() skips the backlog: the group cursor jumps to the newest entry (RedisBroker와 같은 스크립트)
+- pop_balanced() reads in order until the group lags more than max_lag, then jumps to the newest entry
+- Separate instances: blob and stream entry are written concurrently (push latency ~ one round trip)
+  Blobs of SEQUENTIAL_THRESHOLD bytes or more are written first, then the entry
+  An entry whose blob is still being written (older generation in its slot) is kept by the consumer and retried
+  with later pops while newer entries keep flowing; the group cursor has already moved past it (NOACK)
+  An entry whose slot is gone (expired, evicted, retracted) is dropped at once
 """
 import redis.exceptions
-import struct
 import time
 import os
+from collections import deque
 from typing import Dict
-from .base import BrokerInterface
+from .base import BATCH_POLL_INTERVAL, INLINE_THRESHOLD, BrokerInterface, coalesce_buffers
+from .connection import (CONNECTION_ERRORS, RedisConnection, StatsCache, io_stats, mark_failed, parse_stats,
+                         set_limit, stats_command, submit)
+from .dual_redis_list import (PENDING, SEQUENTIAL_THRESHOLD, _ContentStore, _SlotRing, _StalledRefs, _blob_wait,
+                              _fetch_slots)
+from .redis import _BALANCED_SCRIPT, _LATEST_SCRIPT, _lag_args, _latest_fields
 from ...config import settings
 
 
 class DualRedisBroker(BrokerInterface):
     """
     Dual Redis Stream Broker:
-    - ctrl_redis: Lightweight stream (message IDs)
-    - data_redis: Heavy data storage (actual frames)
+    - ctrl_redis: Lightweight stream (slot references)
+    - data_redis: Heavy data storage (actual frames, slot ring per topic)
     """
     
     
     def __init__(self, ctrl_host=None, ctrl_port=None, 
-                       data_host=None, data_port=None, maxlen=100):
+                       data_host=None, data_port=None, maxlen=100,
+                       inline_threshold=INLINE_THRESHOLD, prefetch=True, content_addressed=False):
         
         ctrl_host = ctrl_host or settings.REDIS_HOST
         ctrl_port = ctrl_port or settings.REDIS_PORT
@@ -30,10 +51,27 @@ class DualRedisBroker(BrokerInterface):
         data_port = data_port or settings.DATA_REDIS_PORT
 
         self.maxlen = maxlen
-        self.ctrl_redis = redis.Redis(host=ctrl_host, port=ctrl_port)
-        self.data_redis = self._connect_data_redis(data_host, data_port, ctrl_port)
+        self.inline_threshold = inline_threshold  # 이하 크기는 stream entry에 직접 (0: 항상 blob)
+        self.prefetch = prefetch  # pop(): 다음 entry를 같은 XREADGROUP에서 미리 가져옴
+        self.content_addressed = content_addressed  # 같은 payload는 한 번만 저장
+        self._ctrl = RedisConnection(ctrl_host, ctrl_port, "Control Redis")
+        self._data = self._connect_data_redis(data_host, data_port)
+        self.ctrl_redis = self._ctrl.client
+        self.data_redis = self._data.client
         self._consumer_groups = set()
         self._topic_last_id = {}  # Track last seen ID per topic for deduplication
+        self._topic_limits = {}  # topic -> MAXLEN (Redis에 기록한 값)
+        self._ring_sizes = {}  # topic -> 지금까지 본 가장 큰 MAXLEN (slot ring 크기, 줄어들지 않음)
+        self._prefetched = {}  # (topic, group, consumer) -> deque of frames already read
+        self._stalled_entries = {}  # (topic, group, consumer) -> entries read before their blob was readable
+        self._stalled = _StalledRefs()
+        self._ring = _SlotRing()
+        self._latest = self.ctrl_redis.register_script(_LATEST_SCRIPT)
+        self._balanced = self.ctrl_redis.register_script(_BALANCED_SCRIPT)
+        self._content = _ContentStore()
+        self._content.bind(self.data_redis)
+        self._group_counts = {}  # topic -> consumer group 수 (마지막 push의 XINFO GROUPS, content 참조 수)
+        self._stats = StatsCache()
 
     def reset(self):
         """
@@ -42,26 +80,41 @@ class DualRedisBroker(BrokerInterface):
         """
         try:
             self.ctrl_redis.flushall()
-            if self.ctrl_redis != self.data_redis:
+            if self._data is not self._ctrl:
                 self.data_redis.flushall()
             self._topic_last_id.clear()
+            self._topic_limits.clear()
+            self._group_counts.clear()
+            self._ring_sizes.clear()
+            self._prefetched.clear()
+            self._stalled_entries.clear()
             print("🧹 [DualRedis] System Reset: FLUSHALL executed")
         except Exception as e:
             print(f"⚠️ [DualRedis] Failed to reset: {e}")
 
-    def _connect_data_redis(self, host, port, fallback_port):
-        r = redis.Redis(host=host, port=port, socket_connect_timeout=0.5)
+    def _connect_data_redis(self, host, port):
+        if (host, int(port)) == (self._ctrl.host, self._ctrl.port):
+            return self._ctrl
+        conn = RedisConnection(host, port, "Data Redis")
         
         if host not in ("localhost", "127.0.0.1"):
-            return r
+            return conn
 
-        try:
-            r.ping()
-            return r
-        except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError):
-            print(f"⚠️ [DualRedis] Failed to connect to Data Redis at {host}:{port}.")
-            print(f"🔄 [DualRedis] Falling back to Control Redis port ({fallback_port}) for local testing.")
-            return redis.Redis(host=host, port=fallback_port)
+        # 시작 시 1회만 확인 (이후에는 PING 없이 lazy reconnect)
+        if conn.ping():
+            return conn
+        print(f"⚠️ [DualRedis] Failed to connect to Data Redis at {host}:{port}.")
+        print(f"🔄 [DualRedis] Falling back to Control Redis port ({self._ctrl.port}) for local testing.")
+        if host == self._ctrl.host:
+            return self._ctrl
+        return RedisConnection(host, self._ctrl.port, "Data Redis")
+
+    def _unavailable(self):
+        return not (self._ctrl.available() and self._data.available())
+
+    def _wait(self, timeout):
+        self._ctrl.wait(timeout)
+        self._data.wait(timeout)
 
     def _ensure_consumer_group(self, stream: str, group: str):
         """Create consumer group if not exists"""
@@ -83,155 +136,395 @@ class DualRedisBroker(BrokerInterface):
         """
         Store data in Data Redis, push ID to Control Redis Stream
         """
-        if len(frame_bytes) < 4:
-            return
+        self.push_buffers(topic, [frame_bytes])
+
+    def push_buffers(self, topic, buffers):
+        """
+        Scatter-Gather push: blob is assembled server-side (SET + APPEND)
+        so the payload buffer is never concatenated in Python.
+        """
+        self.push_many([(topic, buffers)])
+
+    def push_many(self, items, limits=None):
+        """
+        Batched push: all blobs in one Data pipeline, all XADDs in one Control pipeline (sent concurrently)
+        - trim is folded into XADD MAXLEN (exact: the stream never outgrows the slot ring); the limit key is only written when it changes
+        """
+        if self._unavailable():
+            return  # backoff 중: 프레임 드롭 (호출 측을 막지 않음)
+        limits = limits or {}
 
-        # Extract frame_id from header
-        frame_id = struct.unpack('!I', frame_bytes[:4])[0]
-        data_key = f"{topic}:data:{frame_id}"
-        
         # Optimization: If Ctrl and Data are same instance, use single pipeline
-        if self.ctrl_redis == self.data_redis:
-            pipe = self.ctrl_redis.pipeline()
-            pipe.set(data_key, frame_bytes, ex=60)
-            pipe.xadd(topic, {'frame_id': str(frame_id)}, maxlen=self.maxlen, approximate=True)
+        shared = self._data is self._ctrl
+        ctrl_pipe = self.ctrl_redis.pipeline()
+        data_pipe = ctrl_pipe if shared else self.data_redis.pipeline()
+        written = {}
+        for topic, size in limits.items():
+            if self._topic_limits.get(topic) != size:
+                set_limit(ctrl_pipe, topic, size)
+                written[topic] = size
+
+        refs = []
+        blobs = []  # refs index of entries backed by a blob (retracted if the Data write fails)
+        blob_bytes = 0
+        contents = {}  # digest -> [body, reference 수, buffers_key]
+        for topic, data in items:
+            parts = coalesce_buffers(data if isinstance(data, (list, tuple)) else [data])
+            if not parts or len(parts[0]) < 4:
+                continue
+            if len(parts) == 1 and len(parts[0]) <= self.inline_threshold:
+                # Small frame: inline in the stream entry (pop needs no Data round trip)
+                refs.append((topic, {'data': parts[0]}))
+                continue
+            blobs.append(len(refs))
+            blob_bytes += sum(len(part) for part in parts)
+            if self.content_addressed:
+                # group마다 한 번씩 읽으므로 참조 수 = group 수 (처음 보는 topic은 1로 가정, 아래에서 보정)
+                digest, head = self._content.add(contents, parts, refs=self._group_counts.get(topic, 1))
+                refs.append((topic, {'blob': digest, 'head': head}))
+                continue
+            limit = limits.get(topic) or self._topic_limits.get(topic, self.maxlen)
+            # ring은 어떤 group의 backlog(=stream 길이)보다 작으면 안 됨 -> 본 적 있는 가장 큰 크기로
+            size = self._ring_sizes[topic] = max(limit, self._ring_sizes.get(topic, 0))
+            refs.append((topic, {'ref': self._ring.write(data_pipe, topic, size, parts)}))
+        self._content.write(data_pipe, contents)
+
+        entry_indexes = []  # ctrl_pipe 결과에서 각 XADD의 위치 (limit 기록 명령이 앞에 섞여 있음)
+        for topic, fields in refs:
+            limit = limits.get(topic) or self._topic_limits.get(topic, self.maxlen)
+            entry_indexes.append(len(ctrl_pipe.command_stack))
+            # 정확히 trim (~는 limit보다 많은 entry를 남겨 ring에서 이미 덮어쓴 slot을 가리킬 수 있음)
+            ctrl_pipe.xadd(topic, fields, maxlen=limit, approximate=False)
+        # content 참조: XADD와 같은 MULTI 안에서 group 수 확인 (이 entry를 읽을 group이 정확히 이만큼)
+        group_indexes = {}
+        for topic, fields in refs:
+            if 'blob' in fields and topic not in group_indexes:
+                group_indexes[topic] = len(ctrl_pipe.command_stack)
+                ctrl_pipe.xinfo_groups(topic)
+
+        try:
+            # Separate instances: blob (Data) and stream entry (Control) writes go out concurrently.
+            # pop() only returns a frame once its blob is readable (keeps the entry for a retry otherwise),
+            # and a failed blob write retracts its entries below.
+            # Large blobs may take longer than a pop timeout to arrive: write them before the entries.
+            sequential = blobs and not shared and blob_bytes >= SEQUENTIAL_THRESHOLD
+            if sequential:
+                data_pipe.execute()
+            data_write = submit(data_pipe.execute) if blobs and not shared and not sequential else None
+            try:
+                results = ctrl_pipe.execute()
+            finally:
+                data_error = data_write.exception() if data_write else None
+            if data_error:
+                self._retract([(refs[i][0], results[entry_indexes[i]]) for i in blobs])
+                raise data_error
+            # limit 키는 실제로 기록된 뒤에만 캐시 (실패하면 다음 push에서 다시 기록)
+            self._topic_limits.update(written)
+            if group_indexes:
+                self._count_groups(refs, {topic: len(results[i]) for topic, i in group_indexes.items()})
+            self._ctrl.frames += len(refs)
+            self._ctrl.ok()
+            self._data.ok()
+        except CONNECTION_ERRORS as e:
+            mark_failed(e, self._ctrl, self._data)
+        except Exception as e:
+            print(f"DualRedis Push Error: {e}")
+
+    def _count_groups(self, refs, counts):
+        """XINFO GROUPS 결과로 group 수 캐시 갱신, 예상과 달랐던 blob의 참조 수 보정 (I/O 스레드)"""
+        deltas = {}
+        for topic, fields in refs:
+            delta = counts[topic] - self._group_counts.get(topic, 1) if 'blob' in fields else 0
+            if delta:
+                deltas[fields['blob']] = deltas.get(fields['blob'], 0) + delta
+        self._group_counts.update(counts)
+        deltas = {digest: delta for digest, delta in deltas.items() if delta}
+        if deltas:
+            submit(self._content.adjust, deltas)
+
+    def _retract(self, entries):
+        """XDEL entries whose blob write failed (already read ones are skipped by pop)"""
+        try:
+            pipe = self.ctrl_redis.pipeline(transaction=False)
+            for topic, entry_id in entries:
+                pipe.xdel(topic, entry_id)
             pipe.execute()
-        else:
-            # Separate instances: Push Data (Async-like) then Ctrl
-            # Note: We can't pipeline across different connections.
-            # But we can pipeline Data push to reduce RTT if multiple ops were needed.
-            # For now, we perform sequential ops.
-            # TODO: Make data push async?
-            self.data_redis.set(data_key, frame_bytes, ex=60)
-            self.ctrl_redis.xadd(topic, {'frame_id': str(frame_id)}, maxlen=self.maxlen, approximate=True)
+        except Exception as e:
+            print(f"DualRedis Retract Error: {e}")
 
-    def pop(self, topic, timeout=1, group="default", consumer="worker"):
+    def _read(self, topic, group, consumer, count, block=None):
+        """XREADGROUP NOACK -> stream entry fields (block=None: non-blocking)"""
+        # NOACK: 읽는 즉시 ACK한 것과 동일 (XACK 왕복 없음)
+        result = self.ctrl_redis.xreadgroup(
+            groupname=group,
+            consumername=consumer,
+            streams={topic: '>'},
+            count=count,
+            block=block,
+            noack=True
+        )
+        return [fields for _, fields in result[0][1]] if result else []
+
+    def _resolve(self, topic, entries, key):
         """
-        Read frame_id from stream, fetch data from Data Redis
+        Stream entries -> frames (inline as-is, slot references with one MGET; overwritten/lost slots are skipped)
+        - content references: head + shared blob (taking it releases this group's reference)
+        - blobs still being written (waited at most BLOB_WAIT) are kept for the next pop of key
         """
-        self._ensure_consumer_group(topic, group)
-        
-        try:
-            result = self.ctrl_redis.xreadgroup(
-                groupname=group,
-                consumername=consumer,
-                streams={topic: '>'},
-                count=1,
-                block=int(timeout * 1000)
-            )
-            
-            if not result:
-                return None
-            
-            stream_name, messages = result[0]
-            if not messages:
-                return None
-            
-            msg_id, fields = messages[0]
-            frame_id = fields.get(b'frame_id', b'').decode('utf-8')
-            
-            # Acknowledge message
-            self.ctrl_redis.xack(topic, group, msg_id)
-            
-            # Fetch actual data
-            data_key = f"{topic}:data:{frame_id}"
-            raw_data = self.data_redis.get(data_key)
-            
-            if raw_data:
-                return raw_data
+        wait = _blob_wait(self._data is self._ctrl)
+        refs = [fields[b'ref'] for fields in entries if b'ref' in fields]
+        digests = [fields[b'blob'].decode('ascii') for fields in entries if b'blob' in fields]
+        blobs = iter(_fetch_slots(self.data_redis, topic, refs, wait) if refs else [])
+        shared = iter(self._content.fetch(self.data_redis, digests, wait, consume=True) if digests else [])
+        frames = []
+        stalled = []
+        for fields in entries:
+            if b'data' in fields:
+                frame = fields[b'data']
+            elif b'blob' in fields:
+                blob = next(shared)
+                frame = fields[b'head'] + blob if blob and blob is not PENDING else blob
             else:
-                # Data expired or missing
-                return None
-                
+                frame = next(blobs)
+            if frame is PENDING:
+                stalled.append(fields)
+            elif frame:
+                frames.append(frame)
+        if stalled or self._stalled:
+            names = [self._entry_name(fields) for fields in stalled]
+            self._stalled.resolved([self._entry_name(fields) for fields in entries], names)
+            kept = [fields for fields, name in zip(stalled, names) if self._stalled.retry(name)]
+            if kept:
+                self._stalled_entries.setdefault(key, []).extend(kept)
+        return frames
+
+    @staticmethod
+    def _entry_name(fields):
+        """다시 시도하는 entry의 식별자 (slot reference, 또는 content digest + head)"""
+        return fields.get(b'ref') or fields.get(b'blob', b'') + fields.get(b'head', b'')
+
+    def _pop(self, topic, timeout, group, consumer, count):
+        if self._unavailable():
+            self._wait(timeout)
+            return []
+        deadline = time.monotonic() + timeout
+        key = (topic, group, consumer)
+        try:
+            self._ensure_consumer_group(topic, group)
+            while True:
+                # blob을 기다리는 entry(group cursor는 이미 지나감)와 함께 새 entry도 읽음 (막지 않음)
+                stalled = self._stalled_entries.pop(key, [])
+                entries = stalled + self._read(topic, group, consumer, count,
+                                               block=None if stalled else int(timeout * 1000))
+                self._ctrl.ok()
+                if not entries:
+                    return []
+                # Fetch actual data (skipped when every entry is inline)
+                frames = self._resolve(topic, entries, key)
+                if frames:
+                    return frames
+                # Only overwritten/expired slots: move on to the next entries within the same timeout
+                timeout = deadline - time.monotonic()
+                if timeout < 0.002:  # 0 would block forever
+                    return []
+        except CONNECTION_ERRORS as e:
+            mark_failed(e, self._ctrl, self._data)
+            return []
         except Exception as e:
             print(f"DualRedis Pop Error: {e}")
-            return None
+            return []
+
+    def pop(self, topic, timeout=1, group="default", consumer="worker"):
+        """
+        Read slot reference from stream, fetch data from Data Redis
+        - one blocking XREADGROUP + at most one MGET; a prefetched frame is returned with no round trip
+        """
+        key = (topic, group, consumer)
+        prefetched = self._prefetched.get(key)
+        if not prefetched:
+            frames = self._pop(topic, timeout, group, consumer, 2 if self.prefetch else 1)
+            if not frames:
+                return None
+            prefetched = self._prefetched.setdefault(key, deque())
+            prefetched.extend(frames)
+        self._ctrl.frames += 1
+        return prefetched.popleft()
+
+    def pop_batch(self, topic, max_items, max_wait_ms, timeout=1, group="default", consumer="worker"):
+        """
+        Read up to max_items slot references (XREADGROUP COUNT, NOACK), then fetch all blobs with one MGET
+        - after the first message, keep reading only until max_wait_ms has passed
+        """
+        prefetched = self._prefetched.get((topic, group, consumer))
+        if prefetched:
+            batch = [prefetched.popleft() for _ in range(min(max_items, len(prefetched)))]
+            self._ctrl.frames += len(batch)
+            return batch
+        if self._unavailable():
+            self._wait(timeout)
+            return []
+
+        key = (topic, group, consumer)
+        try:
+            self._ensure_consumer_group(topic, group)
+            entries = self._stalled_entries.pop(key, None) or self._read(topic, group, consumer, max_items,
+                                                                         block=int(timeout * 1000))
+            # 첫 메시지 이후에는 non-blocking 폴링으로 max_wait_ms까지만 더 모음
+            deadline = time.monotonic() + max_wait_ms / 1000
+            while entries and len(entries) < max_items:
+                more = self._read(topic, group, consumer, max_items - len(entries))
+                if more:
+                    entries.extend(more)
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(remaining, BATCH_POLL_INTERVAL))
+
+            self._ctrl.ok()
+            if not entries:
+                return []
+            # Data overwritten -> skip, still being written -> retried by the next pop
+            batch = self._resolve(topic, entries, key)
+            self._ctrl.frames += len(batch)
+            return batch
+        except CONNECTION_ERRORS as e:
+            mark_failed(e, self._ctrl, self._data)
+            return []
+        except Exception as e:
+            print(f"DualRedis PopBatch Error: {e}")
+            return []
 
     def pop_latest(self, topic, timeout=1, group="default", consumer="worker"):
         """
         Read the LATEST message using Consumer Groups (REALTIME mode with distribution).
-        - To ensure REALTIME, we read a batch and only take the last one.
-        - We ACK all messages in the batch to "catch up" the group pointer.
+        - Backlog: one script call takes the newest undelivered entry and moves the group cursor past the rest
+        - Caught up: block for the next entry (count=1 for fair distribution across the group, NOACK)
+        - No prefetch: a frame held locally would be stale by the next call
         """
-        self._ensure_consumer_group(topic, group)
-        
+        if self._unavailable():
+            self._wait(timeout)
+            return None
+        deadline = time.monotonic() + timeout
+        key = (topic, group, consumer)
         try:
-            # Read a batch (e.g. up to 100) to find the latest
-            result = self.ctrl_redis.xreadgroup(
-                groupname=group,
-                consumername=consumer,
-                streams={topic: '>'},
-                count=1, # Reverted to 1 for fair distribution. 
-                block=int(timeout * 1000)
-            )
-            
-            if not result:
-                return None
-            
-            stream_name, messages = result[0]
-            if not messages:
-                return None
-            
-            # Take the LAST message (freshest in this batch)
-            msg_id, fields = messages[-1]
-            frame_id = fields.get(b'frame_id', b'').decode('utf-8')
-            
-            # ACK immediately
-            self.ctrl_redis.xack(topic, group, msg_id)
-            
-            # Fetch actual data from Data Redis
-            data_key = f"{topic}:data:{frame_id}"
-            raw_data = self.data_redis.get(data_key)
-            return raw_data if raw_data else None
-            
+            self._ensure_consumer_group(topic, group)
+            fields = _latest_fields(self._latest(keys=[topic], args=[group]))
+            frames = self._resolve(topic, [fields], key) if fields else []
+            if frames:
+                self._stalled_entries.pop(key, None)  # 더 오래된 entry는 필요 없음
+        except CONNECTION_ERRORS as e:
+            mark_failed(e, self._ctrl, self._data)
+            return None
         except Exception as e:
             print(f"DualRedis PopLatest Error: {e}")
             return None
+        if not frames:
+            # 새 entry 없음 (또는 최신 slot이 덮어써짐) -> 다음 entry를 기다림
+            frames = self._pop(topic, max(deadline - time.monotonic(), 0.002), group, consumer, 1)
+        if not frames:
+            return None
+        self._ctrl.frames += 1
+        return frames[-1]
+
+    def pop_balanced(self, topic, max_lag, timeout=1, group="default", consumer="worker"):
+        """
+        [QoS: BALANCED] Sequential reads while the group keeps up, newest entry once it lags more than max_lag
+        - Same script as RedisBroker (lag check + cursor move in one round trip), then one MGET for the blob
+        - Caught up: block for the next entry (NOACK)
+        """
+        if self._unavailable():
+            self._wait(timeout)
+            return None
+        deadline = time.monotonic() + timeout
+        key = (topic, group, consumer)
+        try:
+            self._ensure_consumer_group(topic, group)
+            while key not in self._stalled_entries:  # blob을 기다리던 entry가 있으면 _pop에서 먼저 처리
+                result = self._balanced(keys=[topic], args=_lag_args(group, max_lag))
+                if not result:
+                    break
+                self.skipped_frames += result[1]
+                frames = self._resolve(topic, [_latest_fields(result[0])], key)
+                if frames:
+                    self._ctrl.frames += 1
+                    return frames[0]
+                # 덮어써진 slot: 다음 entry로
+                if time.monotonic() >= deadline:
+                    return None
+        except CONNECTION_ERRORS as e:
+            mark_failed(e, self._ctrl, self._data)
+            return None
+        except Exception as e:
+            print(f"DualRedis PopBalanced Error: {e}")
+            return None
+        frames = self._pop(topic, max(deadline - time.monotonic(), 0.002), group, consumer, 1)
+        if not frames:
+            return None
+        self._ctrl.frames += 1
+        return frames[0]
 
     def trim(self, topic, size):
         """Trim stream (for backward compatibility)"""
+        self._topic_limits[topic] = size
+        if not self._ctrl.available():
+            return
         try:
-            self.ctrl_redis.xtrim(topic, maxlen=size, approximate=True)
-            self.ctrl_redis.set(f"edgeflow:meta:limit:{topic}", size)
+            pipe = self.ctrl_redis.pipeline(transaction=False)
+            pipe.xtrim(topic, maxlen=size, approximate=False)
+            set_limit(pipe, topic, size)
+            pipe.execute()
+        except CONNECTION_ERRORS as e:
+            self._ctrl.failed(e)
         except Exception:
             pass
 
     def queue_size(self, topic: str) -> int:
         """Return stream length"""
+        if not self._ctrl.available():
+            return 0
         try:
             return self.ctrl_redis.xlen(topic)
+        except CONNECTION_ERRORS as e:
+            self._ctrl.failed(e, announce=False)
+            return 0
         except Exception:
             return 0
 
     def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
-        """Return stats for all tracked streams"""
+        """Return stats for all registered streams (cached for STATS_TTL)"""
+        cached = self._stats.get()
+        if cached is not None:
+            return cached
         stats = {}
+        if not self._ctrl.available():
+            return stats
         try:
-            meta_keys = self.ctrl_redis.keys("edgeflow:meta:limit:*")
-            
-            for key in meta_keys:
-                key_str = key.decode('utf-8')
-                topic = key_str.replace("edgeflow:meta:limit:", "")
-                
-                limit_bytes = self.ctrl_redis.get(key)
-                limit = int(limit_bytes) if limit_bytes else self.maxlen
-                current = self.ctrl_redis.xlen(topic)
-                
-                stats[topic] = {"current": current, "max": limit}
+            # 토픽 registry + limit + 길이를 스크립트 한 번으로 (KEYS 스캔 없음)
+            stats = self._stats.put(parse_stats(self.ctrl_redis.eval(*stats_command("XLEN")), self.maxlen))
+        except CONNECTION_ERRORS as e:
+            self._ctrl.failed(e, announce=False)
         except Exception as e:
             print(f"DualRedis Stats Error: {e}")
         return stats
 
+    def get_io_stats(self) -> Dict[str, float]:
+        """round trips (Control + Data) / frames since start"""
+        return io_stats(self._ctrl, self._data)
+
     # ========== Serialization Protocol ==========
     
     def to_config(self) -> dict:
         return {
             "__class_path__": f"{self.__class__.__module__}.{self.__class__.__name__}",
-            "ctrl_host": self.ctrl_redis.connection_pool.connection_kwargs.get('host'),
-            "ctrl_port": self.ctrl_redis.connection_pool.connection_kwargs.get('port'),
-            "data_host": self.data_redis.connection_pool.connection_kwargs.get('host'),
-            "data_port": self.data_redis.connection_pool.connection_kwargs.get('port'),
-            "maxlen": self.maxlen
+            "ctrl_host": self._ctrl.host,
+            "ctrl_port": self._ctrl.port,
+            "data_host": self._data.host,
+            "data_port": self._data.port,
+            "maxlen": self.maxlen,
+            "inline_threshold": self.inline_threshold,
+            "prefetch": self.prefetch,
+            "content_addressed": self.content_addressed
         }
     
     @classmethod
@@ -241,5 +534,8 @@ class DualRedisBroker(BrokerInterface):
             ctrl_port=config.get("ctrl_port"),
             data_host=config.get("data_host"),
             data_port=config.get("data_port"),
-            maxlen=config.get("maxlen", 100)
+            maxlen=config.get("maxlen", 100),
+            inline_threshold=config.get("inline_threshold", INLINE_THRESHOLD),
+            prefetch=config.get("prefetch", True),
+            content_addressed=config.get("content_addressed", False)
         )
\ No newline at end of file
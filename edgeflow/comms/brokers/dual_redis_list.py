@@ -1,258 +1,741 @@
 # edgeflow/comms/brokers/dual_redis_list.py
 """
 Dual Redis List-based Broker
-- Control Redis: List for message ordering (lightweight frame_id references)
-- Data Redis: Blob storage for large payloads
+- Control Redis: List for message ordering (lightweight slot references)
+- Data Redis: Blob storage for large payloads, in a fixed ring of slots per topic and producer
+  (memory is bounded by queue_size x producers, not by a TTL)
+- content_addressed=True: identical payloads are stored once (content hash key + reference count)
+- One list per subscriber ({topic}:{subscriber}): a frame fanned out to several lists shares one blob
+  (reference count = number of subscribers, no hashing needed)
 - Uses RPUSH/LPOP for high-performance, low-latency messaging
+- Small frames are inlined in the Control list (no blob, no Data round trip on pop)
+- pop() takes the next queued entry in the same round trip (prefetch) while loop() runs
+- pop_balanced() is FIFO until more than max_lag references are queued, then takes the newest only
+- Shared connection pools, lazy reconnect with non-blocking backoff (connection.py)
+- Separate instances: blob and reference are written concurrently (push latency ~ one round trip)
+  Blobs of SEQUENTIAL_THRESHOLD bytes or more are written first, then the reference
+  A reference whose blob is still being written (older generation in its slot) is held by the consumer and
+  retried with later pops while newer references keep flowing (frames queued behind it may be delivered first);
+  a reference whose slot is gone (expired, evicted, retracted) is dropped at once
 """
-import redis
-import redis.exceptions
-import struct
+import hashlib
+import itertools
 import time
-import os
-from typing import Dict, Optional
-from .base import BrokerInterface
+import uuid
+from collections import Counter, deque
+from typing import Dict, List, Optional
+from .base import BATCH_POLL_INTERVAL, INLINE_THRESHOLD, BrokerInterface, buffers_key, coalesce_buffers
+from .connection import (CONNECTION_ERRORS, LIMIT_PREFIX, RedisConnection, StatsCache, io_stats, mark_failed,
+                         parse_stats, set_limit, stats_command, submit)
+from ..frame import peek_timestamp
+from .redis_list import _pop_list_batch
 from ...config import settings
 
+# Control list entry: b"<producer>:<slot>:<generation>" (slot reference), _INLINE + frame bytes
+# or _CONTENT + digest (32 hex) + head (content_addressed)
+_INLINE = b"\x00"
+_CONTENT = b"\x01"
+_BLOB_PREFIX = "edgeflow:blob:"
+
+# 분리된 인스턴스: reference가 blob보다 먼저 보일 수 있으므로 pop이 blob을 기다리는 최대 시간 (초)
+# (그래도 없으면 consumer가 reference를 들고 다음 pop에서 다시 확인, 그동안 뒤의 reference는 계속 처리)
+BLOB_WAIT = 0.05
+
+# 이 크기 이상의 blob은 동시에 쓰지 않고 blob -> reference 순서로 (전송 시간이 pop 대기보다 길어질 수 있음)
+SEQUENTIAL_THRESHOLD = 4 * 1024 * 1024
+
+# _fetch_slots / _ContentStore.fetch: 기다려도 아직 blob이 보이지 않는 reference (None은 덮어쓰임 = 건너뜀)
+PENDING = object()
+
+# ring 크기 = 큐 크기 + 여유분 (pop한 reference의 blob을 읽기 전에 덮어쓰이지 않도록)
+RING_MARGIN = 2
+
+# 더 이상 쓰지 않는 ring(재시작한 producer, 줄어든 큐 크기)만 정리하는 용도 - 쓸 때마다 갱신
+SLOT_TTL = 60
+
+
+class _SlotRing:
+    """
+    Data Redis의 producer별 고정 slot ring (DualRedisBroker, DualRedisListBroker 공용)
+    - slot key: {topic}:slot:{producer}:{i}, generation: {slot key}:gen (같은 MULTI에서 기록)
+    - generation은 토픽별로 1부터 증가, slot = generation % ring 크기
+    - producer id는 브로커 인스턴스마다 새로 생성 (재시작해도 이전 reference와 겹치지 않음)
+    """
+
+    def __init__(self):
+        self.producer = uuid.uuid4().hex[:8]
+        self._generations = {}  # topic -> itertools.count (thread-safe next())
+
+    def write(self, pipe, topic, size, parts) -> str:
+        """SET first part, APPEND the rest, then the generation tag -> reference"""
+        generation = next(self._generations.setdefault(topic, itertools.count(1)))
+        slot = generation % (size + RING_MARGIN)
+        key = f"{topic}:slot:{self.producer}:{slot}"
+        pipe.set(key, parts[0], ex=SLOT_TTL)
+        for part in parts[1:]:
+            pipe.append(key, part)
+        pipe.set(f"{key}:gen", generation, ex=SLOT_TTL)
+        return f"{self.producer}:{slot}:{generation}"
+
+
+# 가져가면서 참조 수 감소, 0이 되면 삭제 (아직 쓰는 중이라 없는 blob은 건드리지 않음)
+_TAKE_SCRIPT = """
+local blobs = {}
+for i = 1, #KEYS, 2 do
+    local blob = redis.call('GET', KEYS[i])
+    blobs[#blobs + 1] = blob
+    if blob and redis.call('DECR', KEYS[i + 1]) <= 0 then
+        redis.call('DEL', KEYS[i], KEYS[i + 1])
+    end
+end
+return blobs
+"""
+
+# 소비되지 않고 trim된 reference의 참조 수 반환
+_RELEASE_SCRIPT = """
+for i = 1, #KEYS, 2 do
+    if redis.call('DECR', KEYS[i + 1]) <= 0 then
+        redis.call('DEL', KEYS[i], KEYS[i + 1])
+    end
+end
+return 0
+"""
+
+# 참조 수 보정 (ARGV: blob마다 증감, 마지막은 TTL) - 이미 지워진 blob은 건드리지 않음
+_ADJUST_SCRIPT = """
+for i = 1, #KEYS, 2 do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        if redis.call('INCRBY', KEYS[i + 1], ARGV[(i + 1) / 2]) <= 0 then
+            redis.call('DEL', KEYS[i], KEYS[i + 1])
+        else
+            redis.call('EXPIRE', KEYS[i + 1], ARGV[#ARGV])
+        end
+    end
+end
+return 0
+"""
+
+
+class _ContentStore:
+    """
+    content hash를 key로 쓰는 공유 blob (content_addressed=True, DualRedisBroker, DualRedisListBroker 공용)
+    - payload(parts[1:])만 blob으로 저장, head(header + meta)는 reference에 inline
+      -> frame_id/timestamp가 달라도 payload가 같으면 (placeholder, 에러 프레임, fan-out) 한 번만 저장
+    - key: edgeflow:blob:{digest}, 참조 수: {key}:refs (reference를 읽을 소비자마다 +1, 소비/trim 시 -1, 0이면 삭제)
+    """
+
+    def __init__(self):
+        self._take = None
+        self._release = None
+        self._adjust = None
+
+    def bind(self, client):
+        """Data Redis client에 스크립트 등록 (EVALSHA, 없으면 자동으로 EVAL)"""
+        self._take = client.register_script(_TAKE_SCRIPT)
+        self._release = client.register_script(_RELEASE_SCRIPT)
+        self._adjust = client.register_script(_ADJUST_SCRIPT)
+
+    @staticmethod
+    def add(batch, parts, hashed=True, refs=1):
+        """
+        frame parts -> (digest, head), batch(digest -> [body, reference 수])에 누적
+        - 같은 push_many 안에서 같은 버퍼(fan-out)는 한 번만 해시/전송
+        - hashed=False: 해시 대신 임의 digest (fan-out 공유만, 다른 push와는 합치지 않음)
+        - refs: reference 하나를 읽을 소비자 수 (stream: consumer group 수)
+        """
+        head, body = (parts[0], parts[1:]) if len(parts) > 1 else (b"", parts)
+        key = buffers_key(body)
+        for digest, entry in batch.items():
+            if entry[2] == key:
+                entry[1] += refs
+                return digest, head
+        if hashed:
+            h = hashlib.blake2b(digest_size=16)
+            for buf in body:
+                h.update(buf)
+            digest = h.hexdigest()
+        else:
+            digest = uuid.uuid4().hex
+        entry = batch.setdefault(digest, [body, 0, key])
+        entry[1] += refs
+        return digest, head
+
+    @staticmethod
+    def write(pipe, batch):
+        """SET NX (이미 있으면 payload는 버림) + 참조 수 증가, 만료는 정리용 (쓸 때마다 갱신)"""
+        for digest, (body, count, _) in batch.items():
+            key = f"{_BLOB_PREFIX}{digest}"
+            pipe.set(key, body[0] if len(body) == 1 else b"".join(body), nx=True, ex=SLOT_TTL)
+            pipe.expire(key, SLOT_TTL)
+            pipe.incrby(f"{key}:refs", count)
+            pipe.expire(f"{key}:refs", SLOT_TTL)
+
+    @staticmethod
+    def _keys(digests):
+        return [key for digest in digests for key in (f"{_BLOB_PREFIX}{digest}", f"{_BLOB_PREFIX}{digest}:refs")]
+
+    def release(self, digests):
+        """trim으로 버려진 reference 반환 (push 경로를 막지 않도록 I/O 스레드에서 호출)"""
+        try:
+            self._release(keys=self._keys(digests))
+        except Exception as e:
+            print(f"⚠️ Content blob release failed: {e}")
+
+    def adjust(self, deltas):
+        """digest -> 참조 수 증감 (쓸 때 예상한 소비자 수가 틀린 경우, I/O 스레드에서 호출)"""
+        try:
+            self._adjust(keys=self._keys(list(deltas)), args=[*deltas.values(), SLOT_TTL])
+        except Exception as e:
+            print(f"⚠️ Content blob adjust failed: {e}")
+
+    def fetch(self, r, digests, wait, consume):
+        """
+        blob 조회 (consume: 참조 수 감소 - reference를 정확히 한 번 소비하는 리스트 브로커)
+        - 없으면 아직 쓰는 중 (blob/reference 동시 쓰기) -> 받은 blob이 하나도 없으면 wait초까지 다시 조회,
+          그래도 없으면 PENDING (없는 blob은 참조 수를 건드리지 않으므로 나중에 다시 조회해도 됨)
+        """
+        blobs = [None] * len(digests)
+        pending = list(range(len(digests)))
+        deadline = time.monotonic() + wait
+        while True:
+            names = [digests[i] for i in pending]
+            values = self._take(keys=self._keys(names)) if consume else r.mget([f"{_BLOB_PREFIX}{d}" for d in names])
+            waiting = []
+            for i, blob in zip(pending, values):
+                if blob is None:
+                    waiting.append(i)
+                else:
+                    blobs[i] = blob
+            if len(waiting) < len(pending) or not waiting or time.monotonic() >= deadline:
+                # 받은 blob이 있으면 기다리지 않음 (남은 것은 다음 pop에서 다시 확인)
+                for i in waiting:
+                    blobs[i] = PENDING
+                return blobs
+            pending = waiting
+            time.sleep(BATCH_POLL_INTERVAL)
+
+
+def _fetch_slots(r, topic, refs, wait):
+    """
+    slot blob + generation을 한 번의 MGET으로 조회 (DualRedisBroker, DualRedisListBroker 공용)
+    - generation == reference: blob (blob만 evict되었으면 None)
+    - generation이 reference보다 크면 ring이 한 바퀴 돌아 덮어쓰인 것 -> None (건너뜀)
+    - generation이 없으면 slot이 사라진 것 (만료, evict, 철회) -> None
+      단, ring의 첫 바퀴(generation == slot 번호)는 아직 한 번도 쓰지 않은 slot일 수 있어 쓰는 중으로 취급
+    - 더 작으면 아직 쓰는 중 (blob/reference 동시 쓰기) -> 처리된 것이 없으면 wait초까지 다시 조회,
+      그래도 쓰는 중이면 PENDING (호출 측이 들고 있다가 다시 확인, SLOT_TTL 후 포기)
+    """
+    targets = []
+    for ref in refs:
+        producer, slot, generation = ref.decode('utf-8').rsplit(':', 2)
+        targets.append((f"{topic}:slot:{producer}:{slot}", int(generation), slot == generation))
+
+    blobs = [None] * len(targets)
+    pending = list(range(len(targets)))
+    deadline = time.monotonic() + wait
+    while True:
+        keys = []
+        for i in pending:
+            keys += [targets[i][0], f"{targets[i][0]}:gen"]
+        values = r.mget(keys)
+        waiting = []
+        for n, i in enumerate(pending):
+            _, generation, first_lap = targets[i]
+            blob, stored = values[2 * n], values[2 * n + 1]
+            if stored is None:
+                if first_lap:
+                    waiting.append(i)
+            elif int(stored) == generation:
+                blobs[i] = blob
+            elif int(stored) < generation:
+                waiting.append(i)
+        if len(waiting) < len(pending) or not waiting or time.monotonic() >= deadline:
+            # 처리된 reference가 있으면 기다리지 않음 (쓰는 중인 것은 다음 pop에서 다시 확인)
+            for i in waiting:
+                blobs[i] = PENDING
+            return blobs
+        pending = waiting
+        time.sleep(BATCH_POLL_INTERVAL)
+
+
+class _StalledRefs:
+    """
+    blob이 아직 보이지 않아 다시 시도하는 reference (DualRedisBroker, DualRedisListBroker 공용)
+    - 처음 본 시각부터 SLOT_TTL이 지나면 포기 (그 전에 blob이 없으면 만료되었거나 쓰기 실패로 철회된 것)
+    """
+
+    def __init__(self):
+        self._since = {}  # reference -> 처음 기다리기 시작한 시각
+
+    def retry(self, ref) -> bool:
+        now = time.monotonic()
+        since = self._since.setdefault(ref, now)
+        if now - since < SLOT_TTL:
+            return True
+        del self._since[ref]
+        print(f"⚠️ [DualRedis] Blob for reference {ref[:48]!r} never became readable ({SLOT_TTL}s). Frame dropped.")
+        return False
+
+    def __len__(self):
+        return len(self._since)
+
+    def resolved(self, refs, stalled=()):
+        if self._since:
+            for ref in refs:
+                if ref not in stalled:
+                    self._since.pop(ref, None)
+
+
+def _blob_wait(shared):
+    """blob을 기다릴 시간: 같은 인스턴스(MULTI)면 0, 아니면 BLOB_WAIT (pop timeout과 무관)"""
+    return 0 if shared else BLOB_WAIT
+
 
 class DualRedisListBroker(BrokerInterface):
     """
     Dual Redis List Broker:
-    - ctrl_redis: Lightweight list (frame_id references)
-    - data_redis: Heavy data storage (actual frames)
+    - ctrl_redis: Lightweight list (slot references)
+    - data_redis: Heavy data storage (actual frames, slot ring per topic)
     """
     
     def __init__(self, ctrl_host=None, ctrl_port=None, 
-                       data_host=None, data_port=None, maxlen=100):
+                       data_host=None, data_port=None, maxlen=100,
+                       inline_threshold=INLINE_THRESHOLD, prefetch=True, content_addressed=False):
         
         self.ctrl_host = ctrl_host or settings.REDIS_HOST
         self.ctrl_port = ctrl_port or settings.REDIS_PORT
         self.data_host = data_host or settings.DATA_REDIS_HOST
         self.data_port = data_port or settings.DATA_REDIS_PORT
         self.maxlen = maxlen
+        self.inline_threshold = inline_threshold  # 이하 크기는 Control list에 직접 (0: 항상 blob)
+        self.prefetch = prefetch  # pop(): 다음 항목을 같은 왕복에서 미리 가져옴
+        self.content_addressed = content_addressed  # 같은 payload는 한 번만 저장 (참조 수로 해제)
         
-        self.ctrl_redis = None
+        # 공유 pool + lazy reconnect (매 호출 PING 없음)
+        self._ctrl = RedisConnection(self.ctrl_host, self.ctrl_port, "Control Redis")
+        self.ctrl_redis = self._ctrl.client
+        self._data = None  # 첫 사용 시 결정 (localhost면 Control로 fallback 가능)
         self.data_redis = None
         self._topic_limits = {}  # topic -> max size
         self._last_seen_id = {}  # topic -> last processed frame_id (for REALTIME dedup)
+        self._prefetched = {}  # topic -> deque of frames already taken from the list
+        self._ring = _SlotRing()
+        self._content = _ContentStore()
+        self._stats = StatsCache()
+        self._content_topics = set()  # content reference를 넣은 토픽 (trim 시 참조 수 반환)
+        self._stalled = _StalledRefs()
+        self._stalled_entries = {}  # topic -> 가져왔지만 blob이 아직 쓰는 중인 reference (다음 pop에서 다시 확인)
 
-    def _ensure_connected(self):
-        """Ensure both Redis connections, auto-reconnect if needed"""
-        if self.ctrl_redis is None:
-            self.ctrl_redis = self._connect(self.ctrl_host, self.ctrl_port, "Control")
-        else:
-            try:
-                self.ctrl_redis.ping()
-            except (redis.ConnectionError, redis.TimeoutError):
-                print(f"⚠️ Control Redis connection lost. Reconnecting...")
-                self.ctrl_redis = self._connect(self.ctrl_host, self.ctrl_port, "Control")
-        
-        if self.data_redis is None:
-            self.data_redis = self._connect_data_redis()
-        else:
-            try:
-                self.data_redis.ping()
-            except (redis.ConnectionError, redis.TimeoutError):
-                print(f"⚠️ Data Redis connection lost. Reconnecting...")
-                self.data_redis = self._connect_data_redis()
-
-    def _connect(self, host, port, name="Redis"):
-        """Connect to Redis with exponential backoff"""
-        wait_time = 1
-        while True:
-            try:
-                r = redis.Redis(
-                    host=host, 
-                    port=port, 
-                    socket_timeout=5,
-                    socket_connect_timeout=5
-                )
-                r.ping()
-                print(f"✅ {name} Redis Connected: {host}:{port}")
-                return r
-            except redis.ConnectionError:
-                print(f"⚠️ {name} Redis Connection Failed ({host}:{port}). Retrying in {wait_time}s...")
-                time.sleep(wait_time)
-                wait_time = min(wait_time * 2, 30)
+    def _ensure_connected(self) -> bool:
+        """
+        Resolve the Data connection once, then only report backoff state
+        - no PING per call: dropped connections are re-created by the pool on the next command
+        - returns False while a previous connection error is backing off
+        """
+        if self._data is None:
+            self._data = self._connect_data_redis()
+            self.data_redis = self._data.client
+            self._content.bind(self.data_redis)
+        return self._ctrl.available() and self._data.available()
+
+    def _wait(self, timeout):
+        self._ctrl.wait(timeout)
+        self._data.wait(timeout)
+
+    def _failed(self, error):
+        mark_failed(error, self._ctrl, self._data)
 
     def _connect_data_redis(self):
         """Connect to Data Redis with fallback to Control Redis"""
-        r = redis.Redis(
-            host=self.data_host, 
-            port=self.data_port, 
-            socket_connect_timeout=0.5
-        )
+        if (self.data_host, int(self.data_port)) == (self._ctrl.host, self._ctrl.port):
+            return self._ctrl
+        conn = RedisConnection(self.data_host, self.data_port, "Data Redis")
         
-        # For non-localhost, always use configured host
+        # For non-localhost, always use configured host (reconnects lazily if it is down)
         if self.data_host not in ("localhost", "127.0.0.1"):
-            try:
-                r.ping()
-                print(f"✅ Data Redis Connected: {self.data_host}:{self.data_port}")
-                return r
-            except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError):
-                return self._connect(self.data_host, self.data_port, "Data")
+            return conn
         
         # For localhost, try Data Redis first, fallback to Control Redis
-        try:
-            r.ping()
+        if conn.ping():
             print(f"✅ Data Redis Connected: {self.data_host}:{self.data_port}")
-            return r
-        except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError):
-            print(f"⚠️ [DualRedis] Failed to connect to Data Redis at {self.data_host}:{self.data_port}.")
-            print(f"🔄 [DualRedis] Falling back to Control Redis port ({self.ctrl_port}) for local testing.")
-            return self.ctrl_redis  # Use same connection as Control
+            return conn
+        print(f"⚠️ [DualRedis] Failed to connect to Data Redis at {self.data_host}:{self.data_port}.")
+        print(f"🔄 [DualRedis] Falling back to Control Redis port ({self.ctrl_port}) for local testing.")
+        return self._ctrl  # Use same connection as Control
 
     def reset(self):
         """Reset Broker State (FLUSHALL)"""
         self._ensure_connected()
         try:
             self.ctrl_redis.flushall()
-            if self.ctrl_redis != self.data_redis:
+            if self._data is not self._ctrl:
                 self.data_redis.flushall()
+            self._topic_limits.clear()
+            self._prefetched.clear()
+            self._stalled_entries.clear()
             print("🧹 [DualRedisListBroker] System Reset: FLUSHALL executed")
         except Exception as e:
             print(f"⚠️ [DualRedisListBroker] Failed to reset: {e}")
 
     def push(self, topic: str, frame_bytes: bytes):
         """
-        Store data in Data Redis, push frame_id reference to Control Redis List
+        Store data in a Data Redis slot, push the slot reference to Control Redis List
         """
-        if not frame_bytes or len(frame_bytes) < 4:
+        if not frame_bytes:
             return
-        
-        self._ensure_connected()
-        
-        # Get limit from local cache, or fetch from Redis (for distributed env)
-        if topic not in self._topic_limits:
-            limit_bytes = self.ctrl_redis.get(f"edgeflow:meta:limit:{topic}")
-            if limit_bytes:
-                self._topic_limits[topic] = int(limit_bytes)
-        
-        limit = self._topic_limits.get(topic, self.maxlen)
-        
-        # Extract frame_id from header
-        frame_id = struct.unpack('!I', frame_bytes[:4])[0]
-        data_key = f"{topic}:data:{frame_id}"
-        
+        self.push_buffers(topic, [frame_bytes])
+
+    def push_buffers(self, topic: str, buffers: List[bytes]):
+        """
+        Scatter-Gather push: blob is assembled server-side (SET + APPEND)
+        so the payload buffer is never concatenated in Python.
+        """
+        self.push_many([(topic, buffers)])
+
+    def push_many(self, items, limits=None):
+        """
+        Batched push: all blobs in one Data pipeline, all references + LTRIM in one Control pipeline
+        (sent concurrently; a single pipeline when Ctrl and Data are the same instance)
+        """
+        if not self._ensure_connected():
+            return  # backoff 중: 프레임 드롭 (호출 측을 막지 않음)
+        limits = limits or {}
+
         try:
+            # Get limit from local cache, or fetch from Redis (for distributed env)
+            for topic, _ in items:
+                if topic not in limits and topic not in self._topic_limits:
+                    limit_bytes = self.ctrl_redis.get(f"{LIMIT_PREFIX}{topic}")
+                    if limit_bytes:
+                        self._topic_limits[topic] = int(limit_bytes)
+
             # Optimization: If Ctrl and Data are same instance, use single pipeline
-            if self.ctrl_redis == self.data_redis:
-                pipe = self.ctrl_redis.pipeline()
-                pipe.set(data_key, frame_bytes, ex=60)  # 60s TTL
-                pipe.rpush(topic, str(frame_id))
-                pipe.ltrim(topic, -limit, -1)
-                pipe.execute()
-            else:
-                # Separate instances
-                self.data_redis.set(data_key, frame_bytes, ex=60)
-                self.ctrl_redis.rpush(topic, str(frame_id))
-                self.ctrl_redis.ltrim(topic, -limit, -1)
-        except (redis.ConnectionError, redis.TimeoutError) as e:
-            print(f"⚠️ Redis connection lost in push: {e}")
-            self.ctrl_redis = None
-            self.data_redis = None
+            shared = self._data is self._ctrl
+            ctrl_pipe = self.ctrl_redis.pipeline()
+            data_pipe = ctrl_pipe if shared else self.data_redis.pipeline()
+            written = {}
+            for topic, size in limits.items():
+                if self._topic_limits.get(topic) != size:
+                    set_limit(ctrl_pipe, topic, size)
+                    written[topic] = size
+
+            refs = []
+            blobs = []  # blob을 쓴 reference (Data 쓰기가 실패하면 철회)
+            blob_bytes = 0
+            contents = {}  # digest -> [body, reference 수, buffers_key]
+            frames = []
+            for topic, data in items:
+                parts = coalesce_buffers(data if isinstance(data, (list, tuple)) else [data])
+                frames.append((topic, parts, buffers_key(parts)))
+            # 같은 프레임을 여러 구독자 리스트로 보내면 blob 하나를 공유 (slot ring은 토픽별이라 N번 쓰게 됨)
+            fanout = Counter(key for _, _, key in frames)
+            for topic, parts, key in frames:
+                if not parts or len(parts[0]) < 4:
+                    continue
+                if len(parts) == 1 and len(parts[0]) <= self.inline_threshold:
+                    # Small frame: inline in the Control list (pop needs no Data round trip)
+                    refs.append((topic, _INLINE + parts[0]))
+                    continue
+                if self.content_addressed or fanout[key] > 1:
+                    digest, head = self._content.add(contents, parts, hashed=self.content_addressed)
+                    self._content_topics.add(topic)
+                    ref = _CONTENT + digest.encode('ascii') + head
+                else:
+                    size = limits.get(topic) or self._topic_limits.get(topic, self.maxlen)
+                    ref = self._ring.write(data_pipe, topic, size, parts)
+                refs.append((topic, ref))
+                blobs.append((topic, ref))
+                blob_bytes += sum(len(part) for part in parts)
+            self._content.write(data_pipe, contents)
+
+            trimmed = []  # LRANGE index: entries about to be trimmed (content references to release)
+            for topic, entry in refs:
+                limit = limits.get(topic) or self._topic_limits.get(topic, self.maxlen)
+                ctrl_pipe.rpush(topic, entry)
+                if topic in self._content_topics:
+                    trimmed.append(len(ctrl_pipe.command_stack))
+                    ctrl_pipe.lrange(topic, 0, -limit - 1)
+                ctrl_pipe.ltrim(topic, -limit, -1)
+
+            # Separate instances: blob (Data) and reference (Control) writes go out concurrently.
+            # pop() only returns a frame once its blob is readable (requeues the reference otherwise),
+            # and a failed blob write retracts its references below.
+            # Large blobs may take longer than a pop timeout to arrive: write them before the references.
+            sequential = blobs and not shared and blob_bytes >= SEQUENTIAL_THRESHOLD
+            if sequential:
+                data_pipe.execute()
+            data_write = submit(data_pipe.execute) if blobs and not shared and not sequential else None
+            try:
+                results = ctrl_pipe.execute()
+            finally:
+                data_error = data_write.exception() if data_write else None
+            if data_error:
+                self._retract(blobs)
+                raise data_error
+            # limit 키는 실제로 기록된 뒤에만 캐시 (실패하면 다음 push에서 다시 기록)
+            self._topic_limits.update(written)
+            dropped = [entry[1:33].decode('ascii') for i in trimmed for entry in results[i] if entry.startswith(_CONTENT)]
+            if dropped:
+                submit(self._content.release, dropped)
+            self._ctrl.frames += len(refs)
+            self._ctrl.ok()
+            self._data.ok()
+        except CONNECTION_ERRORS as e:
+            self._failed(e)
         except Exception as e:
             print(f"DualRedisListBroker Push Error: {e}")
 
-    def pop(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
+    def _retract(self, blobs):
+        """Remove references whose blob write failed (already popped ones are skipped by pop)"""
+        try:
+            pipe = self.ctrl_redis.pipeline(transaction=False)
+            for topic, entry in blobs:
+                pipe.lrem(topic, -1, entry)
+            pipe.execute()
+        except Exception as e:
+            print(f"DualRedisListBroker Retract Error: {e}")
+
+    def _resolve(self, topic, entries) -> List[bytes]:
         """
-        Read frame_id from list (BLPOP), fetch data from Data Redis
-        For DURABLE QoS - processes all messages in order
+        Control entries -> frames (inline as-is, slot references with one MGET; overwritten/lost slots are skipped)
+        - content references: head + shared blob (taking it releases one reference)
+        - blobs still being written (waited at most BLOB_WAIT) are kept for the next pop of this topic
         """
-        self._ensure_connected()
+        wait = _blob_wait(self._data is self._ctrl)
+        refs = [entry for entry in entries if not entry.startswith((_INLINE, _CONTENT))]
+        digests = [entry[1:33].decode('ascii') for entry in entries if entry.startswith(_CONTENT)]
+        blobs = iter(_fetch_slots(self.data_redis, topic, refs, wait) if refs else [])
+        shared = iter(self._content.fetch(self.data_redis, digests, wait, consume=True) if digests else [])
+        frames = []
+        stalled = []
+        for entry in entries:
+            if entry.startswith(_INLINE):
+                frame = entry[1:]
+            elif entry.startswith(_CONTENT):
+                blob = next(shared)
+                frame = entry[33:] + blob if blob and blob is not PENDING else blob
+            else:
+                frame = next(blobs)
+            if frame is PENDING:
+                stalled.append(entry)
+            elif frame:
+                frames.append(frame)
+        self._stalled.resolved(entries, stalled)
+        kept = [entry for entry in stalled if self._stalled.retry(entry)]
+        if kept:
+            self._stalled_entries.setdefault(topic, []).extend(kept)
+        return frames
+
+    def _take_now(self, topic, count):
+        """Non-blocking: up to count references from the list head (LRANGE + LTRIM in one MULTI)"""
+        pipe = self.ctrl_redis.pipeline()
+        pipe.lrange(topic, 0, count - 1)
+        pipe.ltrim(topic, count, -1)
+        return pipe.execute()[0]
+
+    def subscriber_topic(self, topic: str, subscriber: str) -> str:
+        """LPOP은 꺼낸 구독자만 받으므로 구독자마다 별도 리스트 (blob은 공유)"""
+        return f"{topic}:{subscriber}"
+
+    def _pop(self, topic, timeout, prefetch):
+        if not self._ensure_connected():
+            self._wait(timeout)
+            return None
         
+        deadline = time.monotonic() + timeout
         try:
-            # BLPOP returns (key, value) or None
-            result = self.ctrl_redis.blpop([topic], timeout=timeout)
-            if not result:
-                return None
-            
-            frame_id = result[1].decode('utf-8')
-            
-            # Fetch actual data from Data Redis
-            data_key = f"{topic}:data:{frame_id}"
-            raw_data = self.data_redis.get(data_key)
-            
-            return raw_data if raw_data else None
-        except (redis.ConnectionError, redis.TimeoutError) as e:
-            print(f"⚠️ Redis connection lost in pop: {e}")
-            self.ctrl_redis = None
-            self.data_redis = None
+            while True:
+                # BLPOP + (prefetch) LPOP in one round trip: no MULTI, so BLPOP really blocks
+                # and LPOP runs right after it wakes up (returns the next entry or None)
+                # A reference still waiting for its blob does not hold up the list: take new ones without blocking
+                stalled = self._stalled_entries.pop(topic, [])
+                pipe = self.ctrl_redis.pipeline(transaction=False)
+                if stalled:
+                    pipe.lpop(topic)
+                else:
+                    pipe.blpop([topic], timeout=timeout)
+                if prefetch:
+                    pipe.lpop(topic)
+                result = pipe.execute()
+                self._ctrl.ok()
+                head = result[0] if stalled or not result[0] else result[0][1]
+                entries = stalled + [entry for entry in [head] + result[1:] if entry]
+                if not entries:
+                    return None
+
+                # Fetch blobs from Data Redis (skipped when every entry is inline)
+                frames = self._resolve(topic, entries)
+                if frames:
+                    break
+                # Only overwritten/expired slots: move on to the next entry within the same timeout
+                timeout = deadline - time.monotonic()
+                if timeout < 0.002:  # 0 would block forever
+                    return None
+            if len(frames) > 1:
+                self._prefetched.setdefault(topic, deque()).extend(frames[1:])
+            self._ctrl.frames += 1
+            return frames[0]
+        except CONNECTION_ERRORS as e:
+            self._failed(e)
             return None
         except Exception as e:
             print(f"DualRedisListBroker Pop Error: {e}")
             return None
 
+    def pop(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """
+        Read slot reference from list (BLPOP), fetch data from Data Redis
+        For DURABLE QoS - processes all messages in order
+        - one blocking round trip + at most one MGET; a prefetched frame is returned with no round trip
+        """
+        prefetched = self._prefetched.get(topic)
+        if prefetched:
+            self._ctrl.frames += 1
+            return prefetched.popleft()
+        return self._pop(topic, timeout, self.prefetch)
+
+    def pop_batch(self, topic: str, max_items: int, max_wait_ms: float, timeout: int = 1, **kwargs) -> List[bytes]:
+        """
+        Read up to max_items slot references, then fetch all blobs with one MGET
+        """
+        prefetched = self._prefetched.get(topic)
+        if prefetched:
+            batch = [prefetched.popleft() for _ in range(min(max_items, len(prefetched)))]
+            self._ctrl.frames += len(batch)
+            return batch
+        if not self._ensure_connected():
+            self._wait(timeout)
+            return []
+        try:
+            stalled = self._stalled_entries.pop(topic, [])
+            if stalled:
+                entries = stalled + self._take_now(topic, max_items)
+            else:
+                entries = _pop_list_batch(self.ctrl_redis, topic, max_items, max_wait_ms, timeout)
+            self._ctrl.ok()
+            if not entries:
+                return []
+            batch = self._resolve(topic, entries)
+            self._ctrl.frames += len(batch)
+            return batch
+        except CONNECTION_ERRORS as e:
+            self._failed(e)
+            return []
+        except Exception as e:
+            print(f"DualRedisListBroker PopBatch Error: {e}")
+            return []
+
     def pop_latest(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
         """
         [QoS: REALTIME] Get the latest message.
         - With list size=1 (set by REALTIME QoS), blpop effectively gets the latest
         - Uses true blocking (no polling overhead)
+        - No prefetch: a frame held locally would be stale by the next call
         """
-        self._ensure_connected()
-        
+        # BLPOP: True blocking, no CPU waste
+        # With REALTIME QoS, list size is 1, so this always gets the latest
+        return self._pop(topic, timeout, prefetch=False)
+
+    def pop_balanced(self, topic: str, max_lag, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """
+        [QoS: BALANCED] FIFO while the backlog is within max_lag, otherwise jump to the newest message
+        - BLPOP + LLEN in one round trip, then at most one MGET
+        - Jump: LRANGE + DEL (MULTI) on the references; skipped content references are released
+        """
+        if not self._ensure_connected():
+            self._wait(timeout)
+            return None
+        if self._stalled_entries.get(topic):
+            return self._pop(topic, timeout, prefetch=False)  # blob을 기다리던 reference부터
+
+        deadline = time.monotonic() + timeout
         try:
-            # BLPOP: True blocking, no CPU waste
-            # With REALTIME QoS, list size is 1, so this always gets the latest
-            result = self.ctrl_redis.blpop([topic], timeout=timeout)
-            if not result:
-                return None
-            
-            # Decode frame_id
-            frame_id = result[1].decode('utf-8') if isinstance(result[1], bytes) else result[1]
-            
-            # Fetch actual data from Data Redis
-            data_key = f"{topic}:data:{frame_id}"
-            raw_data = self.data_redis.get(data_key)
-            
-            return raw_data if raw_data else None
-        except (redis.ConnectionError, redis.TimeoutError) as e:
-            print(f"⚠️ Redis connection lost in pop_latest: {e}")
-            self.ctrl_redis = None
-            self.data_redis = None
+            while True:
+                pipe = self.ctrl_redis.pipeline(transaction=False)
+                pipe.blpop([topic], timeout=timeout)
+                pipe.llen(topic)
+                result, backlog = pipe.execute()
+                self._ctrl.ok()
+                if not result:
+                    return None
+                frames = self._resolve(topic, [result[1]])
+                if frames:
+                    break
+                timeout = deadline - time.monotonic()
+                if timeout < 0.002:  # 0 would block forever
+                    return None
+            data = frames[0]
+            if max_lag.exceeded(backlog + 1, peek_timestamp(data)):
+                pipe = self.ctrl_redis.pipeline()
+                pipe.lrange(topic, 0, -1)
+                pipe.delete(topic)
+                entries, _ = pipe.execute()
+                newest = self._resolve(topic, entries[-1:]) if entries else []
+                dropped = [entry[1:33].decode('ascii') for entry in entries[:-1] if entry.startswith(_CONTENT)]
+                if dropped:
+                    submit(self._content.release, dropped)
+                # 가져간 프레임 대신 최신 것을 반환 (최신 slot이 덮어써졌으면 가져간 프레임 그대로)
+                self.skipped_frames += len(entries)
+                if newest:
+                    data = newest[0]
+            self._ctrl.frames += 1
+            return data
+        except CONNECTION_ERRORS as e:
+            self._failed(e)
             return None
         except Exception as e:
-            print(f"DualRedisListBroker PopLatest Error: {e}")
+            print(f"DualRedisListBroker PopBalanced Error: {e}")
             return None
 
     def trim(self, topic: str, size: int = 1):
         """Set max size for a topic's list"""
-        self._ensure_connected()
         self._topic_limits[topic] = size
+        if not self._ctrl.available():
+            return
         try:
-            self.ctrl_redis.set(f"edgeflow:meta:limit:{topic}", size)
-            self.ctrl_redis.ltrim(topic, -size, -1)
+            pipe = self.ctrl_redis.pipeline()
+            set_limit(pipe, topic, size)
+            pipe.ltrim(topic, -size, -1)
+            pipe.execute()
+        except CONNECTION_ERRORS as e:
+            self._ctrl.failed(e)
         except Exception:
             pass
 
     def queue_size(self, topic: str) -> int:
         """Return list length"""
-        self._ensure_connected()
+        if not self._ctrl.available():
+            return 0
         try:
             return self.ctrl_redis.llen(topic)
+        except CONNECTION_ERRORS as e:
+            self._ctrl.failed(e, announce=False)
+            return 0
         except Exception:
             return 0
 
     def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
-        """Return stats for all tracked topics"""
-        self._ensure_connected()
+        """Return stats for all registered topics (cached for STATS_TTL)"""
+        cached = self._stats.get()
+        if cached is not None:
+            return cached
         stats = {}
+        if not self._ctrl.available():
+            return stats
         try:
-            meta_keys = self.ctrl_redis.keys("edgeflow:meta:limit:*")
-            
-            for key in meta_keys:
-                key_str = key.decode('utf-8')
-                topic = key_str.replace("edgeflow:meta:limit:", "")
-                
-                limit_bytes = self.ctrl_redis.get(key)
-                limit = int(limit_bytes) if limit_bytes else self.maxlen
-                current = self.ctrl_redis.llen(topic)
-                
-                stats[topic] = {"current": current, "max": limit}
+            # 토픽 registry + limit + 길이를 스크립트 한 번으로 (KEYS 스캔 없음)
+            stats = self._stats.put(parse_stats(self.ctrl_redis.eval(*stats_command("LLEN")), self.maxlen))
+        except CONNECTION_ERRORS as e:
+            self._ctrl.failed(e, announce=False)
         except Exception as e:
             print(f"DualRedisListBroker Stats Error: {e}")
         return stats
 
+    def get_io_stats(self) -> Dict[str, float]:
+        """round trips (Control + Data) / frames since start"""
+        self._ensure_connected()
+        return io_stats(self._ctrl, self._data)
+
     # ========== Serialization Protocol ==========
     
     def to_config(self) -> dict:
@@ -262,7 +745,10 @@ class DualRedisListBroker(BrokerInterface):
             "ctrl_port": self.ctrl_port,
             "data_host": self.data_host,
             "data_port": self.data_port,
-            "maxlen": self.maxlen
+            "maxlen": self.maxlen,
+            "inline_threshold": self.inline_threshold,
+            "prefetch": self.prefetch,
+            "content_addressed": self.content_addressed
         }
     
     @classmethod
@@ -272,5 +758,8 @@ class DualRedisListBroker(BrokerInterface):
             ctrl_port=config.get("ctrl_port"),
             data_host=config.get("data_host"),
             data_port=config.get("data_port"),
-            maxlen=config.get("maxlen", 100)
+            maxlen=config.get("maxlen", 100),
+            inline_threshold=config.get("inline_threshold", INLINE_THRESHOLD),
+            prefetch=config.get("prefetch", True),
+            content_addressed=config.get("content_addressed", False)
         )
@@ -1,62 +1,493 @@
-# edgeflow/comms/grpc.py
+# edgeflow/comms/brokers/grpc.py
+"""
+gRPC Streaming Broker (Redis 없이 노드 간 직접 전송)
+- .proto 없이 generic handler + bytes 메시지 사용 (Frame 패킷을 그대로 전송)
+- Publish: client-streaming RPC (엔드포인트당 영구 채널 + 스트림 1개로 모든 토픽 전송)
+- Subscribe: bidi-streaming RPC (토픽당 스트림 1개, 클라이언트가 보낸 credit 수만큼만 서버가 전송)
+- Latest: unary RPC (pop_latest 호출 시점에 서버 큐의 최신 프레임을 요청)
+- Flow Control: 송신/수신 양쪽 모두 메시지 수 기준 window로 제한
+  (window가 차면 push()가 대기 -> 생산자에게 back-pressure, HTTP/2 흐름 제어와 함께 동작)
+  (수신은 꺼낸 만큼만 credit을 돌려주므로 미리 받아둔 프레임 <= window, 나머지는 서버 큐(maxlen)에 남음)
+
+Topic -> Endpoint:
+- endpoints={"camera": "10.0.0.5:50051"} 로 지정, 없으면 default_endpoint
+- 구독 노드마다 별도 큐({topic}:{subscriber}, 같은 엔드포인트) -> 노드마다 모든 프레임, replicas끼리만 분배
+- 엔드포인트가 이 호스트의 port라면 처음 사용하는 프로세스가 서버를 띄워 토픽 큐를 호스팅
+  (나머지 프로세스는 클라이언트로 접속, 서버를 띄운 프로세스는 네트워크 없이 로컬 큐 사용)
+- Subscribe 스트림 하나가 서버 스레드 하나를 점유 -> max_streams를 넘는 스트림은 RESOURCE_EXHAUSTED로 거절
+  (클라이언트는 _RECONNECT_DELAY 후 재시도, 스레드 풀이 가득 차서 새 스트림이 영원히 대기하지 않도록)
+"""
 import queue
+import socket
+import struct
 import threading
+from collections import deque
+from concurrent import futures
+from typing import Dict, List, Optional
 from .base import BrokerInterface
+from ..frame import peek_timestamp
 
-# 검증 필요
-# 1. gRPC 서버가 실행할 실제 로직 (Servicer)
-class InternalReceiver(edgeflow_pb2_grpc.WorkerServicer):
-    def __init__(self, buffer):
-        self.buffer = buffer # 데이터를 넘겨줄 큐
-        
-    def SendData(self, request, context):
-        # 외부에서 gRPC로 데이터를 쏘면, 여기로 들어옴
-        # 데이터를 받아서 내부 큐(Buffer)에 쏙 집어넣음
-        self.buffer.put(request.data)
-        return edgeflow_pb2.Response(status="OK")
-
-# 2. 브로커 (위장막)
-class GrpcBroker(Broker):
-    def __init__(self, port=50051):
-        self.internal_buffer = queue.Queue() # [중요] 임시 저장소
-        
-        # 백그라운드에서 gRPC 서버 시동
-        self.server = grpc.server(...)
-        edgeflow_pb2_grpc.add_WorkerServicer_to_server(
-            InternalReceiver(self.internal_buffer), self.server
-        )
-        self.server.add_insecure_port(f'[::]:{port}')
-        
-        # 별도 스레드에서 서버 실행 (메인 스레드는 방해 안 받게)
-        t = threading.Thread(target=self.server.start, daemon=True)
-        t.start()
-
-    def push(self, topic, data):
-        # 1. [Channel] 누구한테 전화 걸지 주소 입력 (연결선 만들기)
-        # (주의: 실제로는 topic에 매핑된 Consumer의 IP를 찾아야 함)
-        target_address = "localhost:50051" 
-        
-        # with 구문을 쓰면 통신 끝나고 자동으로 연결을 끊어줌 (리소스 관리)
-        with grpc.insecure_channel(target_address) as channel:
-            
-            # 2. [Stub] 그쪽 서버의 함수 목록을 아는 '대리인' 생성
-            # "... " 부분이 바로 이 줄입니다!
-            stub = edgeflow_pb2_grpc.WorkerStub(channel)
-            
-            # 3. [Call] 대리인을 시켜서 원격 함수 실행 (데이터 전송)
-            # (데이터를 Protobuf 규격인 FrameData로 포장해서 보냄)
-            request_packet = edgeflow_pb2.FrameData(
-                topic=topic, 
-                payload=data
-            )
-            
-            # 실제 전송 발생!
-            response = stub.SendData(request_packet)
-
-    def pop(self, topic, timeout=0.1):
-        # ConsumerNode가 이 함수를 호출함
-        # 사실은 gRPC 서버가 받아둔 데이터를 큐에서 꺼내줌
+# [Optional] pip install grpcio
+try:
+    import grpc
+except ImportError:
+    grpc = None
+
+_SERVICE = "edgeflow.Broker"
+_PUBLISH = f"/{_SERVICE}/Publish"
+_SUBSCRIBE = f"/{_SERVICE}/Subscribe"
+_LATEST = f"/{_SERVICE}/Latest"
+
+# Publish 메시지: limit(uint32) | topic_len(uint16) | topic | packet
+_MSG_HEADER = struct.Struct('!IH')
+# Subscribe 요청: credits(uint32) [+ topic: 첫 메시지만]
+# Latest 요청: wait_ms(uint32) + topic -> 응답: 최신 packet (없으면 b"")
+_CREDIT = struct.Struct('!I')
+
+_MAX_MESSAGE = 64 * 1024 * 1024  # 1080p raw(약 6MB)도 전송 가능하도록 (gRPC 기본값 4MB)
+_CHANNEL_OPTIONS = [
+    ("grpc.max_send_message_length", _MAX_MESSAGE),
+    ("grpc.max_receive_message_length", _MAX_MESSAGE),
+]
+_RECONNECT_DELAY = 1.0
+_LATEST_MARGIN = 1.0  # Latest 호출 deadline = 서버 대기 시간 + 네트워크 여유
+_LOCAL_HOSTS = {"localhost", "127.0.0.1", "0.0.0.0", "[::]"}
+
+
+def _port_free(port):
+    """gRPC bind 실패 로그를 피하기 위해 먼저 확인 (경합 시에는 add_insecure_port 실패로 처리)"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # TIME_WAIT은 무시 (LISTEN 중이면 실패)
+        try:
+            sock.bind(("0.0.0.0", port))
+        except OSError:
+            return False
+    return True
+
+
+class _TopicQueue:
+    """서버 측 토픽 큐 (maxlen 초과 시 오래된 것부터 버림 = LTRIM)"""
+
+    def __init__(self, maxlen):
+        self.items = deque(maxlen=maxlen)
+        self.cond = threading.Condition()
+
+    def put(self, item, maxlen=None):
+        with self.cond:
+            if maxlen and maxlen != self.items.maxlen:
+                self.items = deque(self.items, maxlen=maxlen)
+            self.items.append(item)
+            self.cond.notify()
+
+    def get(self, timeout, latest=False):
+        with self.cond:
+            if not self.items:
+                self.cond.wait_for(lambda: self.items, timeout)
+            if not self.items:
+                return None
+            if latest:
+                item = self.items.pop()
+                self.items.clear()
+                return item
+            return self.items.popleft()
+
+    def get_balanced(self, timeout, max_lag):
+        """순서대로 꺼내되 밀린 정도가 max_lag를 넘으면 최신 것만 -> (item, 건너뛴 수)"""
+        with self.cond:
+            if not self.items:
+                self.cond.wait_for(lambda: self.items, timeout)
+            if not self.items:
+                return None, 0
+            item = self.items.popleft()
+            if not self.items or not max_lag.exceeded(len(self.items) + 1, peek_timestamp(item)):
+                return item, 0
+            skipped = len(self.items)
+            item = self.items.pop()
+            self.items.clear()
+            return item, skipped
+
+
+class _TopicServer:
+    """토픽 큐 호스팅 서버 (Publish로 받고 Subscribe로 내보냄)"""
+
+    def __init__(self, maxlen, max_streams=64):
+        self.maxlen = maxlen
+        self.topics = {}  # topic -> _TopicQueue
+        self.lock = threading.Lock()
+        # so_reuseport=0: 같은 포트를 다른 프로세스가 이미 호스팅 중이면 bind 실패해야 함
+        options = _CHANNEL_OPTIONS + [("grpc.so_reuseport", 0)]
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_streams), options=options,
+                                  maximum_concurrent_rpcs=max_streams)
+        handler = grpc.method_handlers_generic_handler(_SERVICE, {
+            "Publish": grpc.stream_unary_rpc_method_handler(self._publish),
+            "Subscribe": grpc.stream_stream_rpc_method_handler(self._subscribe),
+            "Latest": grpc.unary_unary_rpc_method_handler(self._latest),
+        })
+        self.server.add_generic_rpc_handlers((handler,))
+
+    def start(self, port):
+        """bind 실패(다른 프로세스가 이미 호스팅 중) 시 False"""
+        if not _port_free(port):
+            return False
         try:
-            return self.internal_buffer.get(timeout=timeout)
+            if not self.server.add_insecure_port(f"[::]:{port}"):
+                return False
+        except RuntimeError:
+            return False
+        self.server.start()
+        return True
+
+    def stop(self):
+        self.server.stop(grace=None)
+
+    def topic(self, name):
+        q = self.topics.get(name)
+        if q is None:
+            with self.lock:
+                q = self.topics.setdefault(name, _TopicQueue(self.maxlen))
+        return q
+
+    def _publish(self, request_iterator, context):
+        for message in request_iterator:
+            limit, topic_len = _MSG_HEADER.unpack_from(message)
+            offset = _MSG_HEADER.size
+            topic = message[offset:offset + topic_len].decode('utf-8')
+            self.topic(topic).put(memoryview(message)[offset + topic_len:], limit)
+        return b""
+
+    def _subscribe(self, request_iterator, context):
+        """받은 credit만큼만 꺼내서 전송 (credit이 없으면 프레임은 큐에 남아 maxlen이 적용됨)"""
+        q = None
+        for message in request_iterator:
+            credits, = _CREDIT.unpack_from(message)
+            if q is None:
+                q = self.topic(message[_CREDIT.size:].decode('utf-8'))
+            while credits and context.is_active():
+                item = q.get(timeout=0.5)
+                if item is not None:
+                    credits -= 1
+                    yield bytes(item)
+
+    def _latest(self, request, context):
+        wait_ms, = _CREDIT.unpack_from(request)
+        item = self.topic(request[_CREDIT.size:].decode('utf-8')).get(wait_ms / 1000, latest=True)
+        return bytes(item) if item is not None else b""
+
+
+class _PublishStream:
+    """엔드포인트 하나로 가는 영구 client-streaming 호출 (끊기면 재연결)"""
+
+    def __init__(self, channel, window, stopped):
+        self.outbox = queue.Queue(maxsize=window)
+        self.stopped = stopped
+        self.call = channel.stream_unary(_PUBLISH)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _messages(self):
+        while not self.stopped.is_set():
+            try:
+                yield self.outbox.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def _run(self):
+        while not self.stopped.is_set():
+            try:
+                self.call(self._messages(), wait_for_ready=True)
+            except grpc.RpcError as e:
+                if not self.stopped.is_set():
+                    print(f"⚠️ [GrpcBroker] Publish stream lost ({e.code().name}). Reconnecting...")
+            self.stopped.wait(_RECONNECT_DELAY)
+
+
+class _Subscription:
+    """토픽 하나를 순서대로 받는 영구 bidi-streaming 호출 (credit 방식: window만큼만 미리 받아둠)"""
+
+    def __init__(self, channel, topic, window, stopped):
+        self.inbox = queue.Queue()
+        self.window = window
+        self.stopped = stopped
+        self.topic = topic.encode('utf-8')
+        self.cond = threading.Condition()
+        self.held = 0  # 받았지만 아직 꺼내지 않은 프레임 수
+        self.returned = 0  # 꺼내서 서버에 돌려줄 credit 수
+        self.call = channel.stream_stream(_SUBSCRIBE)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def get(self, timeout):
+        """inbox에서 하나 꺼내고 credit 1개를 돌려줌"""
+        try:
+            packet = self.inbox.get(timeout=timeout) if timeout else self.inbox.get_nowait()
         except queue.Empty:
-            return None
\ No newline at end of file
+            return None
+        with self.cond:
+            self.held -= 1
+            self.returned += 1
+            self.cond.notify()
+        return packet
+
+    def _requests(self):
+        # 재연결 시 이전 스트림의 credit은 사라지므로 아직 꺼내지 않은 것만 빼고 다시 요청
+        with self.cond:
+            self.returned = 0
+            credits = self.window - self.held
+        yield _CREDIT.pack(max(credits, 0)) + self.topic
+        while not self.stopped.is_set():
+            with self.cond:
+                self.cond.wait_for(lambda: self.returned, 0.5)
+                credits, self.returned = self.returned, 0
+            if credits:
+                yield _CREDIT.pack(credits)
+
+    def _run(self):
+        while not self.stopped.is_set():
+            try:
+                for packet in self.call(self._requests(), wait_for_ready=True):
+                    with self.cond:
+                        self.held += 1
+                    self.inbox.put(packet)
+            except grpc.RpcError as e:
+                if not self.stopped.is_set():
+                    print(f"⚠️ [GrpcBroker] Subscribe stream lost ({e.code().name}). Reconnecting...")
+            self.stopped.wait(_RECONNECT_DELAY)
+
+
+class GrpcBroker(BrokerInterface):
+    """
+    gRPC Streaming Broker:
+    - 중앙 Redis 없이 생산자/소비자 간 직접 스트리밍 (토픽 큐는 엔드포인트 서버가 보관)
+    - 같은 엔드포인트의 토픽들은 채널/Publish 스트림을 공유
+    """
+
+    def __init__(self, endpoints=None, default_endpoint="localhost:50051", port=50051,
+                 window=8, push_timeout=1.0, maxlen=100, max_streams=64):
+        if grpc is None:
+            raise ImportError("GrpcBroker requires 'grpcio' (pip install grpcio)")
+        self.endpoints = dict(endpoints or {})
+        self.default_endpoint = default_endpoint
+        self.port = port  # 이 프로세스가 호스팅할 수 있는 포트 (None이면 클라이언트 전용)
+        self.window = window
+        self.push_timeout = push_timeout
+        self.maxlen = maxlen
+        self.max_streams = max_streams  # 호스팅 서버의 동시 스트림 수 (Publish: 클라이언트 프로세스당 1, Subscribe: 토픽/모드당 1)
+
+        self._server = None  # 이 프로세스가 호스팅 중이면 _TopicServer
+        self._server_tried = False
+        self._channels = {}  # endpoint -> grpc.Channel
+        self._publishers = {}  # endpoint -> _PublishStream
+        self._subscriptions = {}  # topic -> _Subscription (FIFO)
+        self._latest_calls = {}  # endpoint -> Latest unary callable
+        self._topic_limits = {}  # topic -> queue size (trim)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    # ========== Endpoint Resolution ==========
+
+    def resolve(self, topic):
+        """topic -> "host:port" ({topic}:{subscriber}는 원래 토픽의 엔드포인트)"""
+        endpoint = self.endpoints.get(topic)
+        if endpoint is None:
+            endpoint = self.endpoints.get(topic.rpartition(':')[0], self.default_endpoint)
+        return endpoint
+
+    def subscriber_topic(self, topic: str, subscriber: str) -> str:
+        """서버 큐는 꺼낸 구독자만 받으므로 구독 노드마다 별도 큐"""
+        return f"{topic}:{subscriber}"
+
+    def _is_local(self, endpoint):
+        """엔드포인트가 이 호스트의 port인지"""
+        host, _, port = endpoint.rpartition(':')
+        return self.port is not None and int(port) == self.port and host in _LOCAL_HOSTS | {socket.gethostname()}
+
+    def _local_server(self, endpoint):
+        """로컬 엔드포인트면 서버 호스팅 시도 (한 번만) -> 성공 시 _TopicServer"""
+        if not self._is_local(endpoint):
+            return None
+        if self._server is not None or self._server_tried:
+            return self._server
+        self._server_tried = True
+        server = _TopicServer(self.maxlen, self.max_streams)
+        if server.start(self.port):
+            self._server = server
+            print(f"📡 [GrpcBroker] Hosting topics on :{self.port}")
+        return self._server
+
+    def _hosted(self, topic):
+        """로컬 서버가 호스팅하는 토픽이면 그 큐 (아니면 None)"""
+        endpoint = self.resolve(topic)
+        with self._lock:
+            server = self._local_server(endpoint)
+        return server.topic(topic) if server is not None else None
+
+    def _channel(self, endpoint):
+        channel = self._channels.get(endpoint)
+        if channel is None:
+            channel = grpc.insecure_channel(endpoint, options=_CHANNEL_OPTIONS)
+            self._channels[endpoint] = channel
+        return channel
+
+    # ========== Push ==========
+
+    def push(self, topic: str, data: bytes):
+        if not data:
+            return
+        self.push_buffers(topic, [data])
+
+    def push_buffers(self, topic: str, buffers: List[bytes]):
+        limit = self._topic_limits.get(topic, self.maxlen)
+        local = self._hosted(topic)
+        if local is not None:
+            local.put(b"".join(buffers), limit)
+            return
+
+        endpoint = self.resolve(topic)
+        with self._lock:
+            stream = self._publishers.get(endpoint)
+            if stream is None:
+                stream = _PublishStream(self._channel(endpoint), self.window, self._stopped)
+                self._publishers[endpoint] = stream
+
+        topic_bytes = topic.encode('utf-8')
+        message = b"".join([_MSG_HEADER.pack(limit, len(topic_bytes)), topic_bytes, *buffers])
+        try:
+            # window가 가득 차면 대기 (back-pressure), push_timeout 후에는 이번 프레임을 버림
+            stream.outbox.put(message, timeout=self.push_timeout)
+        except queue.Full:
+            print(f"⚠️ [GrpcBroker] Publish window full for '{topic}' ({endpoint}). Frame dropped.")
+
+    # ========== Pop ==========
+
+    def _subscription(self, topic):
+        with self._lock:
+            sub = self._subscriptions.get(topic)
+            if sub is None:
+                sub = _Subscription(self._channel(self.resolve(topic)), topic, self.window, self._stopped)
+                self._subscriptions[topic] = sub
+        return sub
+
+    def pop(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """[QoS: DURABLE] 서버 큐에서 순서대로 (replicas 간 분배)"""
+        local = self._hosted(topic)
+        if local is not None:
+            item = local.get(timeout)
+            return bytes(item) if item is not None else None
+        return self._subscription(topic).get(timeout)
+
+    def pop_latest(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """
+        [QoS: REALTIME] 호출 시점에 서버 큐의 최신 프레임만 받고 나머지는 버림
+        - 미리 받아두지 않음 (스트림으로 받아두면 버퍼에 쌓인 오래된 프레임을 돌려주게 됨)
+        """
+        local = self._hosted(topic)
+        if local is not None:
+            item = local.get(timeout, latest=True)
+            return bytes(item) if item is not None else None
+
+        endpoint = self.resolve(topic)
+        with self._lock:
+            call = self._latest_calls.get(endpoint)
+            if call is None:
+                call = self._channel(endpoint).unary_unary(_LATEST)
+                self._latest_calls[endpoint] = call
+        request = _CREDIT.pack(int(timeout * 1000)) + topic.encode('utf-8')
+        try:
+            # 서버가 없으면 wait_for_ready로 deadline까지 대기 (재시도 루프가 바쁘게 돌지 않도록)
+            return call(request, timeout=timeout + _LATEST_MARGIN, wait_for_ready=True) or None
+        except grpc.RpcError:
+            return None
+
+    def pop_balanced(self, topic: str, max_lag, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """
+        [QoS: BALANCED] 순서대로, 밀린 정도가 max_lag를 넘으면 최신 것만
+        - 로컬 토픽: 서버 큐 기준 (한 번의 락 안에서 판단)
+        - 원격 토픽: 서버 큐 길이는 알 수 없으므로 이미 받아둔 수신 버퍼(window) 기준
+        """
+        local = self._hosted(topic)
+        if local is not None:
+            item, skipped = local.get_balanced(timeout, max_lag)
+            self.skipped_frames += skipped
+            return bytes(item) if item is not None else None
+
+        sub = self._subscription(topic)
+        data = sub.get(timeout)
+        if data is None:
+            return None
+        if not max_lag.exceeded(sub.held + 1, peek_timestamp(data)):
+            return data
+        skipped = 0
+        while True:
+            packet = sub.get(0)
+            if packet is None:
+                break
+            latest = packet
+            skipped += 1
+        if skipped:
+            self.skipped_frames += skipped
+            data = latest
+        return data
+
+    # ========== Queue Management ==========
+
+    def trim(self, topic: str, size: int = 1):
+        """토픽 큐 크기 (다음 Publish 메시지와 함께 서버에 전달)"""
+        self._topic_limits[topic] = size
+
+    def queue_size(self, topic: str) -> int:
+        """로컬 서버가 호스팅하는 토픽만 알 수 있음 (그 외 0)"""
+        if self._server is None:
+            return 0
+        q = self._server.topics.get(topic)
+        return len(q.items) if q else 0
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """Return stats for topics hosted by this process"""
+        if self._server is None:
+            return {}
+        return {topic: {"current": len(q.items), "max": q.items.maxlen}
+                for topic, q in list(self._server.topics.items())}
+
+    def reset(self):
+        """Reset Broker State (이 프로세스가 호스팅 중인 토픽 큐 비우기)"""
+        if self._server is not None:
+            self._server.topics.clear()
+
+    def close(self):
+        """채널/서버 정리"""
+        self._stopped.set()
+        for channel in self._channels.values():
+            channel.close()
+        self._channels.clear()
+        self._publishers.clear()
+        self._subscriptions.clear()
+        self._latest_calls.clear()
+        if self._server is not None:
+            self._server.stop()
+            self._server = None
+
+    # ========== Serialization Protocol ==========
+
+    def to_config(self) -> dict:
+        return {
+            "__class_path__": f"{self.__class__.__module__}.{self.__class__.__name__}",
+            "endpoints": self.endpoints,
+            "default_endpoint": self.default_endpoint,
+            "port": self.port,
+            "window": self.window,
+            "push_timeout": self.push_timeout,
+            "maxlen": self.maxlen,
+            "max_streams": self.max_streams
+        }
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'GrpcBroker':
+        return cls(
+            endpoints=config.get("endpoints"),
+            default_endpoint=config.get("default_endpoint", "localhost:50051"),
+            port=config.get("port", 50051),
+            window=config.get("window", 8),
+            push_timeout=config.get("push_timeout", 1.0),
+            maxlen=config.get("maxlen", 100),
+            max_streams=config.get("max_streams", 64)
+        )
@@ -1,114 +1,377 @@
 #edgeflow/comms/brokers/hybrid.py
-import zmq
-import threading
-import pickle
+"""
+Hybrid Broker (Control: Redis / Data: ZeroMQ)
+- 프레임 bytes는 Redis를 거치지 않고 ZeroMQ로 노드 간 직접 전송
+- Control Redis에는 토픽별 endpoint(발행자 주소)만 등록 -> 수신 측이 조회 후 connect
+- Frame.to_buffers()의 header/meta/payload를 multipart로 그대로 전송 (copy=False, 이어 붙이지 않음)
+
+QoS별 소켓 패턴:
+- REALTIME (pop_latest): PUB/SUB - 모든 구독자가 모든 프레임을 받고, 밀린 프레임은 버리고 최신만 처리
+  (QoS.REALTIME의 'latest only, no consumer group' 의미. replicas 간 부하 분산은 하지 않음)
+- DURABLE/BALANCED (pop): PUSH/PULL - replicas 간 라운드로빈 분배, trim 크기만큼 큐잉 (HWM)
+  (BALANCED는 이 소켓에 도착해 있는 프레임이 max_lag를 넘으면 최신 것만 처리)
+- 구독 노드마다 별도 토픽({topic}:{subscriber}) -> 서로 다른 노드는 각자 모든 프레임을 받고,
+  같은 노드의 replicas만 그 노드의 PUSH 소켓을 나눠 받음
+
+Redis Keys:
+- edgeflow:zmq:pub:{topic}:{subscriber}  (SET) PUB endpoint 목록
+- edgeflow:zmq:push:{topic}:{subscriber} (SET) PUSH endpoint 목록
+- edgeflow:zmq:alive:{endpoint}          (STRING, TTL) 발행자 heartbeat
+  (push하는 동안 갱신, 만료된 endpoint는 디스커버리 때 목록에서 삭제 -> 죽은 발행자가 남지 않음)
+"""
+import os
 import time
+import socket
 from collections import deque
-from .base import BrokerInterface
-from .redis_broker import RedisBroker # 기존 브로커 상속 혹은 포함
+import redis
+from typing import Dict, List, Optional
+from .base import BrokerInterface, coalesce_buffers
+from .connection import RedisConnection, StatsCache, parse_stats, set_limit, stats_command
+from ..frame import peek_timestamp
+from ...config import settings
+
+# [Optional] pip install pyzmq (pip install edgeflow[zmq])
+try:
+    import zmq
+except ImportError:
+    zmq = None
+
+_DISCOVERY_INTERVAL = 1.0  # endpoint 재조회 간격 (초)
+_REALTIME_HWM = 2  # SUB 수신 큐 (최신만 필요하므로 작게)
+_ENDPOINT_TTL = 10  # 발행자 heartbeat 만료 (초), push 중 TTL/3마다 갱신
+_ALIVE_PREFIX = "edgeflow:zmq:alive:"
+
+# endpoint 목록 중 heartbeat가 살아 있는 것만 반환, 만료된 것은 목록에서 삭제 (왕복 1회)
+_DISCOVER_SCRIPT = """
+local live = {}
+for _, endpoint in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    if redis.call('EXISTS', ARGV[1] .. endpoint) == 1 then
+        live[#live + 1] = endpoint
+    else
+        redis.call('SREM', KEYS[1], endpoint)
+    end
+end
+return live
+"""
+
+
+def _default_advertise_host():
+    """다른 노드가 접속할 주소 (K8s: POD_IP, 그 외: 호스트 IP)"""
+    host = os.getenv("ZMQ_ADVERTISE_HOST") or os.getenv("POD_IP")
+    if host:
+        return host
+    try:
+        return socket.gethostbyname(socket.gethostname())
+    except OSError:
+        return "127.0.0.1"
+
 
 class HybridBroker(BrokerInterface):
-    def __init__(self, redis_host='localhost', redis_port=6379, zmq_port=5555):
-        # 1. Redis 연결 (신호용)
-        self.redis = RedisBroker(host=redis_host, port=redis_port)
-        
-        # 2. ZMQ 설정 (데이터용)
-        self.context = zmq.Context()
-        
-        # [송신용] PUB 소켓 (데이터 뿌리기)
-        self.pub_socket = self.context.socket(zmq.PUB)
-        self.pub_socket.bind(f"tcp://*:{zmq_port}")
-        
-        # [수신용] SUB 소켓 (데이터 받기)
-        self.sub_socket = self.context.socket(zmq.SUB)
-        # 실제 분산 환경에선 프로듀서 IP를 적어야 함 (여기선 로컬 가정)
-        self.sub_socket.connect(f"tcp://localhost:{zmq_port}") 
-        self.sub_socket.setsockopt_string(zmq.SUBSCRIBE, "") # 모든 토픽 수신
-        
-        # 3. 데이터 버퍼 (ID: Data 매핑용)
-        self.local_buffer = {} 
-        self.buffer_lock = threading.Lock()
-        
-        # 4. 백그라운드 수신 스레드 시작
-        self.running = True
-        self.listener = threading.Thread(target=self._zmq_listener, daemon=True)
-        self.listener.start()
-
-    def _zmq_listener(self):
-        """백그라운드에서 ZMQ 데이터를 계속 받아서 버퍼에 저장"""
-        while self.running:
+    """
+    Hybrid Broker:
+    - ctrl_redis: endpoint 디스커버리 + 큐 크기 메타데이터
+    - ZeroMQ: 실제 프레임 데이터 (토픽별 PUB + PUSH 소켓을 발행 프로세스에서 bind)
+    """
+
+    def __init__(self, ctrl_host=None, ctrl_port=None, advertise_host=None, maxlen=100):
+        if zmq is None:
+            raise ImportError("HybridBroker requires 'pyzmq' (pip install pyzmq)")
+        self.ctrl_host = ctrl_host or settings.REDIS_HOST
+        self.ctrl_port = ctrl_port or settings.REDIS_PORT
+        self._advertise_host = advertise_host  # None이면 프로세스(호스트)마다 자동 감지
+        self.advertise_host = advertise_host or _default_advertise_host()
+        self.maxlen = maxlen
+
+        self._ctrl = RedisConnection(self.ctrl_host, self.ctrl_port, "Control Redis")  # 공유 pool
+        self.ctrl_redis = self._ctrl.client
+        # Context/소켓은 처음 사용할 때 생성 (fork 이후 자식 프로세스에서 만들어야 안전)
+        self._context = None
+        self._publishers = {}  # topic -> (pub_socket, push_socket)
+        self._endpoints = {}  # topic -> (pub endpoint, push endpoint)
+        self._heartbeats = {}  # topic -> 마지막 등록 시각
+        self._subscribers = {}  # (kind, topic) -> [socket, connected endpoints, last discovery time]
+        self._topic_limits = {}  # topic -> queue size (trim)
+        self._received = {}  # topic -> PULL 소켓에서 꺼내둔 multipart (BALANCED backlog)
+        self._stats = StatsCache()
+        self._discover = self.ctrl_redis.register_script(_DISCOVER_SCRIPT)
+
+    @property
+    def context(self):
+        if self._context is None:
+            self._context = zmq.Context()
+        return self._context
+
+    # ========== Publisher (push) ==========
+
+    def _publisher(self, topic):
+        sockets = self._publishers.get(topic)
+        if sockets is None:
+            pub = self.context.socket(zmq.PUB)
+            pub.setsockopt(zmq.SNDHWM, _REALTIME_HWM)
+            push = self.context.socket(zmq.PUSH)
+            push.setsockopt(zmq.SNDHWM, self._topic_limits.get(topic, self.maxlen))
+            push.setsockopt(zmq.LINGER, 0)
+            pub.setsockopt(zmq.LINGER, 0)
+
+            pub_port = pub.bind_to_random_port("tcp://*")
+            push_port = push.bind_to_random_port("tcp://*")
+
+            sockets = (pub, push)
+            self._publishers[topic] = sockets
+            self._endpoints[topic] = (f"tcp://{self.advertise_host}:{pub_port}",
+                                      f"tcp://{self.advertise_host}:{push_port}")
+            self._register(topic)
+            print(f"📡 [HybridBroker] Publishing '{topic}' on {self.advertise_host} (PUB:{pub_port}, PUSH:{push_port})")
+        elif time.monotonic() - self._heartbeats.get(topic, 0.0) >= _ENDPOINT_TTL / 3:
+            try:
+                self._register(topic)
+            except (redis.ConnectionError, redis.TimeoutError) as e:
+                print(f"⚠️ Control Redis unavailable in heartbeat: {e}")  # 프레임은 계속 전송
+        return sockets
+
+    def _register(self, topic):
+        """endpoint 등록 + heartbeat 갱신 (reset 등으로 목록에서 빠졌어도 다시 등록됨)"""
+        pub_endpoint, push_endpoint = self._endpoints[topic]
+        self._heartbeats[topic] = time.monotonic()  # 실패해도 TTL/3 뒤에 다시 시도
+        pipe = self.ctrl_redis.pipeline()
+        pipe.sadd(f"edgeflow:zmq:pub:{topic}", pub_endpoint)
+        pipe.sadd(f"edgeflow:zmq:push:{topic}", push_endpoint)
+        pipe.set(f"{_ALIVE_PREFIX}{pub_endpoint}", 1, ex=_ENDPOINT_TTL)
+        pipe.set(f"{_ALIVE_PREFIX}{push_endpoint}", 1, ex=_ENDPOINT_TTL)
+        pipe.execute()
+
+    def push(self, topic: str, data: bytes):
+        if not data:
+            return
+        self.push_buffers(topic, [data])
+
+    def push_buffers(self, topic: str, buffers: List[bytes]):
+        """
+        [topic, header+meta..., payload] multipart 전송 (payload는 copy=False)
+        - PUB: 구독자가 없거나 느리면 ZeroMQ가 버림 (REALTIME)
+        - PUSH: 모든 PULL 큐(HWM)가 가득 차면 이번(가장 새) 프레임을 버림 (송신 측이 막히지 않음)
+          LTRIM과 달리 오래된 프레임이 큐에 남음 (ZeroMQ는 이미 큐에 들어간 메시지를 뺄 수 없음),
+          최신 프레임이 필요하면 REALTIME(PUB/SUB) 또는 BALANCED(max_lag)를 사용
+        """
+        parts = coalesce_buffers(buffers)
+        if not parts:
+            return
+        message = [topic.encode('utf-8')] + parts
+        try:
+            pub, push = self._publisher(topic)
+            pub.send_multipart(message, copy=False)
             try:
-                # ZMQ 패킷 구조: [Topic, Frame_ID, Data]
-                # 여기선 간단히 pickle로 통째로 받았다고 가정
-                raw_msg = self.sub_socket.recv(flags=zmq.NOBLOCK)
-                payload = pickle.loads(raw_msg)
-                
-                frame_id = payload['frame_id']
-                topic = payload['topic']
-                
-                with self.buffer_lock:
-                    # 버퍼에 저장 (키: "topic:frame_id")
-                    key = f"{topic}:{frame_id}"
-                    self.local_buffer[key] = payload['data']
-                    
-                    # (옵션) 버퍼 관리: 너무 오래된 데이터 삭제 로직 필요
-                    
+                push.send_multipart(message, flags=zmq.NOBLOCK, copy=False)
             except zmq.Again:
-                time.sleep(0.001) # 데이터 없으면 잠깐 쉼
-            except Exception as e:
-                print(f"ZMQ Error: {e}")
+                pass  # PULL 측이 없거나 큐가 가득 참
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            print(f"⚠️ Control Redis unavailable in push: {e}")
+        except Exception as e:
+            print(f"HybridBroker Push Error: {e}")
 
-    def push(self, topic, frame_bytes):
+    # ========== Subscriber (pop) ==========
+
+    def subscriber_topic(self, topic: str, subscriber: str) -> str:
+        """PUSH는 연결된 PULL끼리 라운드로빈하므로 구독 노드마다 별도 소켓 (replicas는 공유)"""
+        return f"{topic}:{subscriber}"
+
+    def _subscriber(self, kind, topic):
         """
-        데이터는 ZMQ로, 신호는 Redis로!
+        kind='pub' -> SUB 소켓, 'push' -> PULL 소켓 (endpoint는 주기적으로 재조회)
+        - heartbeat가 만료된 발행자는 목록에서 지워짐 (새 구독자는 연결하지 않음)
+          이미 맺은 연결은 유지: 드물게 push하는 발행자가 잠시 만료돼도 프레임을 잃지 않음
         """
-        # 1. 프레임 바이트에서 ID 추출 (구조체 파싱 필요하지만 여기선 가정)
-        # 실제론 Frame 객체를 받거나, bytes 앞부분 헤더를 읽어야 함
-        # 편의상 frame_bytes가 딕셔너리라고 가정하고 설명합니다.
-        # 실제 구현시엔 Frame.from_bytes()를 잠깐 해서 ID만 따야 함.
-        
-        # 예시 데이터 구조: {'frame_id': 100, 'topic': 'cam', 'data': ...}
-        import pickle
-        frame_obj = pickle.loads(frame_bytes) # (비효율적이지만 예시를 위해)
-        frame_id = frame_obj.frame_id
-        
-        # 2. Heavy Data -> ZMQ Broadcast
-        payload = {
-            'topic': topic,
-            'frame_id': frame_id,
-            'data': frame_bytes # 통째로 전송
-        }
-        self.pub_socket.send(pickle.dumps(payload))
-        
-        # 3. Light Signal -> Redis Queue
-        # Redis에는 "ID"만 보냄 (아주 가벼움!)
-        signal = f"{frame_id}".encode('utf-8')
-        self.redis.push(topic, signal)
-
-    def pop(self, topic, timeout=0.1):
+        key = (kind, topic)
+        entry = self._subscribers.get(key)
+        if entry is None:
+            if kind == "pub":
+                sock = self.context.socket(zmq.SUB)
+                sock.setsockopt(zmq.RCVHWM, _REALTIME_HWM)
+                sock.setsockopt(zmq.SUBSCRIBE, topic.encode('utf-8'))
+            else:
+                sock = self.context.socket(zmq.PULL)
+                sock.setsockopt(zmq.RCVHWM, self._topic_limits.get(topic, self.maxlen))
+            sock.setsockopt(zmq.LINGER, 0)
+            entry = [sock, set(), 0.0]
+            self._subscribers[key] = entry
+
+        sock, connected, last = entry
+        now = time.monotonic()
+        # 아직 발행자가 없으면 매번, 있으면 주기적으로 재조회 (replicas/재시작된 발행자 반영)
+        if not connected or now - last >= _DISCOVERY_INTERVAL:
+            entry[2] = now
+            try:
+                endpoints = {e.decode('utf-8') for e in self._discover(keys=[f"edgeflow:zmq:{kind}:{topic}"],
+                                                                        args=[_ALIVE_PREFIX])}
+            except (redis.ConnectionError, redis.TimeoutError) as e:
+                print(f"⚠️ Control Redis unavailable in discovery: {e}")
+                return sock  # 조회 실패: 기존 연결 유지
+            for endpoint in endpoints - connected:
+                sock.connect(endpoint)
+                connected.add(endpoint)
+        return sock
+
+    @staticmethod
+    def _join(frames):
+        """수신 multipart -> 패킷 bytes (topic 프레임 제외)"""
+        if len(frames) == 2:
+            return frames[1].bytes
+        return b"".join(f.buffer for f in frames[1:])
+
+    def _wait(self, sock, timeout):
+        """timeout(초) 동안 수신 대기 (busy-polling 없이 zmq poll로 블로킹)"""
+        return sock.poll(int(timeout * 1000) if timeout else 0, zmq.POLLIN)
+
+    def pop(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """[QoS: DURABLE] PULL - 순서대로, replicas 간 분배"""
+        try:
+            sock = self._subscriber("push", topic)
+            if not self._wait(sock, timeout):
+                return None
+            return self._join(sock.recv_multipart(copy=False))
+        except Exception as e:
+            print(f"HybridBroker Pop Error: {e}")
+            return None
+
+    def pop_latest(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """[QoS: REALTIME] SUB - 쌓인 프레임을 모두 비우고 가장 최신 것만 반환"""
+        try:
+            sock = self._subscriber("pub", topic)
+            if not self._wait(sock, timeout):
+                return None
+            frames = sock.recv_multipart(copy=False)
+            while True:
+                try:
+                    frames = sock.recv_multipart(flags=zmq.NOBLOCK, copy=False)
+                except zmq.Again:
+                    break
+            return self._join(frames)
+        except Exception as e:
+            print(f"HybridBroker PopLatest Error: {e}")
+            return None
+
+    def pop_balanced(self, topic: str, max_lag, timeout: int = 1, **kwargs) -> Optional[bytes]:
         """
-        Redis에서 신호(ID)를 받고, 로컬 버퍼에서 데이터를 찾음
+        [QoS: BALANCED] PULL - 순서대로, 밀린 정도가 max_lag를 넘으면 최신 것만
+        - ZeroMQ는 큐 길이를 노출하지 않으므로 소켓에 이미 도착한 프레임을 모두 꺼내서 backlog로 사용
+          (PUSH가 이 replica에 분배한 프레임이므로 다른 replica의 몫은 건드리지 않음)
         """
-        # 1. Redis에서 티켓(ID) 꺼내기
-        signal = self.redis.pop(topic, timeout=timeout)
-        if not signal:
+        try:
+            sock = self._subscriber("push", topic)
+            received = self._received.setdefault(topic, deque())
+            if not received and not self._wait(sock, timeout):
+                return None
+            while True:
+                try:
+                    received.append(sock.recv_multipart(flags=zmq.NOBLOCK, copy=False))
+                except zmq.Again:
+                    break
+            if not received:
+                return None
+            data = self._join(received.popleft())
+            if received and max_lag.exceeded(len(received) + 1, peek_timestamp(data)):
+                self.skipped_frames += len(received)
+                data = self._join(received.pop())
+                received.clear()
+            return data
+        except Exception as e:
+            print(f"HybridBroker PopBalanced Error: {e}")
             return None
-            
-        target_id = int(signal.decode('utf-8'))
-        target_key = f"{topic}:{target_id}"
-        
-        # 2. ZMQ 버퍼에 데이터가 도착했는지 확인 (Spin-lock or Wait)
-        start_wait = time.time()
-        while time.time() - start_wait < 0.2: # 최대 0.2초 대기
-            with self.buffer_lock:
-                if target_key in self.local_buffer:
-                    # 데이터 찾음! 꺼내고 삭제
-                    data = self.local_buffer.pop(target_key)
-                    return data
-            time.sleep(0.001) # ZMQ 스레드가 채워줄 때까지 대기
-            
-        print(f"⚠️ Data missing for Ticket {target_id} (ZMQ Lag?)")
-        return None
-        
-    def trim(self, topic, size):
-        self.redis.trim(topic, size)
\ No newline at end of file
+
+    # ========== Queue Management ==========
+
+    def trim(self, topic: str, size: int = 1):
+        """큐 크기 설정 (PUSH/PULL HWM, 이후 생성되는 연결부터 적용)"""
+        if self._topic_limits.get(topic) == size:
+            return
+        self._topic_limits[topic] = size
+        sockets = self._publishers.get(topic)
+        if sockets is not None:
+            sockets[1].setsockopt(zmq.SNDHWM, size)
+        try:
+            pipe = self.ctrl_redis.pipeline(transaction=False)
+            set_limit(pipe, topic, size)
+            pipe.execute()
+        except Exception:
+            pass
+
+    def queue_size(self, topic: str) -> int:
+        """ZeroMQ는 큐 길이를 노출하지 않으므로 항상 0"""
+        return 0
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """Return configured limits for all registered topics (current는 알 수 없으므로 0, STATS_TTL 캐시)"""
+        cached = self._stats.get()
+        if cached is not None:
+            return cached
+        stats = {}
+        try:
+            stats = self._stats.put(parse_stats(self.ctrl_redis.eval(*stats_command("")), self.maxlen))
+        except Exception as e:
+            print(f"HybridBroker Stats Error: {e}")
+        return stats
+
+    def reset(self):
+        """Reset Broker State (endpoint 등록/메타데이터 삭제)"""
+        try:
+            keys = self.ctrl_redis.keys("edgeflow:zmq:*") + self.ctrl_redis.keys("edgeflow:meta:*")
+            if keys:
+                self.ctrl_redis.delete(*keys)
+            print("🧹 [HybridBroker] System Reset: endpoint registry cleared")
+        except Exception as e:
+            print(f"⚠️ [HybridBroker] Failed to reset: {e}")
+
+    def close(self):
+        """소켓/Context 정리 + 이 프로세스의 endpoint 등록 해제"""
+        if self._endpoints:
+            try:
+                pipe = self.ctrl_redis.pipeline()
+                for topic, (pub_endpoint, push_endpoint) in self._endpoints.items():
+                    pipe.srem(f"edgeflow:zmq:pub:{topic}", pub_endpoint)
+                    pipe.srem(f"edgeflow:zmq:push:{topic}", push_endpoint)
+                    pipe.delete(f"{_ALIVE_PREFIX}{pub_endpoint}", f"{_ALIVE_PREFIX}{push_endpoint}")
+                pipe.execute()
+            except Exception as e:
+                print(f"⚠️ [HybridBroker] Failed to unregister endpoints: {e}")
+        for pub, push in self._publishers.values():
+            pub.close()
+            push.close()
+        for sock, _, _ in self._subscribers.values():
+            sock.close()
+        self._publishers.clear()
+        self._endpoints.clear()
+        self._heartbeats.clear()
+        self._subscribers.clear()
+        if self._context is not None:
+            self._context.term()
+            self._context = None
+
+    def to_async(self):
+        """
+        ZeroMQ 소켓은 thread-safe하지 않음 -> 송신/수신 소켓을 각각 전용 스레드 하나에서만 사용
+        (동시 push_many가 같은 PUB/PUSH 소켓에 쓰거나, _publisher()가 같은 토픽을 두 번 bind하지 않도록)
+        """
+        from .aio import ThreadedAsyncBroker
+        broker = type(self).from_config(self.to_config())
+        broker.context  # Context는 thread-safe, 두 스레드가 각자 만들지 않도록 미리 생성
+        return ThreadedAsyncBroker(broker, serialize=True)
+
+    # ========== Serialization Protocol ==========
+
+    def to_config(self) -> dict:
+        return {
+            "__class_path__": f"{self.__class__.__module__}.{self.__class__.__name__}",
+            "ctrl_host": self.ctrl_host,
+            "ctrl_port": self.ctrl_port,
+            "advertise_host": self._advertise_host,
+            "maxlen": self.maxlen
+        }
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'HybridBroker':
+        return cls(
+            ctrl_host=config.get("ctrl_host"),
+            ctrl_port=config.get("ctrl_port"),
+            advertise_host=config.get("advertise_host"),
+            maxlen=config.get("maxlen", 100)
+        )
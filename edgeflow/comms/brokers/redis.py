@@ -1,12 +1,109 @@
 #edgeflow/comms/brokers/redis.py
 """
 Redis Stream-based Broker for fan-out and consumer group support
+- Shared connection pool, lazy reconnect with non-blocking backoff (connection.py)
+- pop_latest: skips the backlog (the group cursor jumps to the newest entry, stale entries are never delivered)
+- pop_balanced: sequential until the group lags more than max_lag, then the cursor jumps to the newest entry
 """
 import redis
 import time
 import os
-from typing import Dict, Optional
-from .base import BrokerInterface
+from typing import Dict, List, Optional
+from .base import BATCH_POLL_INTERVAL, BrokerInterface
+from .connection import (CONNECTION_ERRORS, RedisConnection, StatsCache, io_stats, parse_stats, set_limit,
+                         stats_command)
+
+# 그룹 cursor(last-delivered-id) 조회 (REALTIME/BALANCED 스크립트 공용, ARGV[1] = group)
+_GROUP_CURSOR = """
+local function parse(id)
+    local ms, seq = string.match(id, '(%d+)-(%d+)')
+    return tonumber(ms), tonumber(seq)
+end
+local function newer(id, than)
+    local ms, seq = parse(id)
+    local than_ms, than_seq = parse(than)
+    return ms > than_ms or (ms == than_ms and seq > than_seq)
+end
+local delivered
+for _, info in ipairs(redis.call('XINFO', 'GROUPS', KEYS[1])) do
+    local fields = {}
+    for i = 1, #info, 2 do
+        fields[info[i]] = info[i + 1]
+    end
+    if fields['name'] == ARGV[1] then
+        delivered = fields['last-delivered-id']
+    end
+end
+if not delivered then
+    return false
+end
+"""
+
+# REALTIME: 그룹이 아직 받지 않은 entry 중 가장 최신 것을 가져가고 cursor를 그 위치로 이동
+# - 원자적으로 실행되므로 같은 그룹의 replica 둘이 같은 entry를 받지 않음
+# - 밀린 entry는 cursor 뒤로 넘어가서 이 그룹에는 전달되지 않음 (stream에는 MAXLEN까지 남음)
+_LATEST_SCRIPT = _GROUP_CURSOR + """
+local newest = redis.call('XREVRANGE', KEYS[1], '+', '-', 'COUNT', 1)[1]
+if not newest or not newer(newest[1], delivered) then
+    return false
+end
+redis.call('XGROUP', 'SETID', KEYS[1], ARGV[1], newest[1])
+return newest
+"""
+
+# BALANCED: 다음 entry를 순서대로 가져가되, 밀린 정도가 기준을 넘으면 최신 entry로 건너뜀
+# - ARGV[2]: 최대 프레임 수 (0 = 검사 안 함), 받지 않은 entry가 이보다 많으면 건너뜀
+# - ARGV[3]: 최대 나이 ms (0 = 검사 안 함), entry id의 서버 시각 기준
+# - 반환: false (받을 entry 없음) 또는 {entry, 건너뛴 entry 수}
+# - 건너뛸 때만 건너뛴 entry 수를 세느라 사이의 entry를 읽음 (평소에는 최대 ARGV[2] + 1개)
+_BALANCED_SCRIPT = _GROUP_CURSOR + """
+local max_frames = tonumber(ARGV[2])
+local max_ms = tonumber(ARGV[3])
+local ms, seq = parse(delivered)
+local start = string.format('%d-%d', ms, seq + 1)
+local pending = redis.call('XRANGE', KEYS[1], start, '+', 'COUNT', max_frames + 1)
+local entry = pending[1]
+if not entry then
+    return false
+end
+local lagging = max_frames > 0 and #pending > max_frames
+if not lagging and max_ms > 0 then
+    local now = redis.call('TIME')
+    local entry_ms = parse(entry[1])
+    lagging = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000) - entry_ms > max_ms
+end
+local skipped = 0
+if lagging then
+    local newest = redis.call('XREVRANGE', KEYS[1], '+', '-', 'COUNT', 1)[1]
+    local cursor = entry[1]
+    while true do
+        local chunk = redis.call('XRANGE', KEYS[1], cursor, newest[1], 'COUNT', 100)
+        skipped = skipped + #chunk
+        if #chunk < 100 then
+            break
+        end
+        ms, seq = parse(chunk[#chunk][1])
+        cursor = string.format('%d-%d', ms, seq + 1)
+    end
+    skipped = skipped - 1
+    entry = newest
+end
+redis.call('XGROUP', 'SETID', KEYS[1], ARGV[1], entry[1])
+return {entry, skipped}
+"""
+
+
+def _lag_args(group, max_lag):
+    """_BALANCED_SCRIPT ARGV (group, 최대 프레임 수, 최대 ms)"""
+    return [group, max_lag.frames or 0, int(max_lag.ms or 0)]
+
+
+def _latest_fields(entry) -> Optional[dict]:
+    """_LATEST_SCRIPT 결과 [id, [field, value, ...]] -> {field: value} (None: 새 entry 없음)"""
+    if not entry:
+        return None
+    values = entry[1]
+    return dict(zip(values[::2], values[1::2]))
 
 
 class RedisBroker(BrokerInterface):
@@ -16,26 +113,15 @@ class RedisBroker(BrokerInterface):
         self.host = host or os.getenv('REDIS_HOST', 'localhost')
         self.port = port or int(os.getenv('REDIS_PORT', 6379))
         self.maxlen = maxlen  # Stream max length (approximate)
-        self._redis = None
+        # 공유 pool + lazy reconnect (매 호출 PING 없음)
+        self._conn = RedisConnection(self.host, self.port)
+        self._redis = self._conn.client
         self._consumer_groups = set()  # Track created groups
         self._topic_last_id = {}  # Track last seen ID per topic
-
-    def _ensure_connected(self):
-        if self._redis is None:
-            self._redis = self._connect()
-    
-    def _connect(self):
-        wait_time = 1
-        while True:
-            try:
-                r = redis.Redis(host=self.host, port=self.port, socket_timeout=5)
-                r.ping()
-                print(f"✅ Redis Connected: {self.host}:{self.port}")
-                return r
-            except redis.ConnectionError:
-                print(f"⚠️ Redis Connection Failed ({self.host}). Retrying in {wait_time}s...")
-                time.sleep(wait_time)
-                wait_time = min(wait_time * 2, 30)
+        self._topic_limits = {}  # topic -> MAXLEN (Redis에 기록한 값)
+        self._latest = self._redis.register_script(_LATEST_SCRIPT)
+        self._balanced = self._redis.register_script(_BALANCED_SCRIPT)
+        self._stats = StatsCache()
 
     def _ensure_consumer_group(self, stream: str, group: str):
         """Create consumer group if not exists"""
@@ -43,7 +129,6 @@ class RedisBroker(BrokerInterface):
         if key in self._consumer_groups:
             return
         
-        self._ensure_connected()
         try:
             # Start from '$' to only read NEW messages (don't process history)
             self._redis.xgroup_create(stream, group, id='$', mkstream=True)
@@ -59,10 +144,40 @@ class RedisBroker(BrokerInterface):
         """Add message to stream (XADD with MAXLEN)"""
         if not data:
             return
-        self._ensure_connected()
+        # XADD with approximate maxlen for auto-trimming
+        self.push_many([(topic, data)])
+
+    def push_buffers(self, topic: str, buffers: List[bytes]):
+        self.push_many([(topic, buffers)])
+
+    def push_many(self, items, limits=None):
+        """
+        Batched XADD in one pipeline (one round trip)
+        - trim is folded into XADD MAXLEN; the limit key is only written when it changes
+        """
+        if not self._conn.available():
+            return  # backoff 중: 프레임 드롭 (호출 측을 막지 않음)
+        limits = limits or {}
         try:
-            # XADD with approximate maxlen for auto-trimming
-            self._redis.xadd(topic, {'data': data}, maxlen=self.maxlen, approximate=True)
+            pipe = self._redis.pipeline(transaction=False)
+            pushed = 0
+            for topic, data in items:
+                if isinstance(data, (list, tuple)):
+                    data = b"".join(data)
+                if not data:
+                    continue
+                limit = limits.get(topic) or self._topic_limits.get(topic, self.maxlen)
+                pipe.xadd(topic, {'data': data}, maxlen=limit, approximate=True)
+                pushed += 1
+            for topic, size in limits.items():
+                if self._topic_limits.get(topic) != size:
+                    set_limit(pipe, topic, size)
+                    self._topic_limits[topic] = size
+            pipe.execute()
+            self._conn.frames += pushed
+            self._conn.ok()
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e)
         except Exception as e:
             print(f"Redis Push Error: {e}")
 
@@ -72,19 +187,24 @@ class RedisBroker(BrokerInterface):
         - group: consumer group name (e.g., node name)
         - consumer: consumer instance name (e.g., replica id)
         """
-        self._ensure_connected()
-        self._ensure_consumer_group(topic, group)
-        
+        if not self._conn.available():
+            self._conn.wait(timeout)
+            return None
+
         try:
+            self._ensure_consumer_group(topic, group)
             # XREADGROUP: read new messages for this group
             # '>' means only new messages not yet delivered
+            # NOACK: auto-acknowledge without a separate XACK round trip
             result = self._redis.xreadgroup(
                 groupname=group,
                 consumername=consumer,
                 streams={topic: '>'},
                 count=1,
-                block=timeout * 1000  # milliseconds
+                block=int(timeout * 1000),  # milliseconds
+                noack=True
             )
+            self._conn.ok()
             
             if not result:
                 return None
@@ -95,50 +215,103 @@ class RedisBroker(BrokerInterface):
                 return None
             
             msg_id, fields = messages[0]
-            data = fields.get(b'data')
-            
-            # Auto-acknowledge the message
-            self._redis.xack(topic, group, msg_id)
-            
-            return data
+            self._conn.frames += 1
+            return fields.get(b'data')
             
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e)
+            return None
         except Exception as e:
             print(f"Redis Pop Error: {e}")
             return None
 
+    def pop_batch(self, topic: str, max_items: int, max_wait_ms: float, timeout: int = 1,
+                  group: str = "default", consumer: str = "worker") -> List[bytes]:
+        """
+        Read up to max_items messages (XREADGROUP COUNT)
+        - NOACK: same as pop()'s immediate ACK without the extra round trip
+        - after the first message, keep reading only until max_wait_ms has passed
+        """
+        if not self._conn.available():
+            self._conn.wait(timeout)
+            return []
+
+        def read(count, block=None):
+            # block=None: non-blocking (NOACK = pop()의 즉시 ACK와 동일, 왕복 1회 절약)
+            result = self._redis.xreadgroup(
+                groupname=group,
+                consumername=consumer,
+                streams={topic: '>'},
+                count=count,
+                block=block,
+                noack=True
+            )
+            return [fields.get(b'data') for _, fields in result[0][1]] if result else []
+
+        batch = []
+        try:
+            self._ensure_consumer_group(topic, group)
+            batch = read(max_items, block=int(timeout * 1000))
+            # 첫 메시지 이후에는 non-blocking 폴링으로 max_wait_ms까지만 더 모음
+            deadline = time.monotonic() + max_wait_ms / 1000
+            while batch and len(batch) < max_items:
+                more = read(max_items - len(batch))
+                if more:
+                    batch.extend(more)
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(remaining, BATCH_POLL_INTERVAL))
+            self._conn.ok()
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e)
+        except Exception as e:
+            print(f"Redis PopBatch Error: {e}")
+        batch = [data for data in batch if data]
+        self._conn.frames += len(batch)
+        return batch
+
     def trim(self, topic: str, size: int = 1):
         """Trim stream to approximate size (for backward compatibility)"""
-        self._ensure_connected()
+        self._topic_limits[topic] = size
+        if not self._conn.available():
+            return
         try:
-            self._redis.xtrim(topic, maxlen=size, approximate=True)
-            self._redis.set(f"edgeflow:meta:limit:{topic}", size)
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.xtrim(topic, maxlen=size, approximate=True)
+            set_limit(pipe, topic, size)
+            pipe.execute()
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e)
         except Exception:
             pass
 
     def queue_size(self, topic: str) -> int:
         """Return stream length"""
-        self._ensure_connected()
+        if not self._conn.available():
+            return 0
         try:
             return self._redis.xlen(topic)
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e, announce=False)
+            return 0
         except Exception:
             return 0
 
     def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
-        """Return stats for all tracked streams"""
-        self._ensure_connected()
+        """Return stats for all registered streams (cached for STATS_TTL)"""
+        cached = self._stats.get()
+        if cached is not None:
+            return cached
         stats = {}
+        if not self._conn.available():
+            return stats
         try:
-            meta_keys = self._redis.keys("edgeflow:meta:limit:*")
-            
-            for key in meta_keys:
-                key_str = key.decode('utf-8')
-                topic = key_str.replace("edgeflow:meta:limit:", "")
-                
-                limit_bytes = self._redis.get(key)
-                limit = int(limit_bytes) if limit_bytes else self.maxlen
-                current = self._redis.xlen(topic)
-                
-                stats[topic] = {"current": current, "max": limit}
+            # 토픽 registry + limit + 길이를 스크립트 한 번으로 (KEYS 스캔 없음)
+            stats = self._stats.put(parse_stats(self._redis.eval(*stats_command("XLEN")), self.maxlen))
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e, announce=False)
         except Exception as e:
             print(f"Redis Stats Error: {e}")
         return stats
@@ -147,42 +320,93 @@ class RedisBroker(BrokerInterface):
     def pop_latest(self, topic: str, timeout: int = 1, group: str = "default", consumer: str = "worker") -> Optional[bytes]:
         """
         Read the LATEST message using Consumer Groups (REALTIME mode with distribution).
-        - Read a batch (up to 100) and only take the last one to jump ahead of backlog.
-        - ACK all messages in the batch to catch up the group pointer.
+        - Backlog: one script call takes the newest undelivered entry and moves the group cursor past
+          everything older, so a slow consumer never works through stale frames.
+        - Caught up: block on XREADGROUP (NOACK) for the next entry, which is the newest when it arrives.
+          The script call adds a round trip only while idle, never to the delivery of a waiting frame.
+        - Each entry still goes to exactly one consumer of the group (the script is atomic).
         """
-        self._ensure_connected()
-        self._ensure_consumer_group(topic, group)
-        
+        if not self._conn.available():
+            self._conn.wait(timeout)
+            return None
+
         try:
-            result = self._redis.xreadgroup(
-                groupname=group,
-                consumername=consumer,
-                streams={topic: '>'},
-                count=1,
-                block=timeout * 1000
-            )
-            
-            if not result:
-                return None
-            
-            stream_name, messages = result[0]
-            if not messages:
-                return None
-            
-            # Get the LATEST one the batch
-            msg_id, fields = messages[-1]
-            data = fields.get(b'data')
-            
-            # ACK EVERYTHING in this batch to prevent PEL (Pending Entry List) leakage
-            ids = [m[0] for m in messages]
-            self._redis.xack(topic, group, *ids)
-            
-            return data
+            self._ensure_consumer_group(topic, group)
+            fields = _latest_fields(self._latest(keys=[topic], args=[group]))
+            if fields is None:
+                result = self._redis.xreadgroup(
+                    groupname=group,
+                    consumername=consumer,
+                    streams={topic: '>'},
+                    count=1,
+                    block=int(timeout * 1000),
+                    noack=True
+                )
+                if not result or not result[0][1]:
+                    self._conn.ok()
+                    return None
+                msg_id, fields = result[0][1][0]
+            self._conn.ok()
+            self._conn.frames += 1
+            return fields.get(b'data')
             
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e)
+            return None
         except Exception as e:
             print(f"Redis PopLatest Error: {e}")
             return None
 
+    def pop_balanced(self, topic: str, max_lag, timeout: int = 1, group: str = "default",
+                     consumer: str = "worker") -> Optional[bytes]:
+        """
+        [QoS: BALANCED] Sequential reads while the group keeps up, newest entry once it lags more than max_lag.
+        - One script call checks the lag, moves the group cursor and returns the entry (atomic across replicas)
+        - Caught up: block on XREADGROUP (NOACK) for the next entry, which cannot be lagging yet
+        """
+        if not self._conn.available():
+            self._conn.wait(timeout)
+            return None
+
+        try:
+            self._ensure_consumer_group(topic, group)
+            result = self._balanced(keys=[topic], args=_lag_args(group, max_lag))
+            if result:
+                fields = _latest_fields(result[0])
+                self.skipped_frames += result[1]
+            else:
+                result = self._redis.xreadgroup(
+                    groupname=group,
+                    consumername=consumer,
+                    streams={topic: '>'},
+                    count=1,
+                    block=int(timeout * 1000),
+                    noack=True
+                )
+                if not result or not result[0][1]:
+                    self._conn.ok()
+                    return None
+                msg_id, fields = result[0][1][0]
+            self._conn.ok()
+            self._conn.frames += 1
+            return fields.get(b'data')
+
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e)
+            return None
+        except Exception as e:
+            print(f"Redis PopBalanced Error: {e}")
+            return None
+
+    def get_io_stats(self) -> Dict[str, float]:
+        """round trips / frames since start (rtt_per_frame ~1 for pipelined XADD + NOACK reads)"""
+        return io_stats(self._conn)
+
+    def to_async(self):
+        """Native asyncio variant (redis.asyncio) on the same streams"""
+        from .aio_redis import AsyncRedisBroker
+        return AsyncRedisBroker(host=self.host, port=self.port, maxlen=self.maxlen)
+
     # ========== Serialization Protocol ==========
     
     def to_config(self) -> dict:
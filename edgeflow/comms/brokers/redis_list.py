@@ -3,14 +3,80 @@
 Redis List-based Broker for high-performance, low-latency messaging.
 - Uses RPUSH/LPOP for simple queue semantics
 - Supports QoS via list size trimming
-- Auto-reconnect on connection loss
+- BALANCED: FIFO until the list holds more than max_lag frames (or the frame is too old), then the newest only
+- Shared connection pool, lazy reconnect with non-blocking backoff (connection.py)
 - Topic-based messaging
+- One list per subscriber ({topic}:{subscriber}): each consumer node gets the full stream with its own size limit,
+  a frame fanned out to several lists is sent once (server-side RPUSH + LTRIM per list)
 """
-import redis
 import time
 import os
-from typing import Dict, Optional
-from .base import BrokerInterface
+from typing import Dict, List, Optional
+from .base import BATCH_POLL_INTERVAL, BrokerInterface, buffers_key
+from ..frame import peek_timestamp
+from .connection import (CONNECTION_ERRORS, LIMIT_PREFIX, RedisConnection, StatsCache, io_stats, parse_stats,
+                         set_limit, stats_command)
+
+
+# 같은 프레임을 여러 구독자 리스트에: payload는 ARGV[1]로 한 번만 전송, ARGV[i + 1] = KEYS[i]의 크기
+_FANOUT_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    redis.call('RPUSH', key, ARGV[1])
+    redis.call('LTRIM', key, -tonumber(ARGV[i + 1]), -1)
+end
+return #KEYS
+"""
+
+
+def _fanout_groups(items):
+    """
+    push_many items -> [(topics, data)], 같은 프레임(buffers_key)을 받는 토픽끼리 묶음
+    (RedisListBroker, AsyncRedisListBroker 공용, 빈 데이터는 제외)
+    """
+    groups = {}
+    for topic, data in items:
+        parts = data if isinstance(data, (list, tuple)) else [data]
+        entry = groups.setdefault(buffers_key(parts), [[], parts])
+        entry[0].append(topic)
+    return [(topics, b"".join(parts)) for topics, parts in groups.values() if any(parts)]
+
+
+def _queue_fanout(pipe, groups, limits, maxlen):
+    """그룹 하나 = 토픽 하나면 RPUSH + LTRIM, 여러 개면 EVAL 한 번 -> pipe에 쌓은 프레임 수 반환"""
+    pushed = 0
+    for topics, data in groups:
+        if len(topics) == 1:
+            pipe.rpush(topics[0], data)
+            pipe.ltrim(topics[0], -limits.get(topics[0], maxlen), -1)
+        else:
+            pipe.eval(_FANOUT_SCRIPT, len(topics), *topics, data,
+                      *(limits.get(topic, maxlen) for topic in topics))
+        pushed += len(topics)
+    return pushed
+
+
+def _pop_list_batch(r, topic, max_items, max_wait_ms, timeout):
+    """BLPOP 1개 + 이미 쌓인 것들은 LRANGE/LTRIM(MULTI) 한 번에 (RedisListBroker, DualRedisListBroker 공용)"""
+    result = r.blpop([topic], timeout=timeout)
+    if not result:
+        return []
+    batch = [result[1]]
+    deadline = time.monotonic() + max_wait_ms / 1000
+    while len(batch) < max_items:
+        want = max_items - len(batch)
+        pipe = r.pipeline()
+        pipe.lrange(topic, 0, want - 1)
+        pipe.ltrim(topic, want, -1)
+        items, _ = pipe.execute()
+        if items:
+            batch.extend(items)
+            continue
+        # BLPOP 타임아웃은 Redis hz 단위라 부정확 -> max_wait_ms까지 짧게 폴링
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(remaining, BATCH_POLL_INTERVAL))
+    return batch
 
 
 class RedisListBroker(BrokerInterface):
@@ -20,160 +86,214 @@ class RedisListBroker(BrokerInterface):
         self.host = host or os.getenv('REDIS_HOST', 'localhost')
         self.port = port or int(os.getenv('REDIS_PORT', 6379))
         self.maxlen = maxlen  # Default max list length
-        self._redis = None
+        # 공유 pool + lazy reconnect (매 호출 PING 없음)
+        self._conn = RedisConnection(self.host, self.port)
+        self._redis = self._conn.client
         self._topic_limits = {}  # topic -> max size
         self._last_seen_id = {}  # topic -> last processed frame_id (for REALTIME dedup)
-
-    def _ensure_connected(self):
-        """Ensure Redis connection, auto-reconnect if needed"""
-        if self._redis is None:
-            self._redis = self._connect()
-        else:
-            try:
-                self._redis.ping()
-            except (redis.ConnectionError, redis.TimeoutError):
-                print(f"⚠️ Redis connection lost. Reconnecting...")
-                self._redis = self._connect()
-    
-    def _connect(self):
-        """Connect to Redis with exponential backoff"""
-        wait_time = 1
-        while True:
-            try:
-                r = redis.Redis(
-                    host=self.host, 
-                    port=self.port, 
-                    socket_timeout=5,
-                    socket_connect_timeout=5
-                )
-                r.ping()
-                print(f"✅ Redis Connected: {self.host}:{self.port}")
-                return r
-            except redis.ConnectionError:
-                print(f"⚠️ Redis Connection Failed ({self.host}). Retrying in {wait_time}s...")
-                time.sleep(wait_time)
-                wait_time = min(wait_time * 2, 30)
+        self._stats = StatsCache()
 
     def push(self, topic: str, data: bytes):
         """Add message to list (RPUSH + LTRIM for size control)"""
         if not data:
             return
-        self._ensure_connected()
+        self.push_many([(topic, data)])
+
+    def push_buffers(self, topic: str, buffers: List[bytes]):
+        self.push_many([(topic, buffers)])
+
+    def push_many(self, items, limits=None):
+        """
+        Batched RPUSH + LTRIM in one pipeline (one round trip for all topics)
+        - limits: topic -> max size (same as trim(), the limit key is only written when it changes)
+        - fan-out (same frame to several subscriber lists): payload is sent once, pushed server-side
+        """
+        if not self._conn.available():
+            return  # backoff 중: 프레임 드롭 (호출 측을 막지 않음)
+        limits = limits or {}
         try:
             # Get limit from local cache, or fetch from Redis (for distributed env)
-            if topic not in self._topic_limits:
-                limit_bytes = self._redis.get(f"edgeflow:meta:limit:{topic}")
-                if limit_bytes:
-                    self._topic_limits[topic] = int(limit_bytes)
-            
-            limit = self._topic_limits.get(topic, self.maxlen)
-            
+            for topic, _ in items:
+                if topic not in limits and topic not in self._topic_limits:
+                    limit_bytes = self._redis.get(f"{LIMIT_PREFIX}{topic}")
+                    if limit_bytes:
+                        self._topic_limits[topic] = int(limit_bytes)
+
             # Use pipeline for atomic rpush+ltrim (reduces round-trips)
             pipe = self._redis.pipeline()
-            pipe.rpush(topic, data)
-            pipe.ltrim(topic, -limit, -1)
+            for topic, size in limits.items():
+                if self._topic_limits.get(topic) != size:
+                    set_limit(pipe, topic, size)
+                    self._topic_limits[topic] = size
+            pushed = _queue_fanout(pipe, _fanout_groups(items), self._topic_limits, self.maxlen)
 
             pipe.execute()
-        except (redis.ConnectionError, redis.TimeoutError) as e:
-            print(f"⚠️ Redis connection lost in push: {e}")
-            self._redis = None  # Force reconnect on next call
+            self._conn.frames += pushed
+            self._conn.ok()
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e)
         except Exception as e:
             print(f"Redis Push Error: {e}")
 
+    def subscriber_topic(self, topic: str, subscriber: str) -> str:
+        """LPOP은 꺼낸 구독자만 받으므로 구독자마다 별도 리스트"""
+        return f"{topic}:{subscriber}"
+
     def pop(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
         """
         Read message from list (BLPOP - blocking left pop)
         Returns oldest message first (FIFO order for DURABLE QoS)
         """
-        self._ensure_connected()
+        if not self._conn.available():
+            self._conn.wait(timeout)
+            return None
         try:
             # BLPOP returns tuple (key, value) or None
             result = self._redis.blpop([topic], timeout=timeout)
+            self._conn.ok()
             if result:
+                self._conn.frames += 1
                 return result[1]  # Return only the value
             return None
-        except (redis.ConnectionError, redis.TimeoutError) as e:
-            print(f"⚠️ Redis connection lost in pop: {e}")
-            self._redis = None  # Force reconnect on next call
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e)
             return None
         except Exception as e:
             print(f"Redis Pop Error: {e}")
             return None
 
+    def pop_batch(self, topic: str, max_items: int, max_wait_ms: float, timeout: int = 1, **kwargs) -> List[bytes]:
+        """
+        Read up to max_items messages in FIFO order
+        - BLPOP for the first one, then LRANGE + LTRIM (MULTI) for whatever is already queued
+        - waits for more only until max_wait_ms after the first message
+        """
+        if not self._conn.available():
+            self._conn.wait(timeout)
+            return []
+        try:
+            batch = _pop_list_batch(self._redis, topic, max_items, max_wait_ms, timeout)
+            self._conn.frames += len(batch)
+            self._conn.ok()
+            return batch
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e)
+            return []
+        except Exception as e:
+            print(f"Redis PopBatch Error: {e}")
+            return []
+
     def pop_latest(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
         """
         [QoS: REALTIME] Get the latest message.
         - With list size=1 (set by REALTIME QoS), blpop effectively gets the latest
         - Uses true blocking (no polling overhead)
         """
-        self._ensure_connected()
-        
-        try:
-            # BLPOP: True blocking, no CPU waste
-            # With REALTIME QoS, list size is 1, so this always gets the latest
-            result = self._redis.blpop([topic], timeout=timeout)
-            if result:
-                return result[1]
+        # BLPOP: True blocking, no CPU waste
+        # With REALTIME QoS, list size is 1, so this always gets the latest
+        return self.pop(topic, timeout=timeout)
+
+    def pop_balanced(self, topic: str, max_lag, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """
+        [QoS: BALANCED] FIFO while the backlog is within max_lag, otherwise jump to the newest message
+        - BLPOP + LLEN in one round trip (no MULTI, so BLPOP really blocks)
+        - Jump: LLEN + LRANGE -1 -1 + DEL (MULTI), the popped message and everything before the newest are skipped
+        """
+        if not self._conn.available():
+            self._conn.wait(timeout)
             return None
-        except (redis.ConnectionError, redis.TimeoutError) as e:
-            print(f"⚠️ Redis connection lost in pop_latest: {e}")
-            self._redis = None  # Force reconnect on next call
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.blpop([topic], timeout=timeout)
+            pipe.llen(topic)
+            result, backlog = pipe.execute()
+            self._conn.ok()
+            if not result:
+                return None
+            data = result[1]
+            if max_lag.exceeded(backlog + 1, peek_timestamp(data)):
+                pipe = self._redis.pipeline()
+                pipe.llen(topic)
+                pipe.lrange(topic, -1, -1)
+                pipe.delete(topic)
+                queued, newest, _ = pipe.execute()
+                if newest:
+                    self.skipped_frames += queued
+                    data = newest[0]
+            self._conn.frames += 1
+            return data
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e)
             return None
         except Exception as e:
-            print(f"Redis PopLatest Error: {e}")
+            print(f"Redis PopBalanced Error: {e}")
             return None
 
     def trim(self, topic: str, size: int = 1):
         """Set max size for a topic's list"""
-        self._ensure_connected()
         self._topic_limits[topic] = size
+        if not self._conn.available():
+            return
         try:
-            # Also store in Redis for persistence
-            self._redis.set(f"edgeflow:meta:limit:{topic}", size)
-            # Immediately trim if needed
-            self._redis.ltrim(topic, -size, -1)
+            # Also store in Redis for persistence + immediately trim if needed (one round trip)
+            pipe = self._redis.pipeline()
+            set_limit(pipe, topic, size)
+            pipe.ltrim(topic, -size, -1)
+            pipe.execute()
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e)
         except Exception:
             pass
 
     def queue_size(self, topic: str) -> int:
         """Return list length"""
-        self._ensure_connected()
+        if not self._conn.available():
+            return 0
         try:
             return self._redis.llen(topic)
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e, announce=False)
+            return 0
         except Exception:
             return 0
 
     def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
-        """Return stats for all tracked topics"""
-        self._ensure_connected()
+        """Return stats for all registered topics (cached for STATS_TTL)"""
+        cached = self._stats.get()
+        if cached is not None:
+            return cached
         stats = {}
+        if not self._conn.available():
+            return stats
         try:
-            meta_keys = self._redis.keys("edgeflow:meta:limit:*")
-            
-            for key in meta_keys:
-                key_str = key.decode('utf-8')
-                topic = key_str.replace("edgeflow:meta:limit:", "")
-                
-                limit_bytes = self._redis.get(key)
-                limit = int(limit_bytes) if limit_bytes else self.maxlen
-                current = self._redis.llen(topic)
-                
-                stats[topic] = {"current": current, "max": limit}
+            # 토픽 registry + limit + 길이를 스크립트 한 번으로 (KEYS 스캔 없음)
+            stats = self._stats.put(parse_stats(self._redis.eval(*stats_command("LLEN")), self.maxlen))
+        except CONNECTION_ERRORS as e:
+            self._conn.failed(e, announce=False)
         except Exception as e:
             print(f"Redis Stats Error: {e}")
         return stats
 
     def reset(self):
         """Clear all edgeflow-related keys"""
-        self._ensure_connected()
         try:
             # Only clear edgeflow metadata, not the actual queues
             meta_keys = self._redis.keys("edgeflow:meta:*")
             if meta_keys:
                 self._redis.delete(*meta_keys)
+            self._topic_limits.clear()
         except Exception:
             pass
 
+    def get_io_stats(self) -> Dict[str, float]:
+        """round trips / frames since start (rtt_per_frame ~1 for pipelined push + BLPOP)"""
+        return io_stats(self._conn)
+
+    def to_async(self):
+        """Native asyncio variant (redis.asyncio) on the same lists"""
+        from .aio_redis import AsyncRedisListBroker
+        return AsyncRedisListBroker(host=self.host, port=self.port, maxlen=self.maxlen)
+
     # ========== Serialization Protocol ==========
     
     def to_config(self) -> dict:
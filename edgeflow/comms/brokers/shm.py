@@ -0,0 +1,484 @@
+# edgeflow/comms/brokers/shm.py
+"""
+Shared-Memory Ring Buffer Broker (same-host nodes)
+- 토픽마다 multiprocessing.shared_memory 세그먼트 1개 (고정 크기 슬롯 ring buffer)
+- Redis(TCP) 왕복 없이 프로세스 간 memcpy 한 번으로 전달
+- 슬롯마다 seqlock: 읽는 도중 덮어쓰인 메시지는 버림 (reader가 writer를 막지 않음)
+- QoS: pop_latest = 최신 슬롯만 (REALTIME), pop = 순서대로 (DURABLE, trim 크기만큼 보관)
+- 구독자(노드)마다 read cursor + 보관 크기 ({topic}@{subscriber}, 최대 _MAX_CURSORS개)
+  - 생산자는 fan-out 프레임을 슬롯에 한 번만 쓰고, 슬롯의 mask에 받을 cursor를 표시
+  - 같은 노드의 replica는 cursor를 공유 (메시지는 그중 한 replica에게만 전달)
+  - @가 없는 토픽은 기본 cursor 0 (모든 push를 받음)
+- 데이터 대기는 sleep polling (50us부터 최대 _POLL_MAX=2ms까지 증가) -> 유휴 후 첫 프레임은 최대 2ms 늦게 전달
+  (futex 같은 프로세스 간 wakeup은 표준 라이브러리로 만들 수 없어 사용하지 않음)
+- 세그먼트는 생성 시 전체 크기를 미리 할당 (/dev/shm이 부족하면 쓰기 중 SIGBUS 대신 생성 시 에러)
+  Docker 기본 /dev/shm은 64MB: 기본값(4 slots x 4MiB)은 토픽당 약 16MiB, 1080p raw(약 6MB)는 slot_size와 --shm-size를 늘릴 것
+
+Layout:
+    [header 128B] magic | nslots | slot_size | limit(새 cursor 기본값) | write_seq | topic_len | topic
+    [cursor 0..15, 64B each] read_seq | limit | name_len | name
+    [slot 0] seq(seqlock) | msg_no | length | mask(받을 cursor bit) | data[slot_size]
+    [slot 1] ...
+"""
+import os
+import time
+import struct
+import tempfile
+import threading
+from multiprocessing import shared_memory, resource_tracker
+from typing import Dict, List, Optional
+from .base import BrokerInterface, buffers_key
+
+# [Optional] POSIX 전용 (프로세스 간 락)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_MAGIC = 0xEDF10002  # cursor table 추가 (이전 레이아웃 세그먼트는 reset() 필요)
+_HEADER = struct.Struct('<IIIIQH')  # magic, nslots, slot_size, limit, write_seq, topic_len
+_HEADER_SIZE = 128
+_TOPIC_MAX = _HEADER_SIZE - _HEADER.size
+_WRITE_SEQ = 16  # header 내 offset
+_LIMIT = 12
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+
+_MAX_CURSORS = 16
+_CURSOR = struct.Struct('<QIB')  # read_seq, limit, name_len (+ name)
+_CURSOR_SIZE = 64
+_CURSOR_NAME_MAX = _CURSOR_SIZE - _CURSOR.size
+_CURSORS_SIZE = _MAX_CURSORS * _CURSOR_SIZE
+_ALL_CURSORS = (1 << _MAX_CURSORS) - 1
+
+_SLOT = struct.Struct('<QQIQ')  # seq, msg_no, length, mask
+_SLOT_MASK = 20  # 슬롯 헤더 내 mask offset
+_SLOT_HEADER = 64  # 슬롯 헤더 (cache line 정렬)
+
+# 데이터가 없을 때 polling 간격 (짧게 시작해서 점점 늘림)
+_POLL_MIN = 0.00005
+_POLL_MAX = 0.002
+
+_SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+def _open_segment(name, create=False, size=0):
+    """
+    resource_tracker에 등록하지 않고 세그먼트 열기
+    - 추적되면 attach한 프로세스가 종료될 때 세그먼트가 unlink됨 (정리는 reset()에서 수행)
+    - Python 3.13+: track=False, 그 이전: 연 직후 등록 해제 (전역 register를 바꾸지 않으므로 스레드 안전)
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    except TypeError:
+        pass
+    shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _reserve(shm, name, size):
+    """
+    세그먼트 페이지를 미리 할당 (tmpfs는 처음 쓸 때 할당 -> /dev/shm이 가득 차면 SIGBUS)
+    - 공간이 부족하면 세그먼트를 지우고 RuntimeError
+    """
+    fd = getattr(shm, "_fd", -1)
+    if fd < 0 or not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except OSError as e:
+        shm.close()
+        try:
+            os.unlink(os.path.join(_SHM_DIR, name))  # shm.unlink()은 추적하지 않은 세그먼트를 resource_tracker에서 지우려 함
+        except OSError:
+            pass
+        raise RuntimeError(
+            f"Not enough shared memory for '{name}' ({size / 1024 / 1024:.0f} MiB): {e}. "
+            f"Lower slots/slot_size or enlarge {_SHM_DIR} (Docker: --shm-size)"
+        ) from e
+
+
+class _TopicRing:
+    """토픽 하나의 ring buffer (세그먼트 + 프로세스 간 락)"""
+
+    def __init__(self, shm, lock_fd, nslots, slot_size):
+        self.shm = shm
+        self.buf = shm.buf
+        self.lock_fd = lock_fd
+        self.thread_lock = threading.Lock()  # flock은 같은 프로세스의 스레드끼리는 막지 못함
+        self.nslots = nslots
+        self.slot_size = slot_size
+        self.stride = _SLOT_HEADER + slot_size
+
+    def lock(self, offset):
+        """offset 0: writer 락, 1: reader 락 (byte-range lock이라 서로 막지 않음)"""
+        return _RangeLock(self, offset)
+
+    def slot_offset(self, msg_no):
+        return _HEADER_SIZE + _CURSORS_SIZE + (msg_no % self.nslots) * self.stride
+
+    def write_seq(self):
+        return _U64.unpack_from(self.buf, _WRITE_SEQ)[0]
+
+    def read_seq(self, cursor):
+        return _U64.unpack_from(self.buf, _cursor_offset(cursor))[0]
+
+    def set_read_seq(self, cursor, msg_no):
+        _U64.pack_into(self.buf, _cursor_offset(cursor), msg_no)
+
+    def limit(self, cursor):
+        return _U32.unpack_from(self.buf, _cursor_offset(cursor) + 8)[0]
+
+    def set_limit(self, cursor, size):
+        _U32.pack_into(self.buf, _cursor_offset(cursor) + 8, max(1, min(size, self.nslots)))
+
+    def find_cursor(self, name):
+        """이름 -> cursor 번호 (등록 안 됨: None, 빈 자리가 있으면 (None, 빈 번호))"""
+        free = None
+        for cursor in range(1, _MAX_CURSORS):
+            offset = _cursor_offset(cursor)
+            name_len = self.buf[offset + 12]
+            if name_len == 0:
+                free = cursor if free is None else free
+            elif bytes(self.buf[offset + _CURSOR.size:offset + _CURSOR.size + name_len]) == name:
+                return cursor, free
+        return None, free
+
+    def close(self):
+        self.buf = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass
+        os.close(self.lock_fd)
+
+
+def _cursor_offset(cursor):
+    return _HEADER_SIZE + cursor * _CURSOR_SIZE
+
+
+def _split_topic(topic):
+    """{topic}@{subscriber} -> (ring 토픽, 구독자 이름 bytes, 없으면 b"")"""
+    ring_topic, _, subscriber = topic.partition('@')
+    return ring_topic, subscriber.encode('utf-8')
+
+
+class _RangeLock:
+    __slots__ = ('ring', 'offset')
+
+    def __init__(self, ring, offset):
+        self.ring = ring
+        self.offset = offset
+
+    def __enter__(self):
+        self.ring.thread_lock.acquire()
+        fcntl.lockf(self.ring.lock_fd, fcntl.LOCK_EX, 1, self.offset)
+
+    def __exit__(self, *exc):
+        fcntl.lockf(self.ring.lock_fd, fcntl.LOCK_UN, 1, self.offset)
+        self.ring.thread_lock.release()
+
+
+class SharedMemoryBroker(BrokerInterface):
+    """
+    Shared-Memory Broker:
+    - System.run()처럼 모든 노드가 한 호스트의 프로세스일 때 사용
+    - slot_size보다 큰 메시지는 버림 (1080p raw = 약 6MB, JPEG는 수백 KB)
+    - 토픽당 메모리 = slots x slot_size (생성 시 미리 할당, /dev/shm 크기 안에 들어가야 함)
+    """
+
+    def __init__(self, namespace="edgeflow", slots=4, slot_size=4 * 1024 * 1024, maxlen=100):
+        if fcntl is None:
+            raise RuntimeError("SharedMemoryBroker requires a POSIX system (fcntl)")
+        self.namespace = namespace
+        self.slots = slots
+        self.slot_size = slot_size
+        self.maxlen = maxlen
+        self._rings = {}  # ring topic -> _TopicRing
+        self._cursors = {}  # (ring topic, 구독자 이름) -> cursor 번호 (한 번 등록되면 reset 전까지 고정)
+        self._clamped = set()  # 보관 크기가 slots로 줄었다고 경고한 ring topic (토픽당 한 번)
+
+    # ========== Segment Management ==========
+
+    def _segment_name(self, topic):
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in topic)
+        return f"{self.namespace}.{safe}"
+
+    def _ring(self, topic):
+        ring = self._rings.get(topic)
+        if ring is None:
+            ring = self._attach(topic)
+            self._rings[topic] = ring
+        return ring
+
+    def _resolve(self, topic):
+        """{topic}@{subscriber} -> (ring, cursor 번호), 처음 보는 구독자는 빈 cursor에 등록"""
+        ring_topic, name = _split_topic(topic)
+        ring = self._ring(ring_topic)
+        if not name:
+            return ring, 0
+        cursor = self._cursors.get((ring_topic, name))
+        if cursor is None:
+            if len(name) > _CURSOR_NAME_MAX:
+                raise ValueError(f"SharedMemoryBroker subscriber name too long (max {_CURSOR_NAME_MAX} bytes): {topic}")
+            with ring.lock(1):
+                cursor, free = ring.find_cursor(name)
+                if cursor is None:
+                    if free is None:
+                        raise RuntimeError(f"SharedMemoryBroker: more than {_MAX_CURSORS - 1} subscribers on '{ring_topic}'")
+                    cursor = free
+                    offset = _cursor_offset(cursor)
+                    # 처음부터 읽되 보관 크기(limit)를 넘는 오래된 메시지는 건너뜀
+                    _CURSOR.pack_into(ring.buf, offset, 0, _U32.unpack_from(ring.buf, _LIMIT)[0], len(name))
+                    ring.buf[offset + _CURSOR.size:offset + _CURSOR.size + len(name)] = name
+            self._cursors[(ring_topic, name)] = cursor
+        return ring, cursor
+
+    def subscriber_topic(self, topic: str, subscriber: str) -> str:
+        """ring 하나를 구독자별 cursor로 읽음 (프레임은 한 번만 복사)"""
+        return f"{topic}@{subscriber}"
+
+    def _attach(self, topic):
+        """세그먼트 생성 또는 연결 (먼저 접근한 프로세스가 생성)"""
+        name = self._segment_name(topic)
+        topic_bytes = topic.encode('utf-8')[:_TOPIC_MAX]
+        lock_fd = os.open(os.path.join(_SHM_DIR, f"{name}.lock"), os.O_RDWR | os.O_CREAT, 0o666)
+
+        # 생성/초기화는 writer 락 안에서 (동시에 attach하는 프로세스가 반쯤 초기화된 헤더를 보지 않도록)
+        fcntl.lockf(lock_fd, fcntl.LOCK_EX, 1, 0)
+        try:
+            try:
+                size = _HEADER_SIZE + _CURSORS_SIZE + self.slots * (_SLOT_HEADER + self.slot_size)
+                shm = _open_segment(name, create=True, size=size)
+                _reserve(shm, name, size)
+                limit = min(self.maxlen, self.slots)
+                if self.maxlen > self.slots:
+                    self._warn_clamped(topic, self.maxlen, self.slots)
+                _HEADER.pack_into(shm.buf, 0, _MAGIC, self.slots, self.slot_size, limit, 0, len(topic_bytes))
+                shm.buf[_HEADER.size:_HEADER.size + len(topic_bytes)] = topic_bytes
+                _CURSOR.pack_into(shm.buf, _cursor_offset(0), 0, limit, 0)
+                nslots, slot_size = self.slots, self.slot_size
+            except FileExistsError:
+                shm = _open_segment(name)
+                magic, nslots, slot_size = struct.unpack_from('<III', shm.buf, 0)
+                if magic != _MAGIC:
+                    shm.close()
+                    raise RuntimeError(f"Shared memory segment '{name}' is not an EdgeFlow ring buffer")
+        finally:
+            fcntl.lockf(lock_fd, fcntl.LOCK_UN, 1, 0)
+        return _TopicRing(shm, lock_fd, nslots, slot_size)
+
+    def _segments(self):
+        """이 namespace의 모든 세그먼트 이름 (Linux: /dev/shm 기준)"""
+        prefix = f"{self.namespace}."
+        try:
+            return [f for f in os.listdir(_SHM_DIR) if f.startswith(prefix) and not f.endswith(".lock")]
+        except OSError:
+            return []
+
+    def reset(self):
+        """Reset Broker State (namespace의 모든 세그먼트/락 파일 삭제)"""
+        for ring in self._rings.values():
+            ring.close()
+        self._rings.clear()
+        self._cursors.clear()
+        removed = 0
+        for name in self._segments():
+            for path in (name, f"{name}.lock"):
+                try:
+                    os.unlink(os.path.join(_SHM_DIR, path))
+                except FileNotFoundError:
+                    pass
+            removed += 1
+        print(f"🧹 [SharedMemoryBroker] System Reset: {removed} segment(s) removed")
+
+    def close(self):
+        """이 프로세스의 세그먼트 연결 해제 (세그먼트 자체는 유지)"""
+        for ring in self._rings.values():
+            ring.close()
+        self._rings.clear()
+        self._cursors.clear()
+
+    # ========== Push / Pop ==========
+
+    def push(self, topic: str, data: bytes):
+        if not data:
+            return
+        self.push_buffers(topic, [data])
+
+    def push_buffers(self, topic: str, buffers: List[bytes]):
+        """Scatter-Gather 버퍼를 슬롯에 바로 복사 (Python에서 이어 붙이지 않음)"""
+        self.push_many([(topic, buffers)])
+
+    def push_many(self, items, limits=None):
+        """
+        같은 ring으로 가는 같은 프레임(fan-out)은 슬롯에 한 번만 쓰고 받을 cursor들을 mask로 표시
+        - limits(구독자별 보관 크기)는 쓰기 전에 적용 (처음 보는 구독자 cursor를 먼저 등록)
+        """
+        for topic, size in (limits or {}).items():
+            self.trim(topic, size)
+        writes = {}  # (ring topic, buffers_key) -> [ring, mask, buffers]
+        for topic, data in items:
+            buffers = data if isinstance(data, (list, tuple)) else [data]
+            ring, cursor = self._resolve(topic)
+            mask = _ALL_CURSORS if cursor == 0 else 1 << cursor
+            entry = writes.setdefault((id(ring), buffers_key(buffers)), [ring, 0, buffers, topic])
+            entry[1] |= mask
+        for ring, mask, buffers, topic in writes.values():
+            self._write(ring, topic, buffers, mask)
+
+    def _write(self, ring, topic, buffers, mask):
+        length = sum(len(b) for b in buffers)
+        if length == 0:
+            return
+        if length > ring.slot_size:
+            print(f"SharedMemoryBroker Push Error: message ({length} bytes) exceeds slot_size ({ring.slot_size}) on '{topic}'")
+            return
+
+        buf = ring.buf
+        with ring.lock(0):
+            msg_no = ring.write_seq()
+            offset = ring.slot_offset(msg_no)
+            seq = _U64.unpack_from(buf, offset)[0]
+
+            # seqlock: 홀수 = 쓰는 중
+            _U64.pack_into(buf, offset, seq + 1)
+            pos = offset + _SLOT_HEADER
+            for part in buffers:
+                n = len(part)
+                buf[pos:pos + n] = part
+                pos += n
+            _SLOT.pack_into(buf, offset, seq + 2, msg_no, length, mask)
+
+            # 데이터를 다 쓴 뒤에 공개
+            _U64.pack_into(buf, _WRITE_SEQ, msg_no + 1)
+
+    def _read_slot(self, ring, msg_no):
+        """슬롯 복사 (seqlock 검증: 복사 중 덮어쓰였으면 None)"""
+        buf = ring.buf
+        offset = ring.slot_offset(msg_no)
+        seq, slot_msg_no, length, _ = _SLOT.unpack_from(buf, offset)
+        if seq & 1 or slot_msg_no != msg_no:
+            return None
+        start = offset + _SLOT_HEADER
+        data = bytes(buf[start:start + length])
+        if _U64.unpack_from(buf, offset)[0] != seq:
+            return None
+        return data
+
+    def _claim(self, ring, cursor, latest):
+        """cursor가 다음에 읽을 메시지 번호를 예약 (mask에 이 cursor가 없는 메시지는 건너뜀, 없으면 None)"""
+        bit = 1 << cursor
+        with ring.lock(1):
+            write_seq = ring.write_seq()
+            read_seq = ring.read_seq(cursor)
+            if read_seq >= write_seq:
+                return None
+            # trim 크기(limit)보다 오래된 메시지는 건너뜀 (LTRIM과 동일)
+            oldest = max(read_seq, write_seq - max(ring.limit(cursor), 1))
+            candidates = range(write_seq - 1, oldest - 1, -1) if latest else range(oldest, write_seq)
+            for msg_no in candidates:
+                slot_msg_no, mask = self._slot_target(ring, msg_no)
+                # 덮어쓰인 슬롯은 예약 후 _read_slot에서 버림
+                if slot_msg_no != msg_no or mask & bit:
+                    ring.set_read_seq(cursor, msg_no + 1)
+                    return msg_no
+            ring.set_read_seq(cursor, write_seq)
+            return None
+
+    @staticmethod
+    def _slot_target(ring, msg_no):
+        offset = ring.slot_offset(msg_no)
+        return _U64.unpack_from(ring.buf, offset + 8)[0], _U64.unpack_from(ring.buf, offset + _SLOT_MASK)[0]
+
+    def _pop(self, topic, timeout, latest):
+        ring, cursor = self._resolve(topic)
+        deadline = time.monotonic() + (timeout or 0)
+        delay = _POLL_MIN
+        while True:
+            if ring.write_seq() > ring.read_seq(cursor):
+                msg_no = self._claim(ring, cursor, latest)
+                if msg_no is not None:
+                    data = self._read_slot(ring, msg_no)
+                    if data is not None:
+                        return data
+                    continue  # 덮어쓰인 메시지: 다음 메시지 시도
+                continue  # 다른 구독자의 메시지만 있었음: cursor가 따라잡았으니 다시 확인
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, _POLL_MAX)
+
+    def pop(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """[QoS: DURABLE] 가장 오래된 메시지부터 순서대로"""
+        return self._pop(topic, timeout, latest=False)
+
+    def pop_latest(self, topic: str, timeout: int = 1, **kwargs) -> Optional[bytes]:
+        """[QoS: REALTIME] 가장 최신 메시지만 (그 이전 메시지는 모두 건너뜀)"""
+        return self._pop(topic, timeout, latest=True)
+
+    def trim(self, topic: str, size: int = 1):
+        """구독자(cursor)의 보관 크기 설정 (물리 슬롯 수를 넘을 수 없음)"""
+        ring, cursor = self._resolve(topic)
+        if size > ring.nslots:
+            self._warn_clamped(_split_topic(topic)[0], size, ring.nslots)
+        ring.set_limit(cursor, size)
+
+    def _warn_clamped(self, ring_topic, size, nslots):
+        """요청한 보관 크기(queue_size/maxlen)가 물리 슬롯 수보다 크면 한 번만 경고"""
+        if ring_topic in self._clamped:
+            return
+        self._clamped.add(ring_topic)
+        print(f"⚠️ [SharedMemoryBroker] '{ring_topic}': queue size {size} exceeds slots ({nslots}), "
+              f"keeping only the newest {nslots} messages (raise slots to buffer more)")
+
+    def queue_size(self, topic: str) -> int:
+        """읽지 않은 메시지 수 (다른 구독자만 받는 메시지도 포함한 상한값)"""
+        ring, cursor = self._resolve(topic)
+        return min(ring.write_seq() - ring.read_seq(cursor), ring.limit(cursor))
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """Return stats for all topics in this namespace"""
+        stats = {}
+        for name in self._segments():
+            try:
+                shm = _open_segment(name)
+                magic, _, _, _, write_seq, topic_len = _HEADER.unpack_from(shm.buf, 0)
+                topic = bytes(shm.buf[_HEADER.size:_HEADER.size + topic_len]).decode('utf-8')
+                cursors = []
+                if magic == _MAGIC:
+                    for cursor in range(_MAX_CURSORS):
+                        offset = _cursor_offset(cursor)
+                        read_seq, limit, name_len = _CURSOR.unpack_from(shm.buf, offset)
+                        if cursor and not name_len:
+                            continue
+                        sub = bytes(shm.buf[offset + _CURSOR.size:offset + _CURSOR.size + name_len]).decode('utf-8')
+                        cursors.append((f"{topic}@{sub}" if sub else topic, read_seq, limit))
+                shm.close()
+            except Exception as e:
+                print(f"SharedMemoryBroker Stats Error: {e}")
+                continue
+            for key, read_seq, limit in cursors:
+                stats[key] = {"current": min(write_seq - read_seq, limit), "max": limit}
+        return stats
+
+    # ========== Serialization Protocol ==========
+
+    def to_config(self) -> dict:
+        return {
+            "__class_path__": f"{self.__class__.__module__}.{self.__class__.__name__}",
+            "namespace": self.namespace,
+            "slots": self.slots,
+            "slot_size": self.slot_size,
+            "maxlen": self.maxlen
+        }
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'SharedMemoryBroker':
+        return cls(
+            namespace=config.get("namespace", "edgeflow"),
+            slots=config.get("slots", 4),
+            slot_size=config.get("slot_size", 4 * 1024 * 1024),
+            maxlen=config.get("maxlen", 100)
+        )
@@ -0,0 +1,306 @@
+#edgeflow/comms/codecs.py
+"""
+Payload Codec Registry
+- Frame 헤더의 1-byte codec id로 payload 인코딩 방식을 식별
+- 수신 측은 id로 디코더를 바로 선택 (이미지 디코딩 '시도'를 하지 않음)
+- 코덱 지정 문자열: "name" 또는 "name:param" (예: "jpeg:80", "webp:90", "png:3", "zstd:3", "lz4")
+"""
+import struct
+
+# [Optional] Make numpy/cv2 optional for apt-based systems
+try:
+    import numpy as np
+    import cv2
+    _HAS_NUMPY = True
+except ImportError:
+    np = None
+    cv2 = None
+    _HAS_NUMPY = False
+
+# [Optional] 압축 코덱 (pip install edgeflow[compression])
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+_RAW_DTYPE = struct.Struct('!B')     # dtype 문자열 길이
+_RAW_NDIM = struct.Struct('!B')      # 차원 수
+
+
+def pack_raw(arr):
+    """
+    ndarray -> (디스크립터, payload view)
+    - C/F-contiguous 배열은 복사 없이 메모리 그대로 전송 (strides 보존)
+    - 그 외(슬라이싱 등)는 contiguous 복사본을 만들어 전송
+    """
+    if arr.dtype.hasobject:
+        raise ValueError("raw codec does not support object arrays")
+    if not (arr.flags.c_contiguous or arr.flags.f_contiguous):
+        arr = np.ascontiguousarray(arr)
+
+    dtype_str = arr.dtype.str.encode('ascii')
+    dims = struct.pack(f'!{arr.ndim}q{arr.ndim}q', *arr.shape, *arr.strides)
+    desc = _RAW_DTYPE.pack(len(dtype_str)) + dtype_str + _RAW_NDIM.pack(arr.ndim) + dims
+
+    # 메모리 순서 그대로 1차원 view (contiguous이므로 복사 없음)
+    payload = memoryview(arr.ravel(order='K')).cast('B')
+    return desc, payload
+
+
+def _raw_fits(shape, strides, itemsize, size):
+    """shape/strides가 payload(size bytes) 범위 안인지 (as_strided는 범위를 검사하지 않음)"""
+    if any(dim < 0 for dim in shape) or any(stride < 0 for stride in strides):
+        return False
+    if 0 in shape:
+        return True
+    if itemsize == 0 or size % itemsize:
+        return False
+    return sum((dim - 1) * stride for dim, stride in zip(shape, strides)) + itemsize <= size
+
+
+def unpack_raw(desc, payload, writable=True):
+    """
+    (디스크립터, payload view) -> ndarray (np.frombuffer 기반, 실패 시 None)
+    - writable=True (기본): 수신 버퍼가 read-only(bytes)면 복사본 반환 -> JPEG 디코딩 결과처럼 수정 가능 (cv2.rectangle 등)
+    - writable=False: 수신 버퍼를 그대로 가리키는 read-only 배열 (복사 없음, Frame.data_view())
+    - 디스크립터는 네트워크에서 온 값이므로 payload 범위를 벗어나는 shape/strides는 거부 (범위 밖 메모리 읽기 방지)
+    """
+    try:
+        dtype_len = _RAW_DTYPE.unpack_from(desc, 0)[0]
+        offset = _RAW_DTYPE.size
+        dtype = np.dtype(bytes(desc[offset:offset + dtype_len]).decode('ascii'))
+        offset += dtype_len
+        ndim = _RAW_NDIM.unpack_from(desc, offset)[0]
+        offset += _RAW_NDIM.size
+        dims = struct.unpack_from(f'!{ndim}q{ndim}q', desc, offset)
+    except (struct.error, TypeError, ValueError) as e:
+        print(f"⚠️ [Codec] Invalid raw descriptor: {e}")
+        return None
+    shape, strides = dims[:ndim], dims[ndim:]
+    if dtype.hasobject or not _raw_fits(shape, strides, dtype.itemsize, len(payload)):
+        print(f"⚠️ [Codec] Raw descriptor does not match payload "
+              f"(dtype={dtype}, shape={shape}, strides={strides}, {len(payload)} bytes)")
+        return None
+
+    if len(payload) == 0 or 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    flat = np.frombuffer(payload, dtype=dtype)
+    arr = np.lib.stride_tricks.as_strided(flat, shape=shape, strides=strides, writeable=False)
+    if not writable:
+        return arr
+    if flat.flags.writeable:
+        # 쓰기 가능한 수신 버퍼 (bytearray 등): 복사 없이 그대로
+        return np.lib.stride_tricks.as_strided(flat, shape=shape, strides=strides)
+    return arr.copy(order='K')
+
+
+class PayloadCodec:
+    """
+    모든 payload 코덱의 기반 클래스
+    - codec_id: Frame 헤더에 기록되는 1-byte 식별자 (0~255, 전역 유일)
+    - name: 코덱 지정 문자열에서 사용하는 이름
+    """
+    codec_id = None
+    name = None
+
+    def encode(self, arr, param=None):
+        """ndarray -> (디스크립터 bytes, payload buffer)"""
+        raise NotImplementedError
+
+    def encode_bytes(self, data, param=None):
+        """
+        이미 bytes인 데이터 -> (codec_id, 디스크립터, payload)
+        - 기본: 재인코딩 없이 그대로 보내고, 포맷은 매직 넘버로 판별
+        """
+        return sniff_codec(data).codec_id, b"", data
+
+    def decode(self, desc, payload):
+        """(디스크립터, payload memoryview) -> ndarray/bytes (실패 시 None)"""
+        raise NotImplementedError
+
+
+class BytesCodec(PayloadCodec):
+    """인코딩되지 않은 bytes (디코딩 없이 그대로 전달)"""
+    codec_id = 0
+    name = "bytes"
+
+    def encode(self, arr, param=None):
+        return b"", memoryview(np.ascontiguousarray(arr)).cast('B')
+
+    def decode(self, desc, payload):
+        return payload.tobytes()
+
+
+class ImageCodec(PayloadCodec):
+    """OpenCV 이미지 코덱 (JPEG/PNG/WebP 공통)"""
+    ext = None
+    quality_flag = None
+    default_param = None
+    read_flag = cv2.IMREAD_COLOR if _HAS_NUMPY else None  # JPEG: 항상 3채널 BGR (기존 동작)
+
+    def encode(self, arr, param=None):
+        quality = int(param) if param is not None else self.default_param
+        params = [int(self.quality_flag), quality] if quality is not None else []
+        success, buf = cv2.imencode(self.ext, arr, params)
+        return b"", memoryview(buf).cast('B') if success else b""
+
+    def decode(self, desc, payload):
+        if len(payload) == 0:
+            return None
+        return cv2.imdecode(np.frombuffer(payload, np.uint8), self.read_flag)
+
+
+class JpegCodec(ImageCodec):
+    codec_id = 1
+    name = "jpeg"
+    ext = '.jpg'
+    quality_flag = cv2.IMWRITE_JPEG_QUALITY if _HAS_NUMPY else None
+
+
+class RawCodec(PayloadCodec):
+    """ndarray 원본 메모리 그대로 (dtype/shape/strides는 디스크립터에 기록)"""
+    codec_id = 2
+    name = "raw"
+
+    def encode(self, arr, param=None):
+        return pack_raw(arr)
+
+    def decode(self, desc, payload, writable=True):
+        return unpack_raw(desc, payload, writable)
+
+
+class PngCodec(ImageCodec):
+    codec_id = 3
+    name = "png"
+    ext = '.png'
+    quality_flag = cv2.IMWRITE_PNG_COMPRESSION if _HAS_NUMPY else None
+    read_flag = cv2.IMREAD_UNCHANGED if _HAS_NUMPY else None  # 무손실: 1채널 마스크/16-bit depth/alpha 그대로
+    default_param = 1  # 압축 레벨 0~9 (낮을수록 빠름)
+
+
+class WebpCodec(ImageCodec):
+    codec_id = 4
+    name = "webp"
+    ext = '.webp'
+    quality_flag = cv2.IMWRITE_WEBP_QUALITY if _HAS_NUMPY else None
+    read_flag = cv2.IMREAD_UNCHANGED if _HAS_NUMPY else None  # alpha 채널 유지
+
+
+class CompressedRawCodec(PayloadCodec):
+    """RAW(ndarray) 또는 bytes를 범용 압축 (디스크립터가 있으면 ndarray로 복원)"""
+
+    def compress(self, buf, param):
+        raise NotImplementedError
+
+    def decompress(self, buf):
+        raise NotImplementedError
+
+    def encode(self, arr, param=None):
+        desc, payload = pack_raw(arr)
+        return desc, self.compress(payload, param)
+
+    def encode_bytes(self, data, param=None):
+        return self.codec_id, b"", self.compress(data, param)
+
+    def decode(self, desc, payload):
+        raw = self.decompress(payload)
+        if not desc:
+            return raw
+        return unpack_raw(desc, memoryview(raw))
+
+
+class Lz4Codec(CompressedRawCodec):
+    codec_id = 5
+    name = "lz4"
+
+    def compress(self, buf, param):
+        if lz4_frame is None:
+            raise ImportError("lz4 codec requires 'lz4' (pip install lz4)")
+        level = int(param) if param is not None else 0
+        return lz4_frame.compress(buf, compression_level=level)
+
+    def decompress(self, buf):
+        if lz4_frame is None:
+            raise ImportError("lz4 codec requires 'lz4' (pip install lz4)")
+        return lz4_frame.decompress(buf)
+
+
+class ZstdCodec(CompressedRawCodec):
+    codec_id = 6
+    name = "zstd"
+
+    def compress(self, buf, param):
+        if zstandard is None:
+            raise ImportError("zstd codec requires 'zstandard' (pip install zstandard)")
+        level = int(param) if param is not None else 3
+        return zstandard.ZstdCompressor(level=level).compress(buf)
+
+    def decompress(self, buf):
+        if zstandard is None:
+            raise ImportError("zstd codec requires 'zstandard' (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(buf)
+
+
+# ========== Registry ==========
+
+_CODECS_BY_ID = {}
+_CODECS_BY_NAME = {}
+
+
+def register_codec(codec):
+    """코덱 등록 (사용자 정의 코덱은 128 이상의 codec_id 사용 권장)"""
+    if not 0 <= codec.codec_id <= 255:
+        raise ValueError(f"codec_id must fit in one byte: {codec.codec_id}")
+    existing = _CODECS_BY_ID.get(codec.codec_id)
+    if existing is not None and existing.name != codec.name:
+        raise ValueError(f"codec_id {codec.codec_id} already registered by '{existing.name}'")
+    _CODECS_BY_ID[codec.codec_id] = codec
+    _CODECS_BY_NAME[codec.name] = codec
+    return codec
+
+
+def get_codec(codec_id):
+    """codec id -> 코덱 (수신 측 디스패치)"""
+    codec = _CODECS_BY_ID.get(codec_id)
+    if codec is None:
+        raise ValueError(f"Unknown payload codec id: {codec_id}")
+    return codec
+
+
+def parse_codec(spec):
+    """코덱 지정 문자열("name:param") -> (코덱, param)"""
+    name, _, param = (spec or "jpeg").partition(':')
+    codec = _CODECS_BY_NAME.get(name.lower())
+    if codec is None:
+        raise ValueError(f"Unknown payload codec: {spec} (available: {', '.join(sorted(_CODECS_BY_NAME))})")
+    return codec, (param or None)
+
+
+def sniff_codec(data):
+    """
+    이미 인코딩된 bytes의 포맷을 매직 넘버로 판별 (송신 측에서 한 번만 수행)
+    - 사용자가 직접 인코딩한 JPEG bytes도 수신 측에서 ndarray로 복원되도록 유지
+    """
+    head = bytes(data[:12])
+    if head[:3] == b'\xff\xd8\xff':
+        return JPEG
+    if head[:8] == b'\x89PNG\r\n\x1a\n':
+        return PNG
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return WEBP
+    return BYTES
+
+
+BYTES = register_codec(BytesCodec())
+JPEG = register_codec(JpegCodec())
+RAW = register_codec(RawCodec())
+PNG = register_codec(PngCodec())
+WEBP = register_codec(WebpCodec())
+LZ4 = register_codec(Lz4Codec())
+ZSTD = register_codec(ZstdCodec())
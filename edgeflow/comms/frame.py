@@ -1,7 +1,10 @@
 #edgeflow/comms/frame.py
 import time
 import struct
-import json
+import zlib
+
+from .codecs import BYTES, JPEG, RAW, get_codec, parse_codec, sniff_codec
+from .metacodec import NumpyEncoder, encode_meta, decode_meta  # NumpyEncoder: 하위 호환 re-export
 
 # [Optional] Make numpy/cv2 optional for apt-based systems
 try:
@@ -13,121 +16,409 @@ except ImportError:
     cv2 = None
     _HAS_NUMPY = False
 
-class NumpyEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if _HAS_NUMPY:
-            if isinstance(obj, (np.int_, np.intc, np.intp, np.int8,
-                                np.int16, np.int32, np.int64, np.uint8,
-                                np.uint16, np.uint32, np.uint64)):
-                return int(obj)
-            elif isinstance(obj, (np.float_, np.float16, np.float32, np.float64)):
-                return float(obj)
-            elif isinstance(obj, (np.ndarray,)):
-                return obj.tolist()
-        return json.JSONEncoder.default(self, obj)
+# [Wire Format] 고정 헤더 20 bytes + [payload 디스크립터] + [메타데이터] + [trace 블록] + [첨부 블록] + [payload]
+# frame_id(uint32) | timestamp(float64) | codec(uint8, codecs 레지스트리 id) | flags(uint8) | desc_len(uint16) | meta_len(uint32)
+# - frame_id는 항상 offset 0 (Dual 브로커가 헤더만 보고 frame_id를 추출)
+# - flags bit0: 메타데이터가 msgpack 바이너리 (0이면 JSON)
+# - flags bit1: trace 블록 존재 = count(uint8) + count * [stage_id(uint32) | wall_ns(int64, trace_now_ns 참고)]
+# - flags bit2: 첨부 블록 존재 = count(uint8) + count * [name_len(uint8) | codec(uint8) | desc_len(uint16) | data_len(uint32) | name | desc]
+#               + 첨부 데이터들 (순서대로 이어짐, 각각 독립적으로 디코딩 가능)
+# - 매 패킷마다 포맷 문자열을 다시 파싱하지 않도록 미리 컴파일
+_HEADER = struct.Struct('!IdBBHI')
+
+# 구버전(codec/flags 이전) 헤더 16 bytes: frame_id(uint32) | timestamp(float64) | meta_len(uint32) + JSON 메타 + payload
+# - 구버전 메타는 항상 JSON 객체라 offset 16이 '{' (현재 포맷의 offset 16은 meta_len 상위 바이트 -> 0)
+_LEGACY_HEADER = struct.Struct('!IdI')
+_LEGACY_META_START = ord('{')
+
+FLAG_TRACE = 0x02
+TRACE_CAPACITY = 16  # 프레임당 최대 trace 마크 수 (초과분은 기록하지 않음)
+_TRACE_COUNT = struct.Struct('!B')
+_TRACE_ENTRY = struct.Struct('!Iq')
+
+FLAG_ATTACHMENTS = 0x04
+_ATTACH_COUNT = struct.Struct('!B')
+_ATTACH_ENTRY = struct.Struct('!BBHI')
+
+# stage 이름 <-> id (이름의 CRC32, 프로세스/호스트가 달라도 같은 id)
+_STAGE_IDS = {}
+_STAGE_NAMES = {}
+
+
+def stage_id(name):
+    """trace stage 이름 -> 4-byte id (처음 보는 이름은 등록)"""
+    sid = _STAGE_IDS.get(name)
+    if sid is None:
+        sid = zlib.crc32(name.encode('utf-8'))
+        _STAGE_IDS[name] = sid
+        _STAGE_NAMES[sid] = name
+    return sid
+
+
+def stage_name(sid):
+    """trace stage id -> 이름 (이 프로세스에서 mark된 적 없는 이름은 id로 표시)"""
+    return _STAGE_NAMES.get(sid, f"stage_{sid:08x}")
+
+
+def peek_timestamp(raw):
+    """헤더의 timestamp만 읽음 (디코딩 없이 프레임 나이 확인, 헤더가 없으면 None)"""
+    if not raw or len(raw) < _HEADER.size:
+        return None
+    return _HEADER.unpack_from(raw)[1]
+
+
+# 프로세스 시작 시점의 wall clock 기준점 (mark마다 time.time_ns()를 읽으면 NTP step에 따라 역행할 수 있음)
+_WALL_ANCHOR_NS = time.time_ns() - time.monotonic_ns()
+
+
+def trace_now_ns():
+    """
+    trace 시각 = wall clock 기준점 + monotonic 경과 시간 (ns)
+    - 같은 프로세스 안에서는 역행하지 않고, 호스트 간에는 시계 동기화(NTP) 정밀도 안에서 비교 가능
+    """
+    return _WALL_ANCHOR_NS + time.monotonic_ns()
+
+
+_T0 = stage_id('t0')
+stage_id('gateway_in')
+
+class _Attachment:
+    """
+    Frame 첨부 데이터 1개
+    - 송신: value + codec 지정 문자열 (encoded는 처음 보낼 때 채워지고 Fan-out 시 재사용)
+    - 수신: encoded = (codec_id, desc, payload view), 처음 접근할 때 디코딩
+    """
+    __slots__ = ('value', 'codec', 'encoded', 'pending')
+
+    def __init__(self, value=None, codec=None, encoded=None):
+        self.value = value
+        self.codec = codec
+        self.encoded = encoded
+        self.pending = value is None and encoded is not None
+
 
 class Frame:
     """
     EdgeFlow 데이터 전송 표준 객체
     - Numpy(이미지)와 Bytes(전송 데이터) 상태를 모두 처리 가능
+    - 수신한 payload는 frame.data에 처음 접근할 때 디코딩 (Lazy Decode, 결과 캐시)
     - Gateway 성능 최적화를 위한 avoid_decode 옵션 지원
+    - __slots__: 프레임마다 생성되는 인스턴스 __dict__ 할당 제거
     """
-    def __init__(self, frame_id=0, timestamp=0.0, meta=None, data=None):
+    __slots__ = ('frame_id', 'timestamp', 'meta', 'trace', 'payload', '_data', '_lazy', '_encoded',
+                 '_attachments', 'encode_count', 'decode_count', 'decode_time')
+
+    def __init__(self, frame_id=0, timestamp=0.0, meta=None, data=None, trace=None):
         self.frame_id = frame_id
         self.timestamp = timestamp
         self.meta = meta or {}
-        
-        # [Latency Tracking] 생성 시점 기록
-        if 'trace' not in self.meta:
-            self.meta['trace'] = {}
-        if 't0' not in self.meta['trace']:
+
+        # [Latency Tracking] (stage_id, wall_ns) 고정 크기 배열 (packed binary, 그대로 전송)
+        # - trace를 넘기면 이어서 기록 (업스트림 trace 전달), 없으면 생성 시점을 t0로 기록
+        if trace is None:
+            self.trace = bytearray()
             self.mark('t0')
+        else:
+            self.trace = bytearray(trace)
+
+        self.data = data  # 타입: numpy.ndarray(이미지) 또는 bytes/memoryview(인코딩됨)
+        self.payload = None  # 수신 시 원본 버퍼의 payload 영역 (memoryview, zero-copy)
+        self._attachments = None  # 이름 -> _Attachment (mask, depth, embedding 등 추가 버퍼)
+        self.encode_count = 0  # 이 Frame의 payload가 실제로 인코딩(imencode)된 횟수
+        self.decode_count = 0  # 수신 payload가 실제로 디코딩(imdecode 등)된 횟수
+        self.decode_time = 0.0  # 디코딩에 걸린 시간 (초)
+
+    @property
+    def data(self):
+        # [Lazy Decode] 아직 디코딩하지 않은 수신 payload면 지금 디코딩
+        if self._lazy is not None:
+            self._decode_payload()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        # 데이터가 교체되면 인코딩 캐시 무효화
+        # (주의: ndarray를 in-place로 수정한 경우는 감지하지 못하므로 frame.data = ...로 다시 할당할 것)
+        self._data = value
+        self._lazy = None  # (codec, desc): 디코딩 대기 중인 수신 payload
+        self._encoded = {}  # codec -> (codec_id, desc, payload)
+
+    @property
+    def is_decoded(self):
+        """data 접근 시 디코딩이 더 필요 없는지 여부"""
+        return self._lazy is None
+
+    def data_view(self):
+        """
+        frame.data와 같지만 raw 코덱 payload는 수신 버퍼를 그대로 가리키는 read-only ndarray (복사 없음)
+        - 읽기만 하는 노드용 opt-in (input_format = "view"), 수정하려면 frame.data 사용
+        """
+        if self._lazy is not None and self._lazy[0] is RAW:
+            self._decode_payload(writable=False)
+        return self.data
+
+    def _decode_payload(self, writable=True):
+        """수신 payload 디코딩 (한 번만 수행, 비용은 decode_count/decode_time에 누적)"""
+        codec, desc = self._lazy
+        start = time.perf_counter()
+        decoded = codec.decode(desc, self._data) if writable else codec.decode(desc, self._data, writable=False)
+        # 디코딩 실패 시 bytes 유지
+        self._data = decoded if decoded is not None else self._data.tobytes()
+        self._lazy = None
+        self.decode_count += 1
+        self.decode_time += time.perf_counter() - start
+
+    def attach(self, name, value, codec=None):
+        """
+        이름 붙은 첨부 데이터 추가 (payload와 별도의 버퍼로 전송, meta의 tolist() 대체)
+        :param value: ndarray 또는 bytes
+        :param codec: 코덱 지정 문자열 (None="raw": dtype/shape 그대로 무손실, 예: "zstd:3", "png")
+        """
+        if len(name.encode('utf-8')) > 255:
+            raise ValueError(f"attachment name too long: {name}")
+        if self._attachments is None:
+            self._attachments = {}
+        elif name not in self._attachments and len(self._attachments) >= 255:
+            raise ValueError("too many attachments (max 255)")
+        self._attachments[name] = _Attachment(value, codec or "raw")
+
+    def attachment(self, name, default=None):
+        """첨부 데이터 반환 (해당 항목만 디코딩, 결과 캐시)"""
+        att = self._attachments.get(name) if self._attachments else None
+        if att is None:
+            return default
+        if att.pending:
+            codec_id, desc, payload = att.encoded
+            start = time.perf_counter()
+            decoded = get_codec(codec_id).decode(desc, payload) if len(payload) > 0 else b""
+            att.value = decoded if decoded is not None else payload.tobytes()
+            att.pending = False
+            self.decode_count += 1
+            self.decode_time += time.perf_counter() - start
+        return att.value
+
+    def attachment_names(self):
+        """첨부 데이터 이름 목록 (디코딩 없음)"""
+        return list(self._attachments) if self._attachments else []
+
+    def _encode_attachment(self, att):
+        """첨부 데이터 인코딩 (한 번만 수행) -> (codec_id, desc, payload)"""
+        if att.encoded is None:
+            payload_codec, param = parse_codec(att.codec)
+            if _HAS_NUMPY and isinstance(att.value, np.ndarray):
+                self.encode_count += 1
+                desc, payload = payload_codec.encode(att.value, param)
+                att.encoded = (payload_codec.codec_id, desc, payload)
+            else:
+                att.encoded = payload_codec.encode_bytes(att.value, param)
+        return att.encoded
+
+    def _attachment_buffers(self):
+        """첨부 블록 -> [테이블, data1, data2, ...]"""
+        table = [_ATTACH_COUNT.pack(len(self._attachments))]
+        blobs = []
+        for name, att in self._attachments.items():
+            codec_id, desc, payload = self._encode_attachment(att)
+            name_bytes = name.encode('utf-8')
+            table.append(_ATTACH_ENTRY.pack(len(name_bytes), codec_id, len(desc), len(payload)))
+            table.append(name_bytes)
+            table.append(desc)
+            blobs.append(payload)
+        return [b"".join(table)] + blobs
 
-        self.data = data  # 타입: numpy.ndarray(이미지) 또는 bytes(인코딩됨)
+    @staticmethod
+    def _parse_attachments(view, offset):
+        """첨부 블록 파싱 (복사 없이 view만 잡음) -> (이름 -> _Attachment, 블록 끝 offset)"""
+        count = _ATTACH_COUNT.unpack_from(view, offset)[0]
+        offset += _ATTACH_COUNT.size
+        entries = []
+        for _ in range(count):
+            name_len, codec_id, desc_len, data_len = _ATTACH_ENTRY.unpack_from(view, offset)
+            offset += _ATTACH_ENTRY.size
+            name = bytes(view[offset:offset + name_len]).decode('utf-8')
+            offset += name_len
+            desc = view[offset:offset + desc_len]
+            offset += desc_len
+            entries.append((name, codec_id, desc, data_len))
+
+        attachments = {}
+        for name, codec_id, desc, data_len in entries:
+            attachments[name] = _Attachment(encoded=(codec_id, desc, view[offset:offset + data_len]))
+            offset += data_len
+        return attachments, offset
 
     def mark(self, step_name):
-        """현재 시간을 기록 (타임스탬프)"""
-        self.meta['trace'][step_name] = time.time()
+        """현재 시간을 기록 (trace_now_ns, TRACE_CAPACITY개까지)"""
+        if len(self.trace) < TRACE_CAPACITY * _TRACE_ENTRY.size:
+            self.trace += _TRACE_ENTRY.pack(stage_id(step_name), trace_now_ns())
+
+    def trace_marks(self):
+        """trace 기록 -> [(stage 이름, wall_ns), ...] (기록 순서)"""
+        return [(stage_name(sid), ns) for sid, ns in _TRACE_ENTRY.iter_unpack(self.trace)]
 
     def analyze_latency(self):
-        """지연 시간 분석 결과 반환 (ms 단위)"""
-        trace = self.meta['trace']
-        t0 = trace.get('t0', time.time())
-        current = trace.get('gateway_in', time.time())
-        
+        """
+        지연 시간 분석 결과 반환 (ms 단위)
+        - breakdown: stage 이름 -> t0 기준 경과 시간(ms)
+        - 각 호스트의 mark는 wall clock 기준점에 맞춰 기록되므로 다른 호스트의 mark와도 비교 가능
+          (오차는 호스트 간 시계 동기화 정밀도 수준)
+        """
+        now = trace_now_ns()
+        marks = {}
+        for name, ns in self.trace_marks():
+            marks.setdefault(name, ns)  # 같은 stage가 여러 번 mark되면 첫 기록 사용
+        t0 = marks.get('t0', now)
+        current = marks.get('gateway_in', now)
+
         return {
-            "total": (current - t0) * 1000,
-            "breakdown": trace
+            "total": (current - t0) / 1e6,
+            "breakdown": {name: (ns - t0) / 1e6 for name, ns in marks.items()}
         }
 
+    def _trace_block(self):
+        """trace -> wire 블록 (count + entries)"""
+        return _TRACE_COUNT.pack(len(self.trace) // _TRACE_ENTRY.size) + self.trace
+
     @classmethod
     def from_bytes(cls, raw_bytes, avoid_decode=False):
         """
-        네트워크 패킷(Bytes) -> Frame 객체 변환
-        :param avoid_decode: True일 경우 이미지 디코딩을 건너뛰고 bytes 상태로 유지 (Gateway용)
+        네트워크 패킷(Bytes) -> Frame 객체 변환 (Zero-Copy)
+        - 헤더는 memoryview 위에서 unpack_from으로 직접 파싱 (슬라이스 복사 없음)
+        - payload는 수신 버퍼를 가리키는 memoryview로 노출 (frame.payload)
+        - 디코딩은 frame.data에 처음 접근할 때 수행 (meta만 보거나 버리는 프레임은 디코딩 비용 없음)
+        :param avoid_decode: True일 경우 JPEG/bytes payload는 디코딩하지 않고 bytes 상태로 유지 (Gateway용)
         """
-        # 헤더 최소 길이(16 bytes) 체크
-        if not raw_bytes or len(raw_bytes) < 16:
+        # 헤더 최소 길이 체크 (구버전 16 bytes + '{}', 현재 20 bytes)
+        if not raw_bytes or len(raw_bytes) <= _LEGACY_HEADER.size:
             return None
         
         try:
-            # 1. 고정 헤더 파싱 (Frame ID, Timestamp) - 12 bytes
-            f_id, ts = struct.unpack('!Id', raw_bytes[:12])
-            
-            # 2. 메타데이터 길이 파싱 - 4 bytes
-            json_len = struct.unpack('!I', raw_bytes[12:16])[0]
-            
-            # 3. 메타데이터 바디 파싱
-            meta_end_idx = 16 + json_len
-            meta_bytes = raw_bytes[16:meta_end_idx]
-            meta = json.loads(meta_bytes.decode('utf-8'))
+            view = memoryview(raw_bytes)
+            if view[_LEGACY_HEADER.size] == _LEGACY_META_START:
+                return cls._from_legacy(view, avoid_decode)
+            if len(view) < _HEADER.size:
+                return None
+
+            # 1. 고정 헤더 파싱 (Frame ID, Timestamp, Codec, Desc/Meta Length) - 20 bytes
+            f_id, ts, codec_id, flags, desc_len, meta_len = _HEADER.unpack_from(view)
             
-            # 4. 데이터 페이로드 추출
-            payload = raw_bytes[meta_end_idx:]
-
-            # [핵심 로직] 디코딩 여부 결정
-            # payload가 있고, avoid_decode가 False일 때만 Numpy로 변환
-            if not avoid_decode and len(payload) > 0:
-                # 이미지 데이터라고 가정하고 디코딩 시도
-                nparr = np.frombuffer(payload, np.uint8)
-                img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                # 디코딩 성공 시 Numpy 배열로 교체, 실패 시 bytes 유지(일반 데이터일 수 있음)
-                if img is not None:
-                    payload = img
-                
-            return cls(frame_id=f_id, timestamp=ts, meta=meta, data=payload)
+            # 2. payload 디스크립터 (RAW: dtype/shape/strides)
+            desc_end_idx = _HEADER.size + desc_len
+            desc = view[_HEADER.size:desc_end_idx]
+
+            # 3. 메타데이터 바디 파싱 (flags로 msgpack/JSON 구분)
+            meta_end_idx = desc_end_idx + meta_len
+            meta = decode_meta(view[desc_end_idx:meta_end_idx], flags)
+
+            # 4. trace 블록 (없으면 구버전 송신자: 수신 시점을 t0로 기록)
+            trace = None
+            if flags & FLAG_TRACE:
+                count = _TRACE_COUNT.unpack_from(view, meta_end_idx)[0]
+                trace_idx = meta_end_idx + _TRACE_COUNT.size
+                meta_end_idx = trace_idx + count * _TRACE_ENTRY.size
+                trace = view[trace_idx:meta_end_idx]
+
+            # 5. 첨부 블록 (각 첨부는 접근할 때 개별 디코딩)
+            attachments = None
+            if flags & FLAG_ATTACHMENTS:
+                attachments, meta_end_idx = cls._parse_attachments(view, meta_end_idx)
+
+            # 6. 데이터 페이로드 추출 (복사 없이 수신 버퍼를 그대로 참조)
+            payload = view[meta_end_idx:]
+
+            # [핵심 로직] 헤더의 codec id로 디코더 선택 (이미지 디코딩 '시도' 없음)
+            codec = get_codec(codec_id)
+            frame = cls(frame_id=f_id, timestamp=ts, meta=meta, data=payload, trace=trace)
+            frame.payload = payload
+            frame._attachments = attachments
+
+            # Gateway(avoid_decode)는 JPEG/bytes를 그대로 스트리밍하므로 디코딩 생략
+            if not (avoid_decode and codec in (JPEG, BYTES)) and len(payload) > 0:
+                frame._lazy = (codec, desc)
+            return frame
             
         except Exception as e:
             # 상용에서는 로깅 필요 (print는 디버깅용)
             print(f"[Frame Error] Deserialization failed: {e}")
             return None
 
-    def to_bytes(self):
-        """Frame 객체 -> 네트워크 패킷(Bytes) 변환"""
-        data_bytes = b""
-
-        # 1. 데이터 타입 처리
-        if isinstance(self.data, np.ndarray):
-            success, buf = cv2.imencode('.jpg', self.data)
-            if success:
-                data_bytes = buf.tobytes()
-        elif isinstance(self.data, bytes):
-            data_bytes = self.data
-        
-        # 2. 메타데이터 직렬화 (cls=NumpyEncoder 추가!)
-        # AI 결과값(score 등)이 Numpy 타입이어도 에러가 안 나게 처리
-        meta_bytes = json.dumps(self.meta, cls=NumpyEncoder).encode('utf-8')
+    @classmethod
+    def _from_legacy(cls, view, avoid_decode):
+        """구버전 송신자의 패킷 (JSON 메타, codec id 없음 -> payload 매직 넘버로 판별)"""
+        f_id, ts, meta_len = _LEGACY_HEADER.unpack_from(view)
+        meta_end_idx = _LEGACY_HEADER.size + meta_len
+        meta = decode_meta(view[_LEGACY_HEADER.size:meta_end_idx], 0)
+        payload = view[meta_end_idx:]
+        codec = sniff_codec(payload)
+        frame = cls(frame_id=f_id, timestamp=ts, meta=meta, data=payload, trace=None)
+        frame.payload = payload
+        frame._attachments = None
+        if not (avoid_decode and codec in (JPEG, BYTES)) and len(payload) > 0:
+            frame._lazy = (codec, b"")
+        return frame
+
+    def _encode_payload(self, codec=None):
+        """
+        payload 인코딩 (Encode-Once Cache) -> (codec_id, 디스크립터, payload)
+        - Fan-out 시 여러 핸들러가 같은 Frame을 보내도 코덱별 인코딩은 한 번만 수행
+        - 인코딩 버퍼를 tobytes()로 복사하지 않고 view로 보관
+        - 아직 디코딩하지 않은 수신 payload를 같은 코덱으로 보내면 디코딩/재인코딩 없이 그대로 전달
+        :param codec: 코덱 지정 문자열 ("jpeg"(기본), "jpeg:80", "png", "webp:90", "raw", "lz4", "zstd:3")
+        """
+        codec = codec or "jpeg"
+        encoded = self._encoded.get(codec)
+        if encoded is None:
+            payload_codec, param = parse_codec(codec)
+            if self._lazy is not None and self._lazy[0] is payload_codec and param is None:
+                # 수신한 payload를 그대로 전달 (디코딩/재인코딩 없음)
+                encoded = (payload_codec.codec_id, self._lazy[1], self._data)
+            else:
+                data = self.data  # 다른 코덱으로 보내야 하면 여기서 디코딩
+                encoded = (BYTES.codec_id, b"", b"")
+                if _HAS_NUMPY and isinstance(data, np.ndarray):
+                    self.encode_count += 1
+                    desc, payload = payload_codec.encode(data, param)
+                    encoded = (payload_codec.codec_id, desc, payload)
+                elif isinstance(data, (bytes, memoryview)):
+                    encoded = payload_codec.encode_bytes(data, param)
+            self._encoded[codec] = encoded
+        return encoded
+
+    def to_buffers(self, meta_overrides=None, codec=None):
+        """
+        Frame 객체 -> Scatter-Gather 버퍼 리스트 [header, desc, meta, trace, (첨부...), payload] 변환
+        - payload(이미지 bytes)는 이어 붙이지 않고 그대로 전달 (sendmsg/Redis APPEND 용)
+        - 순서대로 이어 붙이면 to_bytes()와 동일한 패킷이 됨
+        :param meta_overrides: 이 전송에만 적용할 메타데이터 (원본 frame.meta는 수정하지 않음)
+        :param codec: payload 코덱 지정 문자열 (None="jpeg", "raw": 같은 호스트 노드 간 무손실/무인코딩 등)
+        """
+        # 1. 데이터 타입 처리 (캐시된 인코딩 결과 재사용)
+        codec_id, desc, data_bytes = self._encode_payload(codec)
         
+        # 2. 메타데이터 직렬화 (msgpack 바이너리, settings.META_CODEC="json"이면 기존 JSON)
+        # AI 결과값(score, bbox 배열 등)이 Numpy 타입이어도 tolist() 없이 그대로 처리
+        meta = {**self.meta, **meta_overrides} if meta_overrides else self.meta
+        flags, meta_bytes = encode_meta(meta)
+        flags |= FLAG_TRACE
+        attachment_buffers = []
+        if self._attachments:
+            flags |= FLAG_ATTACHMENTS
+            attachment_buffers = self._attachment_buffers()
+
         # 3. 헤더 패킹 (강제 형변환 적용 확인됨 ✅)
-        header = struct.pack('!Id', int(self.frame_id), float(self.timestamp))
-        meta_len_header = struct.pack('!I', len(meta_bytes))
-        
-        return header + meta_len_header + meta_bytes + data_bytes
+        header = _HEADER.pack(int(self.frame_id), float(self.timestamp), codec_id, flags,
+                              len(desc), len(meta_bytes))
+
+        return [header, desc, meta_bytes, self._trace_block(), *attachment_buffers, data_bytes]
+
+    def to_bytes(self, meta_overrides=None, codec=None):
+        """Frame 객체 -> 네트워크 패킷(Bytes) 변환"""
+        return b"".join(self.to_buffers(meta_overrides, codec))
+
+    def get_data_buffer(self):
+        """get_data_bytes()와 동일하지만 인코딩 결과/수신 버퍼를 복사하지 않고 그대로 반환"""
+        return self._encode_payload("jpeg")[2]
 
     def get_data_bytes(self):
-        """WebInterface 등 외부 송출을 위해 순수 데이터만 Bytes로 반환"""
-        if isinstance(self.data, np.ndarray):
-            success, buf = cv2.imencode('.jpg', self.data)
-            return buf.tobytes() if success else b""
-        
-        return self.data if isinstance(self.data, bytes) else b""
\ No newline at end of file
+        """WebInterface 등 외부 송출을 위해 순수 데이터만 Bytes로 반환 (ndarray는 JPEG)"""
+        return bytes(self.get_data_buffer())
\ No newline at end of file
@@ -0,0 +1,113 @@
+#edgeflow/comms/metacodec.py
+"""
+Frame Metadata Codec
+- 기본: msgpack 바이너리 (numpy 스칼라/배열을 tolist() 없이 그대로 직렬화)
+- 호환: JSON (사람이 읽을 수 있는 기존 포맷, msgpack 미설치 시 자동 사용)
+- 어떤 포맷인지는 Frame 헤더의 flags 비트(FLAG_META_MSGPACK)로 구분하므로 두 포맷이 섞여도 수신 가능
+"""
+import json
+import struct
+
+from .codecs import pack_raw, unpack_raw
+from ..config import settings
+
+# [Optional] Make numpy/cv2 optional for apt-based systems
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except ImportError:
+    np = None
+    _HAS_NUMPY = False
+
+# [Optional] msgpack (없으면 JSON으로 동작)
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# Frame 헤더 flags 비트
+FLAG_META_MSGPACK = 0x01
+
+# msgpack ext type 코드
+_EXT_NDARRAY = 1
+_EXT_DESC_LEN = struct.Struct('!H')
+
+
+class NumpyEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if _HAS_NUMPY:
+            if isinstance(obj, np.integer):
+                return int(obj)
+            elif isinstance(obj, np.floating):
+                return float(obj)
+            elif isinstance(obj, np.bool_):
+                return bool(obj)
+            elif isinstance(obj, (np.ndarray,)):
+                return obj.tolist()
+        return json.JSONEncoder.default(self, obj)
+
+
+def _msgpack_default(obj):
+    """msgpack이 모르는 타입 처리: numpy 배열은 ext(RAW 디스크립터 + 메모리), 스칼라는 파이썬 값"""
+    if _HAS_NUMPY:
+        if isinstance(obj, np.ndarray):
+            desc, payload = pack_raw(obj)
+            return msgpack.ExtType(_EXT_NDARRAY, _EXT_DESC_LEN.pack(len(desc)) + desc + bytes(payload))
+        if isinstance(obj, np.generic):
+            return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
+
+
+def _msgpack_ext_hook(code, data):
+    if code == _EXT_NDARRAY:
+        view = memoryview(data)
+        desc_len = _EXT_DESC_LEN.unpack_from(view)[0]
+        desc_end = _EXT_DESC_LEN.size + desc_len
+        # unpack_raw가 shape/strides를 payload 범위와 대조 (맞지 않으면 None)
+        return unpack_raw(view[_EXT_DESC_LEN.size:desc_end], view[desc_end:])
+    return msgpack.ExtType(code, data)
+
+
+def use_binary_meta():
+    """송신 측 메타 포맷 결정 (settings.META_CODEC == "json"이면 기존 JSON 유지)"""
+    return msgpack is not None and settings.META_CODEC != "json"
+
+
+def encode_meta(meta, binary=None):
+    """
+    meta dict -> (flags, bytes)
+    :param binary: None이면 settings.META_CODEC에 따름
+    """
+    if binary is None:
+        binary = use_binary_meta()
+    if binary:
+        return FLAG_META_MSGPACK, msgpack.packb(meta, default=_msgpack_default, use_bin_type=True)
+    return 0, json.dumps(meta, cls=NumpyEncoder).encode('utf-8')
+
+
+def decode_meta(buf, flags):
+    """(메타 영역 memoryview, 헤더 flags) -> meta dict"""
+    if flags & FLAG_META_MSGPACK:
+        if msgpack is None:
+            raise ImportError("binary frame metadata requires 'msgpack' (pip install msgpack)")
+        # msgpack은 buffer protocol을 직접 읽으므로 복사 없음
+        return msgpack.unpackb(buf, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+    # json.loads는 bytes가 필요하므로 메타 부분만 복사
+    return json.loads(bytes(buf))
+
+
+def json_safe(obj):
+    """
+    msgpack으로 받은 메타(ndarray/bytes 포함)를 JSON 응답용으로 변환
+    - Gateway의 상태 API/WebSocket 등 브라우저로 나가는 경로에서만 사용
+    """
+    if isinstance(obj, dict):
+        return {str(k) if not isinstance(k, str) else k: json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [json_safe(v) for v in obj]
+    if _HAS_NUMPY and isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return bytes(obj).hex()
+    return obj
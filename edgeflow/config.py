@@ -19,5 +19,11 @@ class Config:
     GATEWAY_TCP_PORT: int = int(os.getenv("GATEWAY_TCP_PORT", GATEWAY_TCP_PORT))
     GATEWAY_HTTP_PORT: int = int(os.getenv("GATEWAY_HTTP_PORT", GATEWAY_HTTP_PORT))
 
+    # Frame 메타데이터 포맷 ("msgpack": 바이너리(기본), "json": 사람이 읽을 수 있는 기존 포맷)
+    META_CODEC: str = os.getenv("META_CODEC", "msgpack")
+
+    # 노드 stats(node.stats) 출력 간격 (초, 0이면 종료 시에만)
+    NODE_STATS_INTERVAL: float = float(os.getenv("NODE_STATS_INTERVAL", 0))
+
 # 전역 설정 객체
 settings = Config()
\ No newline at end of file
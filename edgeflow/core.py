@@ -9,7 +9,7 @@ from typing import Dict, Any, Optional, List
 from .handlers import RedisHandler, TcpHandler
 from .config import settings
 from .registry import NodeSpec, NodeRegistry
-from .qos import QoS
+from .qos import MaxLag, QoS
 
 
 class Linker:
@@ -17,8 +17,21 @@ class Linker:
         self.system = system
         self.source = source
 
-    def to(self, target: NodeSpec, channel: str = None, qos: QoS = QoS.REALTIME) -> 'Linker':
-        """Register a connection between nodes with QoS policy"""
+    def to(self, target: NodeSpec, channel: str = None, qos: QoS = QoS.REALTIME,
+           codec: str = None, max_lag=None) -> 'Linker':
+        """
+        Register a connection between nodes with QoS policy
+        - codec: ndarray payload codec for this link (None/"jpeg" = JPEG, "raw" = uncompressed tensor
+                 for co-located nodes; the receiver gets a writable copy, and nodes that only read can opt
+                 into a zero-copy read-only view with frame.data_view() / input_format = "view")
+        - max_lag: QoS.BALANCED skip threshold, frames (int) or time ("200ms", "0.5s")
+                   (default qos.DEFAULT_MAX_LAG; the consumer jumps to the newest frame once it lags more)
+        """
+        if max_lag is not None:
+            if qos != QoS.BALANCED:
+                raise ValueError(f"max_lag only applies to QoS.BALANCED ({self.source.name} -> {target.name})")
+            MaxLag.parse(max_lag)  # 잘못된 값은 연결 시점에 즉시 실패
+
         # 1. Output (Source -> Target)
         if 'targets' not in self.source.config:
             self.source.config['targets'] = []
@@ -35,7 +48,9 @@ class Linker:
                 'name': target.name,
                 'protocol': protocol,
                 'channel': channel,
-                'qos': qos
+                'qos': qos,
+                'codec': codec,
+                'max_lag': max_lag
             })
         else:
             print(f"⚠️ Duplicate link ignored: {self.source.name} -> {target.name}")
@@ -49,7 +64,8 @@ class Linker:
         if self.source.name not in existing_sources:
             target.config['sources'].append({
                 'name': self.source.name,
-                'qos': qos
+                'qos': qos,
+                'max_lag': max_lag
             })
         
         return Linker(self.system, target)
@@ -75,8 +91,8 @@ class System:
             module = importlib.import_module(module_path)
             
             # Find EdgeNode subclass
-            from .nodes import EdgeNode, ProducerNode, ConsumerNode, GatewayNode, FusionNode, SinkNode
-            base_classes = {EdgeNode, ProducerNode, ConsumerNode, GatewayNode, FusionNode, SinkNode}
+            from .nodes import EdgeNode, ProducerNode, ConsumerNode, AsyncConsumerNode, GatewayNode, FusionNode, SinkNode
+            base_classes = {EdgeNode, ProducerNode, ConsumerNode, AsyncConsumerNode, GatewayNode, FusionNode, SinkNode}
             
             for obj in vars(module).values():
                 if isinstance(obj, type) and issubclass(obj, EdgeNode):
@@ -145,8 +161,8 @@ class System:
             module = importlib.import_module(module_path)
             
             # Find class
-            from .nodes import EdgeNode, ProducerNode, ConsumerNode, GatewayNode, FusionNode, SinkNode
-            base_classes = {EdgeNode, ProducerNode, ConsumerNode, GatewayNode, FusionNode, SinkNode}
+            from .nodes import EdgeNode, ProducerNode, ConsumerNode, AsyncConsumerNode, GatewayNode, FusionNode, SinkNode
+            base_classes = {EdgeNode, ProducerNode, ConsumerNode, AsyncConsumerNode, GatewayNode, FusionNode, SinkNode}
             
             node_cls = None
             for obj_name, obj in vars(module).items():
@@ -2,26 +2,56 @@
 import socket
 import struct
 import asyncio
+import threading
+
+
+def _sendmsg_all(sock, buffers):
+    """
+    sendmsg(writev)로 여러 버퍼를 복사 없이 한 번에 전송 (sendall의 Scatter-Gather 버전)
+    - 부분 전송 시 남은 부분부터 이어서 전송
+    """
+    views = [memoryview(b).cast('B') for b in buffers if len(b)]
+    if not hasattr(sock, 'sendmsg'):
+        # sendmsg 미지원 플랫폼 (Windows) 폴백
+        sock.sendall(b"".join(views))
+        return
+    while views:
+        sent = sock.sendmsg(views)
+        while sent:
+            if sent >= len(views[0]):
+                sent -= len(views[0])
+                views.pop(0)
+            else:
+                views[0] = views[0][sent:]
+                sent = 0
 
 class RedisHandler:
-    def __init__(self, broker, topic, queue_size=1):
+    def __init__(self, broker, topic, queue_size=1, codec=None):
         self.broker = broker
         self.topic = topic
         self.queue_size = queue_size
+        self.codec = codec  # ndarray payload 코덱 (None=jpeg, "raw")
 
-    def send(self, frame):
-        # Redis 브로커를 통해 전송 (기존 Broker.push 재사용)
-        self.broker.push(self.topic, frame.to_bytes())
+    def pack(self, frame):
+        """broker.push_many()용 (topic, 버퍼 리스트) - payload 이어 붙이지 않음"""
+        return self.topic, frame.to_buffers(codec=self.codec)
+
+    def limits(self):
+        """broker.push_many()용 topic -> 큐 크기 (0이면 trim 안 함)"""
+        return {self.topic: self.queue_size} if self.queue_size > 0 else {}
 
-        if self.queue_size > 0:
-            self.broker.trim(self.topic, self.queue_size)
+    def send(self, frame):
+        # Redis 브로커를 통해 전송 (쓰기 + trim을 한 번의 왕복으로)
+        self.broker.push_many([self.pack(frame)], self.limits())
 
 class TcpHandler:
-    def __init__(self, host, port, source_id):
+    def __init__(self, host, port, source_id, codec=None):
         self.host = host
         self.port = port
         self.source_id = source_id
+        self.codec = codec  # ndarray payload 코덱 (None=jpeg, "raw")
         self.sock = None
+        self._lock = threading.Lock()  # AsyncConsumerNode는 여러 스레드에서 send -> 패킷이 섞이지 않도록
 
     def connect(self):
         try:
@@ -38,23 +68,26 @@ class TcpHandler:
             self.sock = None
 
     def send(self, frame):
+        with self._lock:
+            self._send(frame)
+
+    def _send(self, frame):
         if self.sock is None:
             self.connect()
             if self.sock is None: return
 
         try:
             # 1. [Identity] Gateway 라우팅을 위해 소스 ID 주입
-            # 원본 프레임의 메타데이터를 수정하는 것이므로 주의 (복사본 사용 권장되나 성능상 직접 수정)
-            frame.meta["topic"] = self.source_id
+            # 원본 frame.meta는 수정하지 않고 이 전송의 메타데이터에만 덮어씀 (payload 인코딩은 캐시 재사용)
+            meta_overrides = {"topic": self.source_id}
 
-            # 2. [Serialization] Frame -> Bytes
-            packet_body = frame.to_bytes()
+            # 2. [Serialization] Frame -> Buffers (Scatter-Gather)
+            buffers = frame.to_buffers(meta_overrides, codec=self.codec)
             
             # 3. [Framing] 길이 헤더 추가 (4 bytes)
-            length_header = struct.pack('>I', len(packet_body))
-            
-            # print(f"DEBUG: TcpHandler sending topic={frame.meta.get('topic')} len={len(packet_body)}")
-            self.sock.sendall(length_header + packet_body)
+            length_header = struct.pack('>I', sum(len(b) for b in buffers))
+
+            _sendmsg_all(self.sock, [length_header] + buffers)
 
         except (BrokenPipeError, ConnectionResetError):
             self.sock.close()
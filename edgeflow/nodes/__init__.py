@@ -7,6 +7,7 @@ EdgeFlow Node Types (Arduino Pattern)
 from .base import EdgeNode
 from .producer import ProducerNode
 from .consumer import ConsumerNode
+from .async_consumer import AsyncConsumerNode
 from .fusion import FusionNode
 from .sink import SinkNode
 from .gateway.core import GatewayNode
@@ -15,6 +16,7 @@ __all__ = [
     "EdgeNode", 
     "ProducerNode", 
     "ConsumerNode", 
+    "AsyncConsumerNode",
     "GatewayNode", 
     "FusionNode",
     "SinkNode"
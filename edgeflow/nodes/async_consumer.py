@@ -0,0 +1,104 @@
+#edgeflow/nodes/async_consumer.py
+"""
+AsyncConsumerNode - I/O 대기가 긴 처리 노드 (HTTP API, DB 등)
+
+Arduino Pattern:
+- setup(): 초기화
+- async loop(data): 데이터 처리 및 반환 (await 중에도 다음 프레임을 계속 받아 처리)
+"""
+import asyncio
+from .consumer import ConsumerNode
+from ..comms import Frame
+from ..handlers import RedisHandler
+from ..qos import QoS
+
+
+class AsyncConsumerNode(ConsumerNode):
+    """
+    async loop()로 여러 프레임을 동시에 처리하는 노드
+    - max_in_flight: 동시에 처리 중인 프레임 수 상한 (가득 차면 다음 프레임을 가져오지 않고 대기)
+    - 결과는 완료 순서대로 전송됨 (frame_id/timestamp는 입력 프레임 그대로)
+    - loop() 안의 CPU 작업은 이벤트 루프를 막으므로 input_format = "bytes"/"meta" 권장
+    """
+    max_in_flight = 16
+
+    async def loop(self, data):
+        """
+        [User Hook] 데이터를 비동기로 처리하여 반환 (ConsumerNode.loop와 같은 반환 형식)
+        - 예: async with session.post(url, data=data) as resp: return data, await resp.json()
+        """
+        raise NotImplementedError("AsyncConsumerNode requires async loop(data) implementation")
+
+    def _run_loop(self):
+        """[Internal] 이벤트 루프에서 프레임 수신/처리"""
+        target = self._input_target()
+        if target is None:
+            return
+        asyncio.run(self._run_async(*target))
+
+    async def _run_async(self, target_topic, qos):
+        group_name = getattr(self, 'name', 'default')
+        consumer_id = self.hostname
+        self.async_broker = self.broker.to_async()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        tasks = set()
+
+        print(f"🧠 Async Consumer started (QoS: {qos.name}, max_in_flight: {self.max_in_flight}), "
+              f"Input: {target_topic}, Group: {group_name}")
+        max_lag = self._input_max_lag() if qos == QoS.BALANCED else None
+
+        try:
+            while self.running:
+                # 처리 중인 프레임이 max_in_flight개면 하나가 끝날 때까지 대기 (back-pressure)
+                await slots.acquire()
+                if qos == QoS.REALTIME:
+                    packet = await self.async_broker.pop_latest(target_topic, timeout=1, group=group_name, consumer=consumer_id)
+                elif qos == QoS.BALANCED:
+                    skipped = self.async_broker.skipped_frames
+                    packet = await self.async_broker.pop_balanced(target_topic, max_lag, timeout=1,
+                                                                  group=group_name, consumer=consumer_id)
+                    self.stats["frames_skipped"] += self.async_broker.skipped_frames - skipped
+                else:
+                    packet = await self.async_broker.pop(target_topic, timeout=1, group=group_name, consumer=consumer_id)
+
+                frame = Frame.from_bytes(packet) if packet else None
+                if not frame:
+                    slots.release()
+                    continue
+
+                task = asyncio.create_task(self._process(frame, slots))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await self.async_broker.close()
+
+    async def _process(self, frame, slots):
+        """[Internal] 프레임 하나 처리 (Task)"""
+        try:
+            resp = self._make_result(frame, await self.loop(self._loop_input(frame)))
+            if resp is not None:
+                await self.send_result_async(resp)
+        except Exception as e:
+            print(f"⚠️ Consumer Error in node '{self.name}': {e}")
+        finally:
+            self._record_decode(frame)
+            slots.release()
+
+    async def send_result_async(self, frame):
+        """send_result()의 async 버전 (Redis 전송은 async 브로커 사용, TCP 핸들러는 스레드에서 전송)"""
+        if not frame:
+            return
+        encodes_before = frame.encode_count
+        for broker, items, limits in self._dispatch(frame, send_direct=False):
+            if broker is self.broker:
+                await self.async_broker.push_many(items, limits)
+            else:
+                await asyncio.to_thread(broker.push_many, items, limits)
+        for handler in self.output_handlers:
+            if not isinstance(handler, RedisHandler):
+                # 블로킹 소켓 전송 (Gateway가 느리면 sendmsg가 대기) -> 이벤트 루프를 막지 않도록
+                await asyncio.to_thread(handler.send, frame)
+        self._count_sent(frame, encodes_before)
@@ -6,7 +6,10 @@ Arduino-style Node Base Class
 """
 from abc import ABC, abstractmethod
 import os
+import time
 from ..comms import RedisBroker
+from ..config import settings
+from ..handlers import RedisHandler
 
 
 class EdgeNode(ABC):
@@ -18,6 +21,8 @@ class EdgeNode(ABC):
     - loop(): Called repeatedly (user override)
     """
     node_type = "generic"
+    codec = None  # 출력 payload 기본 코덱 (링크에 codec이 없을 때 사용, 예: "jpeg:90", "webp", "raw")
+    stats_interval = None  # stats 출력 간격 (초, None이면 NODE_STATS_INTERVAL, 0이면 종료 시에만)
     
     def __init__(self, broker=None, **kwargs):
         self.running = True
@@ -33,6 +38,19 @@ class EdgeNode(ABC):
         self.input_topics = []
         self.output_handlers = []
 
+        # Node Stats (누적 카운터)
+        # - payload_encodes < handler_sends 이면 Fan-out에서 인코딩 캐시가 동작 중
+        # - payload_decodes < frames_received 이면 Lazy Decode로 디코딩을 건너뛴 프레임이 있음
+        # - batches: Micro-batching 시 loop_batch() 호출 수 (frames_received / batches = 평균 배치 크기)
+        # - frames_skipped: QoS.BALANCED에서 max_lag를 넘어 건너뛴 프레임 수
+        # stats_interval마다, 그리고 종료 시 한 줄로 출력 (_report_stats)
+        self.stats = {"frames_sent": 0, "handler_sends": 0, "payload_encodes": 0,
+                      "frames_received": 0, "payload_decodes": 0, "decode_ms": 0.0,
+                      "batches": 0, "frames_skipped": 0}
+        if self.stats_interval is None:
+            self.stats_interval = settings.NODE_STATS_INTERVAL
+        self._next_report = time.monotonic() + self.stats_interval
+
         if not self.broker:
             self.broker = RedisBroker(host)
             
@@ -57,27 +75,69 @@ class EdgeNode(ABC):
         """연결된 모든 핸들러에게 데이터 전송"""
         if not frame:
             return
+        encodes_before = frame.encode_count
+        for broker, items, limits in self._dispatch(frame):
+            broker.push_many(items, limits)
+        self._count_sent(frame, encodes_before)
+
+    def _dispatch(self, frame, send_direct=True):
+        """
+        [Internal] Redis 외 핸들러(TCP 등)는 바로 전송하고 (send_direct=False면 호출 측이 따로 전송),
+        Redis 핸들러는 브로커별로 모아 (broker, items, limits) 목록으로 반환
+        (push_many() 한 번으로 전송 -> 토픽/핸들러 수와 무관하게 1 왕복)
+        """
+        batches = {}  # id(broker) -> (broker, items, limits)
         for handler in self.output_handlers:
-            handler.send(frame)
+            if isinstance(handler, RedisHandler):
+                _, items, limits = batches.setdefault(id(handler.broker), (handler.broker, [], {}))
+                items.append(handler.pack(frame))
+                limits.update(handler.limits())
+            elif send_direct:
+                handler.send(frame)
+        return list(batches.values())
+
+    def _count_sent(self, frame, encodes_before):
+        """[Internal] 전송 통계 누적"""
+        self.stats["frames_sent"] += 1
+        self.stats["handler_sends"] += len(self.output_handlers)
+        self.stats["payload_encodes"] += frame.encode_count - encodes_before
+        self._tick_stats()
+
+    def _tick_stats(self):
+        """[Internal] stats_interval이 지났으면 stats 출력 (프레임마다 호출, 꺼져 있으면 비교 한 번)"""
+        if self.stats_interval and time.monotonic() >= self._next_report:
+            self._next_report = time.monotonic() + self.stats_interval
+            self._report_stats()
+
+    def _report_stats(self):
+        """[Internal] 0이 아닌 stats 누적 카운터를 한 줄로 출력"""
+        counters = [f"{key}={round(value, 1) if isinstance(value, float) else value}"
+                    for key, value in self.stats.items() if value]
+        if counters:
+            print(f"📊 [{self.name}] " + " ".join(counters), flush=True)
 
     def _apply_wiring(self, config):
         """Apply wiring from config (sources/targets)"""
-        from ..handlers import RedisHandler, TcpHandler
-        from ..qos import QoS
+        from ..handlers import TcpHandler
+        from ..qos import MaxLag, QoS
         from ..config import settings
         
         # Sources (Input)
         # config['sources'] = [{'name': 'camera', 'qos': ...}]
         for src in config.get('sources', []):
-            topic = src['name']
+            # 생산자와 같은 규칙으로 내 큐 이름 결정 (List 브로커: 구독자별 큐)
+            topic = self.broker.subscriber_topic(src['name'], self.name)
             qos = src.get('qos', QoS.REALTIME)
             if isinstance(qos, int): qos = QoS(qos)
             
-            self.input_topics.append({'topic': topic, 'qos': qos})
+            entry = {'topic': topic, 'qos': qos}
+            if qos == QoS.BALANCED:
+                entry['max_lag'] = MaxLag.parse(src.get('max_lag'))
+            self.input_topics.append(entry)
                 
         # Targets (Output)
         # config['targets'] = [{'name': 'yolo', 'protocol': 'redis', ...}]
-        redis_topics = set()
+        redis_topics = {}  # topic -> RedisHandler
         for tgt in config.get('targets', []):
             protocol = tgt.get('protocol', 'redis')
             target_name = tgt['name']
@@ -86,13 +146,14 @@ class EdgeNode(ABC):
                 source_id = tgt.get('channel') or self.name
                 gw_host = settings.GATEWAY_HOST
                 gw_port = settings.GATEWAY_TCP_PORT
-                handler = TcpHandler(gw_host, gw_port, source_id)
+                handler = TcpHandler(gw_host, gw_port, source_id, codec=self._link_codec(tgt))
                 self.output_handlers.append(handler)
                 print(f"🔗 [Direct] {self.name} ==(TCP)==> {target_name} (ID: {source_id})")
             else:
-                topic = self.name # Pub/Sub uses my name as topic
+                # Pub/Sub uses my name as topic (List 브로커: 구독자마다 별도 큐 -> 핸들러도 구독자별)
+                topic = self.broker.subscriber_topic(self.name, target_name)
                 
-                # QoS determines queue size: REALTIME=1 (latest only), DURABLE=100 (buffer)
+                # QoS determines queue size: REALTIME=1 (latest only), DURABLE/BALANCED=100 (buffer)
                 target_qos = tgt.get('qos', QoS.REALTIME)
                 if isinstance(target_qos, int): target_qos = QoS(target_qos)
                 
@@ -100,12 +161,34 @@ class EdgeNode(ABC):
                     queue_size = 1   # Only keep latest frame
                 else:
                     queue_size = tgt.get('queue_size', 100)  # Buffer for processing
+                if target_qos == QoS.BALANCED:
+                    # 프레임 수 기준 max_lag는 그보다 긴 backlog가 큐에 남아 있어야 감지됨
+                    queue_size = max(queue_size, (MaxLag.parse(tgt.get('max_lag')).frames or 0) + 1)
                 
+                codec = self._link_codec(tgt)
                 if topic not in redis_topics:
-                    handler = RedisHandler(self.broker, topic, queue_size=queue_size)
+                    handler = RedisHandler(self.broker, topic, queue_size=queue_size, codec=codec)
                     self.output_handlers.append(handler)
-                    redis_topics.add(topic)
-                    print(f"🔗 [Redis] {self.name} ==(QoS:{target_qos.name}, size:{queue_size})==> {target_name}")
+                    redis_topics[topic] = handler
+                    print(f"🔗 [Redis] {self.name} ==(QoS:{target_qos.name}, size:{queue_size}, codec:{codec or 'jpeg'})==> {target_name}")
+                else:
+                    # 여러 구독자가 같은 토픽(Stream)을 읽으면 가장 큰 큐 크기로 보관 (REALTIME=1이 DURABLE backlog를 자르지 않도록)
+                    handler = redis_topics[topic]
+                    handler.queue_size = max(handler.queue_size, queue_size)
+                    print(f"🔗 [Redis] {self.name} ==(QoS:{target_qos.name}, size:{handler.queue_size}, shared topic '{topic}')==> {target_name}")
+                    if handler.codec != codec:
+                        # 하나의 토픽은 하나의 payload 코덱만 가질 수 있음 (먼저 연결된 링크 기준)
+                        print(f"⚠️ Codec '{codec}' ignored for {self.name} -> {target_name}: "
+                              f"topic '{topic}' already uses '{handler.codec or 'jpeg'}'")
+
+    def _link_codec(self, tgt):
+        """링크 codec -> 노드 기본 codec 순으로 결정 (잘못된 코덱 이름은 연결 시점에 즉시 실패)"""
+        from ..comms.codecs import parse_codec
+
+        codec = tgt.get('codec') or self.codec
+        if codec:
+            parse_codec(codec)
+        return codec
 
     def execute(self):
         """노드 실행 전체 흐름 제어 (Template Method)"""
@@ -115,6 +198,7 @@ class EdgeNode(ABC):
         except KeyboardInterrupt:
             print(f"🛑 {self.__class__.__name__} Stopped.")
         finally:
+            self._report_stats()
             self.teardown()
 
     def _setup(self):
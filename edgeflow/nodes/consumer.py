@@ -9,53 +9,124 @@ Arduino Pattern:
 import os
 from .base import EdgeNode
 from ..comms import Frame
-from ..qos import QoS
+from ..qos import MaxLag, QoS
+
+
+INPUT_FORMATS = ("ndarray", "view", "bytes", "meta")
 
 
 class ConsumerNode(EdgeNode):
     """업스트림에서 데이터를 받아 처리하는 노드"""
     node_type = "consumer"
+    # loop()에 전달할 입력 형태
+    # - "ndarray": 디코딩된 데이터 (이미지 코덱이면 ndarray, 기본값, 수정 가능)
+    # - "view": "ndarray"와 같지만 raw 코덱은 수신 버퍼를 그대로 가리키는 read-only ndarray (복사 없음, 읽기만 하는 노드용)
+    # - "bytes": 디코딩하지 않은 payload (memoryview, 복사 없음 / 직접 디코딩하는 노드용)
+    # - "meta": 메타데이터 dict만 (payload 디코딩 없음)
+    input_format = "ndarray"
+    # Micro-batching (opt-in): batch_size > 1 이면 loop_batch()로 여러 프레임을 한 번에 처리
+    # - max_batch_latency: 첫 프레임 도착 후 배치를 채우려고 기다리는 최대 시간 (초)
+    batch_size = 1
+    max_batch_latency = 0.01
     
     def __init__(self, broker=None, replicas=1, **kwargs):
         super().__init__(broker=broker, **kwargs)
         self.replicas = replicas
+        if self.input_format not in INPUT_FORMATS:
+            raise ValueError(f"Unknown input_format '{self.input_format}' (available: {', '.join(INPUT_FORMATS)})")
 
     def loop(self, data):
         """
         [User Hook] 데이터를 처리하여 반환
-        - data: 업스트림에서 받은 이미지/데이터
+        - data: 업스트림에서 받은 이미지/데이터 (input_format에 따라 ndarray/bytes/meta)
         - return: 처리된 결과 (자동으로 다운스트림 전송)
+          data, (data, meta), (data, meta, attachments) 중 하나
+          attachments: 이름 -> ndarray/bytes 또는 (값, 코덱) (예: {"mask": mask})
         - return None: 해당 프레임 스킵
         """
         raise NotImplementedError("ConsumerNode requires loop(data) implementation")
 
-    def _run_loop(self):
-        """[Internal] Stream에서 QoS에 따라 데이터를 받아 loop() 반복 호출"""
+    def loop_batch(self, batch):
+        """
+        [User Hook] 여러 프레임을 한 번에 처리 (batch_size > 1일 때 loop() 대신 호출)
+        - batch: loop()에 넘기던 입력의 리스트 (도착 순서, 최대 batch_size개)
+        - return: 같은 길이의 결과 리스트 (각 항목은 loop()의 반환값과 같은 형식, None이면 해당 프레임 스킵)
+        - 결과는 입력 프레임의 frame_id/timestamp를 유지한 개별 프레임으로 전송됨
+        - 기본 구현: 프레임마다 loop() 호출
+        """
+        return [self.loop(data) for data in batch]
+
+    def _loop_input(self, frame):
+        """[Internal] input_format에 맞춰 loop()에 넘길 값 선택 (ndarray만 디코딩 발생)"""
+        self.stats["frames_received"] += 1
+        self._tick_stats()
+        if self.input_format == "meta":
+            return frame.meta
+        if self.input_format == "bytes":
+            return frame.payload
+        if self.input_format == "view":
+            return frame.data_view()
+        return frame.data
+
+    def _record_decode(self, frame):
+        """[Internal] 입력 프레임의 디코딩 비용을 stats에 누적"""
+        self.stats["payload_decodes"] += frame.decode_count
+        self.stats["decode_ms"] += frame.decode_time * 1000
+
+    def _input_target(self):
+        """[Internal] 첫 번째 입력 (topic, qos) - 입력이 없으면 None"""
         # input_topics can be dict with 'topic' and 'qos' or just string
         if not self.input_topics:
             print(f"⚠️ No input topics for {self.name}")
-            return
-        
+            return None
+
         first_input = self.input_topics[0]
         if isinstance(first_input, dict):
-            target_topic = first_input['topic']
-            qos = first_input.get('qos', QoS.REALTIME)
-        else:
-            target_topic = first_input
-            qos = QoS.REALTIME
+            return first_input['topic'], first_input.get('qos', QoS.REALTIME)
+        return first_input, QoS.REALTIME
+
+    def _input_max_lag(self):
+        """[Internal] 첫 번째 입력의 QoS.BALANCED 기준 (qos.MaxLag)"""
+        first_input = self.input_topics[0]
+        max_lag = first_input.get('max_lag') if isinstance(first_input, dict) else None
+        return max_lag or MaxLag.parse(None)
+
+    def _pop_balanced(self, target_topic, max_lag, group_name, consumer_id):
+        """[Internal] BALANCED 읽기 + 건너뛴 프레임 수를 stats에 누적"""
+        skipped = self.broker.skipped_frames
+        packet = self.broker.pop_balanced(target_topic, max_lag, timeout=1, group=group_name, consumer=consumer_id)
+        self.stats["frames_skipped"] += self.broker.skipped_frames - skipped
+        return packet
+
+    def _run_loop(self):
+        """[Internal] Stream에서 QoS에 따라 데이터를 받아 loop() 반복 호출"""
+        target = self._input_target()
+        if target is None:
+            return
+        target_topic, qos = target
         
         group_name = getattr(self, 'name', 'default')
         consumer_id = self.hostname
         
         print(f"🧠 Consumer started (QoS: {qos.name}), Input: {target_topic}, Group: {group_name}")
+        max_lag = self._input_max_lag() if qos == QoS.BALANCED else None
+        if max_lag:
+            print(f"⚖️ BALANCED: sequential until more than {max_lag} behind, then skip to the latest")
+
+        if self.batch_size > 1:
+            self._run_batch_loop(target_topic, qos, group_name, consumer_id, max_lag)
+            return
 
         while self.running:
             # QoS에 따라 다른 읽기 전략
             if qos == QoS.REALTIME:
                 # REALTIME: 최신만 읽기 (Consumer Group으로 분산)
                 packet = self.broker.pop_latest(target_topic, timeout=1, group=group_name, consumer=consumer_id)
+            elif qos == QoS.BALANCED:
+                # BALANCED: 순차 읽기, max_lag보다 밀리면 최신으로 건너뜀
+                packet = self._pop_balanced(target_topic, max_lag, group_name, consumer_id)
             else:
-                # DURABLE/BALANCED: 순차 읽기 (Consumer Group)
+                # DURABLE: 순차 읽기 (Consumer Group)
                 packet = self.broker.pop(target_topic, timeout=1, group=group_name, consumer=consumer_id)
             
             if not packet:
@@ -66,14 +137,81 @@ class ConsumerNode(EdgeNode):
                 continue
 
             try:
-                result = self.loop(frame.data)
-                if result is None:
-                    continue
+                self._emit(frame, self.loop(self._loop_input(frame)))
+            except Exception as e:
+                print(f"⚠️ Consumer Error in node '{self.name}': {e}")
+            finally:
+                self._record_decode(frame)
 
-                out_img, out_meta = result if isinstance(result, tuple) else (result, {})
-                out_meta['worker_id'] = self.hostname  # Inject worker ID for FPS tracking
-                resp = Frame(frame.frame_id, frame.timestamp, out_meta, out_img)
-                self.send_result(resp)
+    def _run_batch_loop(self, target_topic, qos, group_name, consumer_id, max_lag=None):
+        """
+        [Internal] batch_size개씩 모아서 loop_batch() 호출 (REALTIME은 최신 1개만 -> 크기 1 배치)
+        - BALANCED: 배치의 첫 프레임에서 max_lag 확인, 나머지는 max_batch_latency 안에 쌓인 것만
+        """
+        max_wait_ms = self.max_batch_latency * 1000
+        print(f"📦 Micro-batching: batch_size={self.batch_size}, max_batch_latency={max_wait_ms:.0f}ms")
+        if qos == QoS.REALTIME:
+            print(f"⚠️ QoS REALTIME keeps only the latest frame: '{self.name}' will run batches of 1")
 
+        while self.running:
+            if qos == QoS.REALTIME:
+                packet = self.broker.pop_latest(target_topic, timeout=1, group=group_name, consumer=consumer_id)
+                packets = [packet] if packet else []
+            elif qos == QoS.BALANCED:
+                packet = self._pop_balanced(target_topic, max_lag, group_name, consumer_id)
+                packets = [packet] if packet else []
+                if packet and self.batch_size > 1:
+                    # timeout 0은 Redis에서 무한 대기
+                    packets += self.broker.pop_batch(target_topic, self.batch_size - 1, 0,
+                                                     timeout=max(self.max_batch_latency, 0.001),
+                                                     group=group_name, consumer=consumer_id)
+            else:
+                packets = self.broker.pop_batch(target_topic, self.batch_size, max_wait_ms,
+                                                timeout=1, group=group_name, consumer=consumer_id)
+
+            frames = [frame for frame in map(Frame.from_bytes, packets) if frame]
+            if not frames:
+                continue
+
+            self.stats["batches"] += 1
+            try:
+                results = self.loop_batch([self._loop_input(frame) for frame in frames])
+                if results is None:
+                    continue
+                if len(results) != len(frames):
+                    raise ValueError(f"loop_batch() returned {len(results)} results for {len(frames)} frames")
+                # Fan-out: 결과마다 원래 frame_id/timestamp로 개별 전송
+                for frame, result in zip(frames, results):
+                    self._emit(frame, result)
             except Exception as e:
-                print(f"⚠️ Consumer Error in node '{self.name}': {e}")
\ No newline at end of file
+                print(f"⚠️ Consumer Error in node '{self.name}': {e}")
+            finally:
+                for frame in frames:
+                    self._record_decode(frame)
+
+    def _emit(self, frame, result):
+        """[Internal] loop() 결과 하나를 입력 프레임의 frame_id/timestamp로 다운스트림 전송"""
+        resp = self._make_result(frame, result)
+        if resp is not None:
+            self.send_result(resp)
+
+    def _make_result(self, frame, result):
+        """[Internal] loop() 반환값 -> 출력 Frame (None이면 스킵)"""
+        if result is None:
+            return None
+
+        # return: data | (data, meta) | (data, meta, attachments)
+        out_img, out_meta, attachments = result, {}, None
+        if isinstance(result, tuple):
+            out_img, out_meta = result[0], result[1]
+            if len(result) > 2:
+                attachments = result[2]
+        out_meta['worker_id'] = self.hostname  # Inject worker ID for FPS tracking
+        resp = Frame(frame.frame_id, frame.timestamp, out_meta, out_img)
+        for name, value in (attachments or {}).items():
+            # 값 또는 (값, 코덱) 예: {"mask": mask, "depth": (depth, "zstd:3")}
+            if isinstance(value, tuple):
+                resp.attach(name, *value)
+            else:
+                resp.attach(name, value)
+        return resp
\ No newline at end of file
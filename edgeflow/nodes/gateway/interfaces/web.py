@@ -1,4 +1,5 @@
 import asyncio
+import json
 import time
 import uvicorn
 import traceback
@@ -6,9 +7,14 @@ from collections import defaultdict, deque
 from fastapi import FastAPI
 from fastapi.responses import StreamingResponse, JSONResponse, HTMLResponse
 from .base import BaseInterface
-from ....comms import Frame
+from ....comms import Frame, AsyncBrokerInterface
+from ....comms.metacodec import json_safe
 from ....utils.buffer import TimeJitterBuffer
 
+STATS_INTERVAL = 0.1  # 초, 대시보드 WebSocket 브로드캐스트 주기
+SEND_TIMEOUT = 1.0  # 초, 이보다 느린 클라이언트는 끊음 (브로드캐스트 전체를 막지 않도록)
+_STATS_SECTIONS = ("fps", "buffers", "queues", "status")
+
 class WebInterface(BaseInterface):
     def __init__(self, port=8000, buffer_delay=0.0):
         self.port = port
@@ -44,7 +50,11 @@ class WebInterface(BaseInterface):
         self.fps_window = 1.0  # 1초 윈도우로 FPS 계산
         
         # [신규] WebSocket 클라이언트 관리
+        # - _new_websockets: 다음 tick에 전체 상태(full)를 받을 클라이언트, 이후 _websockets로 옮겨 delta만 받음
+        # - _stats_snapshot: 마지막으로 보낸 상태 (delta 계산 기준)
         self._websockets = set()
+        self._new_websockets = set()
+        self._stats_snapshot = {}
 
     def setup(self):
         # 라우트 등록
@@ -53,11 +63,12 @@ class WebInterface(BaseInterface):
         @self.app.websocket("/ws/stats")
         async def websocket_endpoint(websocket: WebSocket):
             await websocket.accept()
-            self._websockets.add(websocket)
+            self._new_websockets.add(websocket)
             try:
                 while True:
                     await websocket.receive_text() # 연결 유지용 (Client가 뭐 안보내도 됨)
             except Exception:
+                self._new_websockets.discard(websocket)
                 self._websockets.discard(websocket)
 
         self.app.add_api_route("/health", self.health_check, methods=["GET"])
@@ -86,6 +97,9 @@ class WebInterface(BaseInterface):
             print(f"  - [{methods}] {route.path}", flush=True)
 
     def set_broker(self, broker):
+        # 이벤트 루프 안에서 조회하므로 async 브로커 사용 (통계 조회가 프레임 수신을 막지 않음)
+        if broker is not None and not isinstance(broker, AsyncBrokerInterface):
+            broker = broker.to_async()
         self.broker = broker
 
     async def get_resources(self):
@@ -96,17 +110,18 @@ class WebInterface(BaseInterface):
                 topic: {"current": len(buf.heap), "max": buf.max_size}
                 for topic, buf in self.buffers.items()
             }
-            
-            # 2. Redis Queue Size
-            queue_stats = {}
-            if self.broker:
-                for topic in self.buffers.keys():
-                    queue_stats[topic] = self.broker.queue_size(topic)
-            
-            return JSONResponse(content={
-                "buffers": buffer_stats,
-                "queues": queue_stats
-            })
+            topics = list(self.buffers.keys())
+
+        # 2. Redis Queue Size (lock 밖에서 조회 -> 조회 중에도 on_frame 진행)
+        queue_stats = {}
+        if self.broker:
+            sizes = await asyncio.gather(*(self.broker.queue_size(topic) for topic in topics))
+            queue_stats = dict(zip(topics, sizes))
+
+        return JSONResponse(content={
+            "buffers": buffer_stats,
+            "queues": queue_stats
+        })
 
     async def root(self):
         from fastapi.responses import RedirectResponse
@@ -195,7 +210,7 @@ class WebInterface(BaseInterface):
 
     async def get_status(self):
         async with self.lock:
-            return JSONResponse(content=self.latest_meta)
+            return JSONResponse(content=json_safe(self.latest_meta))
 
     async def health_check(self):
         return JSONResponse(content={"status": "ok"})
@@ -233,61 +248,106 @@ class WebInterface(BaseInterface):
         await server.serve()
 
     async def _broadcast_stats(self):
-        """WebSocket 클라이언트에게 주기적으로 상태 전송"""
+        """
+        WebSocket 클라이언트에게 주기적으로 상태 전송
+        - tick마다 상태 수집 + JSON 직렬화는 한 번 (모든 클라이언트가 같은 문자열을 받음)
+        - 새 클라이언트: 전체 상태 {"type": "full", ...}, 이후: 바뀐 토픽만 {"type": "delta", ..., "removed": {...}}
+        - 전송은 동시에, 클라이언트별 SEND_TIMEOUT (느린 클라이언트 하나가 tick을 막지 않음)
+        """
         print("📢 [WebInterface] Broadcasting task started", flush=True)
-        from fastapi import WebSocketDisconnect
         while True:
-            if self._websockets:
+            if self._websockets or self._new_websockets:
                 try:
-                    # 1. 상태 수집
+                    # 1. 상태 수집 (async 브로커, lock은 메모리 복사 동안만)
                     stats = await self.get_stats_json()
-                    
-                    # 2. 브로드캐스팅
-                    disconnected = []
-                    # Fix: RuntimeError "Set changed size during iteration" -> Use list copy
-                    for ws in list(self._websockets):
-                        try:
-                            await ws.send_json(stats)
-                        except Exception:
-                            disconnected.append(ws)
-                    
-                    # 3. 끊긴 연결 정리
-                    if disconnected:
-                        print(f"🔌 [WebInterface] Removing {len(disconnected)} disconnected clients", flush=True)
-                        for ws in disconnected:
-                            self._websockets.remove(ws)
+                    if stats:
+                        await self._send_stats(stats)
                 except Exception as e:
                     print(f"❌ [WebInterface] Broadcast Error: {e}", flush=True)
                     traceback.print_exc()
             
-            await asyncio.sleep(0.1) # 10 FPS 업데이트
+            await asyncio.sleep(STATS_INTERVAL) # 10 FPS 업데이트
+
+    async def _send_stats(self, stats):
+        """[Internal] full/delta 메시지를 한 번씩 직렬화해서 동시에 전송"""
+        sends = []
+        delta = self._stats_delta(stats)
+        if delta and self._websockets:
+            text = json.dumps({"type": "delta", **delta}, separators=(",", ":"))
+            sends += [(ws, text) for ws in self._websockets]
+        if self._new_websockets:
+            joined = list(self._new_websockets)
+            self._new_websockets.difference_update(joined)
+            self._websockets.update(joined)
+            text = json.dumps({"type": "full", **stats}, separators=(",", ":"))
+            sends += [(ws, text) for ws in joined]
+        self._stats_snapshot = stats
+
+        # 2. 브로드캐스팅
+        results = await asyncio.gather(*(self._send_text(ws, text) for ws, text in sends))
+
+        # 3. 끊긴 연결 정리 (delta를 놓친 클라이언트는 상태가 어긋나므로 재연결해서 full을 받게 함)
+        disconnected = [ws for (ws, _), ok in zip(sends, results) if not ok]
+        if disconnected:
+            print(f"🔌 [WebInterface] Removing {len(disconnected)} disconnected clients", flush=True)
+            for ws in disconnected:
+                self._websockets.discard(ws)
+
+    async def _send_text(self, ws, text) -> bool:
+        """[Internal] 클라이언트 하나에 전송 (실패/타임아웃이면 연결을 닫고 False)"""
+        try:
+            await asyncio.wait_for(ws.send_text(text), SEND_TIMEOUT)
+            return True
+        except Exception:
+            try:
+                await asyncio.wait_for(ws.close(), SEND_TIMEOUT)
+            except Exception:
+                pass
+            return False
+
+    def _stats_delta(self, stats):
+        """[Internal] 마지막으로 보낸 상태와 비교 -> {section: {바뀐 topic: 값}, "removed": {section: [topic]}}"""
+        delta, removed = {}, {}
+        for section in _STATS_SECTIONS:
+            current = stats.get(section, {})
+            previous = self._stats_snapshot.get(section, {})
+            changed = {topic: value for topic, value in current.items() if previous.get(topic) != value}
+            gone = [topic for topic in previous if topic not in current]
+            if changed:
+                delta[section] = changed
+            if gone:
+                removed[section] = gone
+        if removed:
+            delta["removed"] = removed
+        return delta
 
     async def get_stats_json(self):
         """한 번에 모든 상태(FPS, Buffer, Queue) 반환"""
         try:
             fps_data = await self._calculate_fps()
-            
+
+            # 2. Redis Queue Stats (Dynamic Discovery, async 브로커로 lock 밖에서 조회)
+            queue_stats = {}
+            if self.broker:
+                queue_stats = await self.broker.get_queue_stats()
+
             async with self.lock:
                 # 1. Buffer Stats
                 buffer_stats = {
                     topic: {"current": len(buf.heap), "max": buf.max_size}
                     for topic, buf in self.buffers.items()
                 }
-                
-                # 2. Redis Queue Stats (Dynamic Discovery)
-                queue_stats = {}
-                if self.broker:
-                    queue_stats = self.broker.get_queue_stats()  # [변경] 동적 조회 사용
-                
-                # 3. Status Info
-                status_info = self.latest_meta
-                
-                return {
-                    "fps": fps_data,
-                    "buffers": buffer_stats,
-                    "queues": queue_stats,
-                    "status": status_info
-                }
+                latest_meta = {topic: dict(meta) for topic, meta in self.latest_meta.items()}
+
+            # 3. Status Info (msgpack 메타의 ndarray 등은 JSON 타입으로 변환, lock 밖에서)
+            status_info = json_safe(latest_meta)
+
+            return {
+                "fps": fps_data,
+                "buffers": buffer_stats,
+                "queues": queue_stats,
+                "status": status_info
+            }
         except Exception as e:
             print(f"❌ [WebInterface] Stats Calc Error: {e}", flush=True)
             return {}
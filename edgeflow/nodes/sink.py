@@ -22,7 +22,7 @@ class SinkNode(ConsumerNode):
     def loop(self, data):
         """
         [User Hook] Process incoming data (no return value)
-        - data: Upstream image/data
+        - data: Upstream image/data (ndarray/bytes/meta, see input_format)
         - No return value (terminal node)
         """
         raise NotImplementedError("SinkNode requires loop(data) implementation")
@@ -56,6 +56,8 @@ class SinkNode(ConsumerNode):
                 continue
 
             try:
-                self.loop(frame.data)
+                self.loop(self._loop_input(frame))
             except Exception as e:
                 print(f"⚠️ Sink Error: {e}")
+            finally:
+                self._record_decode(frame)
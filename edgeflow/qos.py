@@ -2,7 +2,10 @@
 """
 Quality of Service policies for stream consumption
 """
+import time
+from dataclasses import dataclass
 from enum import Enum, auto
+from typing import Optional
 
 
 class QoS(Enum):
@@ -28,6 +31,59 @@ class QoS(Enum):
     """
     Balanced consumption: Skip if too far behind, otherwise sequential.
     - Best for: Moderate latency tolerance with some reliability
-    - Behavior: XREADGROUP with skip threshold
+    - Behavior: XREADGROUP with skip threshold (Linker.to(max_lag=...), see MaxLag)
     - Trade-off: Configurable lag tolerance
     """
+
+
+# BALANCED 링크에 max_lag가 없을 때의 기본값
+DEFAULT_MAX_LAG = "500ms"
+
+
+@dataclass(frozen=True)
+class MaxLag:
+    """
+    QoS.BALANCED skip threshold
+    - frames: 아직 받지 않은 프레임 수(지금 받을 프레임 포함)가 이보다 많으면 최신으로 건너뜀
+    - ms: 받은 프레임의 나이(timestamp 기준)가 이보다 많으면 최신으로 건너뜀
+    """
+    frames: Optional[int] = None
+    ms: Optional[float] = None
+
+    @classmethod
+    def parse(cls, value) -> 'MaxLag':
+        """
+        Linker.to(max_lag=...) 값 -> MaxLag
+        - int: 프레임 수 (예: 10), "200ms" / "0.5s": 시간, None: DEFAULT_MAX_LAG
+        """
+        if value is None:
+            value = DEFAULT_MAX_LAG
+        if isinstance(value, MaxLag):
+            return value
+        if isinstance(value, int) and not isinstance(value, bool) and value > 0:
+            return cls(frames=value)
+        if isinstance(value, str):
+            text = value.strip().lower()
+            try:
+                if text.endswith("ms"):
+                    ms = float(text[:-2])
+                elif text.endswith("s"):
+                    ms = float(text[:-1]) * 1000
+                else:
+                    return cls.parse(int(text))
+            except ValueError:
+                ms = 0
+            if ms > 0:
+                return cls(ms=ms)
+        raise ValueError(f"Invalid max_lag {value!r} (frames as int, or time like '200ms' / '0.5s')")
+
+    def exceeded(self, lag: int, timestamp: Optional[float] = None) -> bool:
+        """lag: 받지 않은 프레임 수 (지금 받은 프레임 포함), timestamp: 받은 프레임의 timestamp"""
+        if self.frames is not None and lag > self.frames:
+            return True
+        if self.ms is not None and timestamp:
+            return (time.time() - timestamp) * 1000 > self.ms
+        return False
+
+    def __str__(self):
+        return f"{self.frames} frames" if self.frames is not None else f"{self.ms:g}ms"
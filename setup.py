@@ -11,6 +11,8 @@ setup(
         "kubernetes",
         "jinja2",
         "docker",
+        "numpy",
+        "msgpack",
         "fastapi",
         "uvicorn"
     ],
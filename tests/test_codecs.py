@@ -0,0 +1,116 @@
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from edgeflow.comms.codecs import PayloadCodec, get_codec, pack_raw, parse_codec, register_codec, unpack_raw
+from edgeflow.comms.frame import Frame
+from edgeflow.comms.metacodec import decode_meta, encode_meta, msgpack
+
+
+def _raw_desc(dtype, shape, strides):
+    dtype_str = np.dtype(dtype).str.encode('ascii')
+    return (struct.pack('!B', len(dtype_str)) + dtype_str + struct.pack('!B', len(shape))
+            + struct.pack(f'!{len(shape)}q{len(shape)}q', *shape, *strides))
+
+
+def _image():
+    y, x = np.mgrid[0:48, 0:64]
+    return np.dstack([x * 4, y * 5, (x + y) * 2]).astype(np.uint8)
+
+
+@pytest.mark.parametrize("spec", ["raw", "png", "png:9", "lz4", "zstd", "zstd:1"])
+def test_lossless_codec_round_trip(spec):
+    received = Frame.from_bytes(Frame(data=_image()).to_bytes(codec=spec))
+    assert np.array_equal(received.data, _image())
+
+
+@pytest.mark.parametrize("arr", [
+    np.eye(32, dtype=np.uint8) * 255,                             # 1채널 마스크
+    np.arange(32 * 32, dtype=np.uint16).reshape(32, 32) * 60,     # 16-bit depth
+    np.full((16, 16, 4), 128, dtype=np.uint8),                    # BGRA
+])
+def test_png_keeps_channels_and_depth(arr):
+    received = Frame.from_bytes(Frame(data=arr).to_bytes(codec="png"))
+    assert received.data.dtype == arr.dtype and np.array_equal(received.data, arr)
+
+
+@pytest.mark.parametrize("spec", ["jpeg", "jpeg:50", "webp", "webp:80"])
+def test_lossy_codec_round_trip(spec):
+    received = Frame.from_bytes(Frame(data=_image()).to_bytes(codec=spec))
+    assert received.data.shape == _image().shape
+    assert np.abs(received.data.astype(int) - _image()).mean() < 10
+
+
+@pytest.mark.parametrize("spec", ["jpeg", "raw", "lz4", "zstd"])
+def test_bytes_payload_round_trip(spec):
+    received = Frame.from_bytes(Frame(data=b"not an image" * 10).to_bytes(codec=spec))
+    assert bytes(received.data) == b"not an image" * 10
+
+
+def test_encoded_jpeg_bytes_are_sniffed():
+    encoded = Frame(data=_image()).get_data_bytes()
+    received = Frame.from_bytes(Frame(data=encoded).to_bytes())
+    assert received.data.shape == _image().shape
+
+
+def test_custom_codec_registration():
+    class InvertCodec(PayloadCodec):
+        codec_id = 200
+        name = "invert"
+
+        def encode(self, arr, param=None):
+            desc, payload = pack_raw(255 - arr)
+            return desc, payload
+
+        def decode(self, desc, payload):
+            return 255 - unpack_raw(desc, payload)
+
+    register_codec(InvertCodec())
+    assert parse_codec("invert:1")[1] == "1"
+    received = Frame.from_bytes(Frame(data=_image()).to_bytes(codec="invert"))
+    assert np.array_equal(received.data, _image())
+
+
+def test_codec_registry_rejects_conflicts():
+    with pytest.raises(ValueError):
+        parse_codec("h264")
+    with pytest.raises(ValueError):
+        register_codec(type("Clash", (PayloadCodec,), {"codec_id": 1, "name": "clash"})())
+
+
+def test_raw_round_trip_keeps_strides():
+    arr = np.asfortranarray(np.arange(12, dtype=np.float32).reshape(3, 4))
+    desc, payload = pack_raw(arr)
+
+    out = unpack_raw(desc, bytes(payload))
+    assert np.array_equal(out, arr)
+    assert out.flags.writeable and out.flags.f_contiguous
+
+
+@pytest.mark.parametrize("shape, strides", [
+    ((4,), (8,)),           # 마지막 원소가 payload 밖
+    ((1000, 1000), (4, 4)),  # 크기 부풀리기
+    ((4,), (-4,)),          # 음수 stride
+    ((-1,), (4,)),          # 음수 shape
+])
+def test_raw_rejects_descriptor_outside_payload(shape, strides):
+    payload = np.arange(4, dtype=np.int32).tobytes()
+    assert unpack_raw(_raw_desc(np.int32, shape, strides), payload) is None
+
+
+def test_raw_rejects_truncated_descriptor():
+    assert unpack_raw(_raw_desc(np.int32, (4,), (4,))[:-3], b"\0" * 16) is None
+
+
+def test_raw_codec_rejects_object_dtype():
+    assert get_codec(2).decode(_raw_desc(np.int64, (2,), (8,)).replace(b"<i8", b"|O8"), b"\0" * 16) is None
+
+
+@pytest.mark.skipif(msgpack is None, reason="needs msgpack")
+def test_meta_ndarray_with_bad_descriptor_decodes_to_none():
+    flags, buf = encode_meta({"box": np.arange(4, dtype=np.int32)}, binary=True)
+    # ext payload 안의 shape(4)를 1000으로 조작
+    bad = buf.replace(struct.pack('!q', 4), struct.pack('!q', 1000), 1)
+    assert decode_meta(bad, flags) == {"box": None}
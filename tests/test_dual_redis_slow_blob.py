@@ -0,0 +1,170 @@
+import itertools
+import time
+import uuid
+
+import pytest
+
+redis = pytest.importorskip("redis")
+
+from edgeflow.comms.brokers.connection import LIMIT_PREFIX
+from edgeflow.comms.brokers.dual_redis import DualRedisBroker
+from edgeflow.comms.brokers.dual_redis_list import SEQUENTIAL_THRESHOLD, DualRedisListBroker
+
+CTRL_PORT, DATA_PORT = 6379, 6380
+
+
+def _require_two_instances():
+    for port in (CTRL_PORT, DATA_PORT):
+        try:
+            redis.Redis(port=port, socket_connect_timeout=0.2).ping()
+        except redis.ConnectionError:
+            pytest.skip(f"needs Redis on localhost:{CTRL_PORT} and localhost:{DATA_PORT}")
+
+
+@pytest.fixture
+def topic():
+    """테스트마다 새 토픽 (FLUSHALL 없이 끝나면 해당 키만 삭제)"""
+    _require_two_instances()
+    name = f"test:{uuid.uuid4().hex[:8]}"
+    yield name
+    for port in (CTRL_PORT, DATA_PORT):
+        r = redis.Redis(port=port)
+        keys = r.keys(f"{name}*") + r.keys(f"edgeflow:meta:*{name}*")
+        if keys:
+            r.delete(*keys)
+
+
+def _brokers(cls):
+    broker = cls(ctrl_host="localhost", ctrl_port=CTRL_PORT, data_host="localhost", data_port=DATA_PORT,
+                 inline_threshold=0)
+    if cls is DualRedisListBroker:
+        broker._ensure_connected()
+    return broker
+
+
+def _queue_reference(broker, topic, ref):
+    """producer가 reference만 먼저 보낸 상태 (blob은 아직 Data Redis에 없음)"""
+    if isinstance(broker, DualRedisListBroker):
+        broker.ctrl_redis.rpush(topic, ref)
+    else:
+        broker.ctrl_redis.xadd(topic, {"ref": ref})
+
+
+def _slow_reference(broker, topic, generation=None):
+    """blob 쓰기를 보류한 slot reference -> (reference, 보류한 Data pipeline)"""
+    if generation is not None:
+        broker._ring._generations[topic] = itertools.count(generation)
+    data_pipe = broker.data_redis.pipeline()
+    ref = broker._ring.write(data_pipe, topic, 10, [b"head", b"payload"])
+    return ref, data_pipe
+
+
+@pytest.fixture(params=[DualRedisListBroker, DualRedisBroker], ids=["list", "stream"])
+def broker(request, topic):
+    broker = _brokers(request.param)
+    if isinstance(broker, DualRedisBroker):
+        assert broker.pop(topic, timeout=0.01) is None  # consumer group 생성
+    return broker
+
+
+def test_reference_waits_for_slow_blob(broker, topic):
+    ref, data_pipe = _slow_reference(broker, topic)
+    _queue_reference(broker, topic, ref)
+
+    # blob이 아직 없으면 버리지 않고 consumer가 들고 있다가 다시 확인
+    assert broker.pop(topic, timeout=0.2) is None
+
+    data_pipe.execute()
+    assert broker.pop(topic, timeout=0.2) == b"headpayload"
+
+
+def test_slow_blob_does_not_hold_up_later_frames(broker, topic):
+    ref, data_pipe = _slow_reference(broker, topic)
+    _queue_reference(broker, topic, ref)
+    for i in range(3):
+        broker.push_many([(topic, [b"good", b"%d" % i])], {topic: 10})
+
+    start = time.monotonic()
+    assert [broker.pop(topic, timeout=1) for _ in range(3)] == [b"good0", b"good1", b"good2"]
+    assert time.monotonic() - start < 0.5
+
+    data_pipe.execute()
+    assert broker.pop(topic, timeout=0.2) == b"headpayload"
+
+
+def test_lost_slot_is_skipped_at_once(broker, topic):
+    # 첫 바퀴가 아닌 generation의 slot이 없음 = 만료/evict/철회 (다시 나타나지 않음)
+    ref, _ = _slow_reference(broker, topic, generation=100)
+    _queue_reference(broker, topic, ref)
+    for i in range(5):
+        broker.push_many([(topic, [b"good", b"%d" % i])], {topic: 10})
+
+    start = time.monotonic()
+    assert [broker.pop(topic, timeout=1) for _ in range(5)] == [b"good%d" % i for i in range(5)]
+    assert time.monotonic() - start < 0.5
+
+
+def test_deleted_slot_is_skipped(broker, topic):
+    broker.push_many([(topic, [b"lost", b"0"])], {topic: 10})
+    broker.data_redis.delete(*broker.data_redis.keys(f"{topic}:slot:*"))
+    broker.push_many([(topic, [b"good", b"0"])], {topic: 10})
+
+    assert broker.pop(topic, timeout=1) == b"good0"
+    assert broker.pop(topic, timeout=0.1) is None
+
+
+def test_large_blob_is_written_before_reference(topic):
+    broker = _brokers(DualRedisListBroker)
+    payload = b"x" * SEQUENTIAL_THRESHOLD
+    for i in range(3):
+        broker.push_many([(topic, [b"head%d" % i, payload])], {topic: 10})
+
+    for i in range(3):
+        assert broker.pop(topic, timeout=1) == b"head%d" % i + payload
+
+
+def test_shared_blob_is_freed_after_every_group_reads(topic):
+    broker = DualRedisBroker(ctrl_host="localhost", ctrl_port=CTRL_PORT, data_host="localhost", data_port=DATA_PORT,
+                             inline_threshold=0, content_addressed=True)
+    for group in ("yolo", "logger"):
+        assert broker.pop(topic, timeout=0.01, group=group) is None  # consumer group 생성
+    payload = uuid.uuid4().bytes * 8192  # coalesce되지 않는 크기 (head는 reference에 inline)
+
+    # 처음 보는 topic은 group 1개로 가정 -> XINFO GROUPS 결과로 참조 수를 2로 보정
+    broker.push_many([(topic, [b"head", payload])], {topic: 10})
+    broker.push_many([(topic, [b"next", payload])], {topic: 10})
+    digest = broker.ctrl_redis.xrange(topic)[0][1][b"blob"].decode()
+    refs = f"edgeflow:blob:{digest}:refs"
+    deadline = time.monotonic() + 2
+    while broker.data_redis.get(refs) != b"4" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert broker.data_redis.get(refs) == b"4"
+
+    assert [broker.pop(topic, timeout=1, group="yolo") for _ in range(2)] == [b"head" + payload, b"next" + payload]
+    assert broker.data_redis.get(refs) == b"2"
+    assert [broker.pop(topic, timeout=1, group="logger") for _ in range(2)] == [b"head" + payload, b"next" + payload]
+    assert broker.data_redis.exists(f"edgeflow:blob:{digest}", refs) == 0
+
+
+def test_limit_is_cached_only_after_it_is_written(broker, topic, monkeypatch):
+    pipeline = broker.ctrl_redis.pipeline
+
+    def execute(*args, **kwargs):
+        raise redis.ConnectionError("down")
+
+    def failing_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        pipe.execute = execute
+        return pipe
+
+    monkeypatch.setattr(broker.ctrl_redis, "pipeline", failing_pipeline)
+    broker.push_many([(topic, [b"head", b"0"])], {topic: 7})
+    assert topic not in broker._topic_limits
+
+    # 재연결 후 다음 push에서 limit을 다시 기록
+    monkeypatch.setattr(broker.ctrl_redis, "pipeline", pipeline)
+    broker._ctrl.ok()
+    broker._data.ok()
+    broker.push_many([(topic, [b"head", b"1"])], {topic: 7})
+    assert broker._topic_limits[topic] == 7
+    assert broker.ctrl_redis.get(f"{LIMIT_PREFIX}{topic}") == b"7"
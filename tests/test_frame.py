@@ -0,0 +1,137 @@
+import json
+import struct
+import time
+
+import pytest
+
+from edgeflow.comms import frame as frame_module
+from edgeflow.comms.frame import Frame
+
+np = pytest.importorskip("numpy")
+
+
+def _image():
+    return np.arange(48 * 64 * 3, dtype=np.uint8).reshape(48, 64, 3)
+
+
+def test_buffers_join_to_bytes_and_round_trip():
+    frame = Frame(frame_id=7, timestamp=123.5, meta={"score": 0.5, "label": "dog"}, data=b"payload")
+    buffers = frame.to_buffers()
+    assert b"".join(buffers) == frame.to_bytes()
+
+    received = Frame.from_bytes(b"".join(buffers))
+    assert (received.frame_id, received.timestamp, received.meta) == (7, 123.5, {"score": 0.5, "label": "dog"})
+    assert received.data == b"payload"
+
+
+def test_meta_overrides_do_not_touch_frame_meta():
+    frame = Frame(frame_id=1, meta={"topic": "camera"}, data=b"x")
+    received = Frame.from_bytes(frame.to_bytes(meta_overrides={"topic": "gateway"}))
+    assert received.meta == {"topic": "gateway"}
+    assert frame.meta == {"topic": "camera"}
+
+
+def test_legacy_header_packet():
+    # 구버전 송신자: frame_id | timestamp | meta_len (16 bytes) + JSON 메타 + payload
+    meta = json.dumps({"topic": "cam"}).encode()
+    packet = struct.pack('!IdI', 3, 9.25, len(meta)) + meta + b"\xff\xd8legacy"
+    received = Frame.from_bytes(packet, avoid_decode=True)
+    assert (received.frame_id, received.timestamp, received.meta) == (3, 9.25, {"topic": "cam"})
+    assert bytes(received.payload) == b"\xff\xd8legacy"
+
+
+def test_truncated_packet_is_rejected():
+    assert Frame.from_bytes(Frame(data=b"x").to_bytes()[:12]) is None
+
+
+def test_payload_is_decoded_lazily_once():
+    packet = Frame(frame_id=1, data=_image()).to_bytes(codec="raw")
+    received = Frame.from_bytes(packet)
+    assert not received.is_decoded and received.decode_count == 0
+
+    assert np.array_equal(received.data, _image())
+    assert received.data is received.data
+    assert received.is_decoded and received.decode_count == 1
+
+
+def test_forwarding_received_payload_skips_decode():
+    packet = Frame(frame_id=1, data=_image()).to_bytes(codec="png")
+    received = Frame.from_bytes(packet)
+    forwarded = Frame.from_bytes(received.to_bytes(codec="png"))
+    assert received.decode_count == 0 and received.encode_count == 0
+    assert np.array_equal(forwarded.data, _image())
+
+
+def test_data_view_is_read_only_and_data_is_writable():
+    packet = Frame(data=_image()).to_bytes(codec="raw")
+    view = Frame.from_bytes(packet).data_view()
+    assert not view.flags.writeable and np.array_equal(view, _image())
+    assert Frame.from_bytes(packet).data.flags.writeable
+
+
+def test_gateway_keeps_jpeg_bytes():
+    packet = Frame(data=_image()).to_bytes()
+    received = Frame.from_bytes(packet, avoid_decode=True)
+    assert received.get_data_buffer() is received.data
+    assert bytes(received.data[:2]) == b"\xff\xd8"
+
+
+def test_attachments_round_trip_and_decode_on_access():
+    mask = np.eye(32, dtype=np.uint8) * 255
+    depth = np.linspace(0, 10, 48 * 64, dtype=np.float32).reshape(48, 64)
+    frame = Frame(frame_id=1, data=_image())
+    frame.attach("mask", mask, codec="png")
+    frame.attach("depth", depth, codec="zstd")
+    frame.attach("embedding", b"\x00\x01\x02")
+
+    received = Frame.from_bytes(frame.to_bytes(codec="raw"))
+    assert received.attachment_names() == ["mask", "depth", "embedding"]
+    assert received.decode_count == 0
+
+    assert np.array_equal(received.attachment("depth"), depth)
+    assert received.decode_count == 1
+    assert np.array_equal(received.attachment("mask"), mask)
+    assert received.attachment("embedding") == b"\x00\x01\x02"
+    assert received.attachment("missing", "default") == "default"
+    assert np.array_equal(received.data, _image())
+
+
+def test_attachments_are_encoded_once_and_forwarded():
+    frame = Frame(frame_id=1, data=_image())
+    frame.attach("mask", np.ones((8, 8), dtype=np.uint8))
+    frame.to_bytes(codec="raw")
+    frame.to_bytes(meta_overrides={"topic": "gateway"}, codec="raw")
+    assert frame.encode_count == 2  # payload 1 + 첨부 1
+
+    received = Frame.from_bytes(frame.to_bytes(codec="raw"))
+    forwarded = Frame.from_bytes(received.to_bytes(codec="raw"))
+    assert received.decode_count == 0
+    assert np.array_equal(forwarded.attachment("mask"), np.ones((8, 8), dtype=np.uint8))
+
+
+def test_attachment_limits():
+    frame = Frame()
+    with pytest.raises(ValueError):
+        frame.attach("x" * 256, b"")
+    for i in range(255):
+        frame.attach(f"a{i}", b"")
+    with pytest.raises(ValueError):
+        frame.attach("one-too-many", b"")
+
+
+def test_trace_total_across_hosts(monkeypatch):
+    sender = Frame(frame_id=1, timestamp=time.time(), data=b"payload")
+    sender.mark("inference")
+    packet = sender.to_bytes()
+
+    # 다른 호스트: monotonic 시계의 기준이 전혀 다름 (부팅 시각 차이)
+    offset = 10 ** 15
+    real_monotonic_ns = time.monotonic_ns
+    monkeypatch.setattr(frame_module.time, "monotonic_ns", lambda: real_monotonic_ns() + offset)
+    monkeypatch.setattr(frame_module, "_WALL_ANCHOR_NS", frame_module._WALL_ANCHOR_NS - offset)
+
+    received = Frame.from_bytes(packet)
+    received.mark("gateway_in")
+    latency = received.analyze_latency()
+    assert 0 <= latency["total"] < 1000
+    assert list(latency["breakdown"]) == ["t0", "inference", "gateway_in"]
@@ -0,0 +1,172 @@
+import socket
+import time
+
+import pytest
+
+grpc = pytest.importorskip("grpc")
+
+from edgeflow.comms.brokers.grpc import GrpcBroker, _CREDIT, _SUBSCRIBE
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def port():
+    return _free_port()
+
+
+@pytest.fixture
+def make():
+    """GrpcBroker 생성 (테스트가 끝나면 모두 close)"""
+    created = []
+
+    def factory(port, host=False, **kwargs):
+        broker = GrpcBroker(default_endpoint=f"localhost:{port}", port=port if host else None, **kwargs)
+        created.append(broker)
+        if host:
+            assert broker._hosted("warmup") is not None, "port already in use"
+        return broker
+
+    yield factory
+    for broker in created:
+        broker.close()
+
+
+def _pop_all(pop, topic, count, timeout=5.0):
+    received = []
+    deadline = time.monotonic() + timeout
+    while len(received) < count and time.monotonic() < deadline:
+        data = pop(topic, timeout=0.2)
+        if data is not None:
+            received.append(data)
+    return received
+
+
+def test_local_hosting_uses_queue_without_channel(make, port):
+    host = make(port, host=True)
+    host.trim("cam", 3)
+    for i in range(5):
+        host.push("cam", b"%d" % i)
+
+    assert host.queue_size("cam") == 3
+    assert _pop_all(host.pop, "cam", 3) == [b"2", b"3", b"4"]
+    assert host._channels == {}
+
+
+def test_fifo_over_network(make, port):
+    make(port, host=True)
+    producer = make(port)
+    consumer = make(port)
+    for i in range(10):
+        producer.push("cam", b"%d" % i)
+
+    assert _pop_all(consumer.pop, "cam", 10) == [b"%d" % i for i in range(10)]
+
+
+def test_latest_returns_newest(make, port):
+    host = make(port, host=True)
+    consumer = make(port)
+    for i in range(5):
+        host.push("cam", b"%d" % i)
+
+    assert consumer.pop_latest("cam", timeout=5) == b"4"
+    assert host.queue_size("cam") == 0
+
+
+def test_latest_after_subscribe_skips_buffered_frames(make, port):
+    host = make(port, host=True)
+    consumer = make(port)
+    assert consumer.pop_latest("cam", timeout=0.2) is None
+    for i in range(5):
+        host.push("cam", b"%d" % i)
+    time.sleep(0.2)
+
+    assert consumer.pop_latest("cam", timeout=5) == b"4"
+    host.push("cam", b"5")
+    assert consumer.pop_latest("cam", timeout=5) == b"5"
+
+
+def test_fifo_prefetch_is_bounded_by_window(make, port):
+    host = make(port, host=True)
+    consumer = make(port, window=2)
+    host.trim("cam", 3)
+    assert consumer.pop("cam", timeout=0.2) is None
+    for i in range(2):
+        host.push("cam", b"%d" % i)
+    deadline = time.monotonic() + 5
+    while host.queue_size("cam") and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # credit이 없으므로 나머지는 서버 큐에 남고 maxlen(trim)이 적용됨
+    for i in range(2, 10):
+        host.push("cam", b"%d" % i)
+    time.sleep(0.2)
+    assert host.queue_size("cam") == 3
+    assert _pop_all(consumer.pop, "cam", 5) == [b"0", b"1", b"7", b"8", b"9"]
+
+
+def test_push_blocks_then_drops_when_window_full(make, port):
+    # 서버가 없으면 Publish 스트림이 연결을 기다리므로 window가 채워진 채로 남음
+    producer = make(port, window=2, push_timeout=0.2)
+    producer.push("cam", b"0")
+    producer.push("cam", b"1")
+    time.sleep(0.2)
+    stream = producer._publishers[f"localhost:{port}"]
+    while not stream.outbox.full():
+        producer.push("cam", b"x")
+
+    start = time.monotonic()
+    producer.push("cam", b"dropped")
+    assert time.monotonic() - start >= 0.2
+    assert stream.outbox.full()
+
+
+def test_reconnects_after_server_restart(make, port):
+    host = make(port, host=True)
+    producer = make(port)
+    producer.push("cam", b"before")
+    assert _pop_all(host.pop, "cam", 1) == [b"before"]
+
+    host.close()
+    host = make(port, host=True)
+
+    # 끊긴 스트림이 가져간 프레임은 잃을 수 있으므로 받을 때까지 다시 보냄
+    deadline = time.monotonic() + 10
+    received = None
+    while received is None and time.monotonic() < deadline:
+        producer.push("cam", b"after")
+        received = host.pop("cam", timeout=0.5)
+    assert received == b"after"
+
+
+def test_each_subscriber_gets_every_frame(make, port):
+    make(port, host=True)
+    producer = make(port)
+    yolo, logger = make(port), make(port)
+    topics = [producer.subscriber_topic("cam", name) for name in ("yolo", "logger")]
+    for i in range(5):
+        producer.push_many([(topic, b"%d" % i) for topic in topics])
+
+    expected = [b"%d" % i for i in range(5)]
+    assert _pop_all(yolo.pop, topics[0], 5) == expected
+    assert _pop_all(logger.pop, topics[1], 5) == expected
+
+
+def test_streams_beyond_max_streams_are_rejected(make, port):
+    make(port, host=True, max_streams=2)
+    channel = grpc.insecure_channel(f"localhost:{port}")
+    subscribe = channel.stream_stream(_SUBSCRIBE)
+    calls = [subscribe(iter([_CREDIT.pack(1) + b"cam:%d" % i])) for i in range(2)]
+    try:
+        time.sleep(0.5)
+        with pytest.raises(grpc.RpcError) as exc:
+            next(subscribe(iter([_CREDIT.pack(1) + b"cam:2"]), timeout=5))
+        assert exc.value.code() == grpc.StatusCode.RESOURCE_EXHAUSTED
+    finally:
+        for call in calls:
+            call.cancel()
+        channel.close()
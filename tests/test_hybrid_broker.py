@@ -0,0 +1,77 @@
+import time
+import uuid
+
+import pytest
+
+redis = pytest.importorskip("redis")
+pytest.importorskip("zmq")
+
+from edgeflow.comms.brokers.hybrid import _ALIVE_PREFIX, HybridBroker
+
+
+@pytest.fixture
+def topic():
+    """테스트마다 새 토픽 (끝나면 endpoint 등록만 삭제)"""
+    try:
+        redis.Redis(socket_connect_timeout=0.2).ping()
+    except redis.ConnectionError:
+        pytest.skip("needs Redis on localhost:6379")
+    name = f"test:{uuid.uuid4().hex[:8]}"
+    yield name
+    r = redis.Redis()
+    keys = r.keys(f"edgeflow:zmq:*:{name}*") + r.keys(f"edgeflow:meta:*{name}*")
+    if keys:
+        r.delete(*keys)
+
+
+@pytest.fixture
+def make():
+    """HybridBroker 생성 (테스트가 끝나면 모두 close)"""
+    created = []
+
+    def factory():
+        broker = HybridBroker(advertise_host="127.0.0.1")
+        created.append(broker)
+        return broker
+
+    yield factory
+    for broker in created:
+        broker.close()
+
+
+def _pop_until(broker, topic, producer, data, timeout=5.0):
+    """PUSH는 PULL이 연결되기 전의 프레임을 버리므로 받을 때까지 다시 보냄"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        producer.push(topic, data)
+        received = broker.pop(topic, timeout=0.1)
+        if received is not None:
+            return received
+    return None
+
+
+def test_close_unregisters_endpoints(make, topic):
+    producer, consumer = make(), make()
+    assert _pop_until(consumer, topic, producer, b"data") == b"data"
+    assert len(producer.ctrl_redis.smembers(f"edgeflow:zmq:push:{topic}")) == 1
+
+    producer.close()
+    assert producer.ctrl_redis.smembers(f"edgeflow:zmq:push:{topic}") == set()
+    assert producer.ctrl_redis.smembers(f"edgeflow:zmq:pub:{topic}") == set()
+
+
+def test_expired_endpoint_is_pruned_and_reregistered(make, topic):
+    producer, consumer = make(), make()
+    assert _pop_until(consumer, topic, producer, b"data") == b"data"
+    key = f"edgeflow:zmq:push:{topic}"
+    endpoint = producer.ctrl_redis.smembers(key).pop().decode()
+
+    # 죽은 발행자: heartbeat 만료 -> 디스커버리 때 목록에서 삭제
+    producer.ctrl_redis.delete(f"{_ALIVE_PREFIX}{endpoint}")
+    assert make()._discover(keys=[key], args=[_ALIVE_PREFIX]) == []
+    assert producer.ctrl_redis.smembers(key) == set()
+
+    # 살아 있는 발행자는 다음 heartbeat에서 다시 등록
+    producer._heartbeats.clear()
+    producer.push(topic, b"again")
+    assert producer.ctrl_redis.smembers(key) == {endpoint.encode()}
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from edgeflow.comms.frame import Frame
+from edgeflow.comms.metacodec import FLAG_META_MSGPACK, decode_meta, encode_meta, json_safe, msgpack
+from edgeflow.config import settings
+
+needs_msgpack = pytest.mark.skipif(msgpack is None, reason="needs msgpack")
+
+
+def _meta():
+    return {
+        "boxes": np.array([[10, 20, 30, 40], [50, 60, 70, 80]], dtype=np.int32),
+        "scores": np.array([0.9, 0.75], dtype=np.float32),
+        "count": np.int64(2),
+        "ratio": np.float32(0.5),
+        "valid": np.bool_(True),
+        "label": "dog",
+        "nested": {"ids": [1, 2, 3]},
+    }
+
+
+@needs_msgpack
+def test_msgpack_keeps_ndarray_dtype_and_shape():
+    flags, buf = encode_meta(_meta(), binary=True)
+    assert flags & FLAG_META_MSGPACK
+    meta = decode_meta(memoryview(buf), flags)
+
+    assert meta["boxes"].dtype == np.int32 and np.array_equal(meta["boxes"], _meta()["boxes"])
+    assert meta["scores"].dtype == np.float32 and np.array_equal(meta["scores"], _meta()["scores"])
+    assert (meta["count"], meta["ratio"], meta["valid"]) == (2, 0.5, True)
+    assert meta["label"] == "dog" and meta["nested"] == {"ids": [1, 2, 3]}
+
+
+@needs_msgpack
+def test_non_contiguous_ndarray_in_meta():
+    arr = np.arange(24, dtype=np.uint16).reshape(4, 6)[:, ::2]
+    flags, buf = encode_meta({"arr": arr}, binary=True)
+    assert np.array_equal(decode_meta(buf, flags)["arr"], arr)
+
+
+def test_json_meta_converts_numpy_to_lists():
+    flags, buf = encode_meta(_meta(), binary=False)
+    assert flags == 0
+    meta = json.loads(buf)
+    assert meta["boxes"] == [[10, 20, 30, 40], [50, 60, 70, 80]]
+    assert decode_meta(memoryview(buf), flags) == meta
+
+
+def test_json_receiver_setting(monkeypatch):
+    monkeypatch.setattr(settings, "META_CODEC", "json")
+    received = Frame.from_bytes(Frame(meta={"count": np.int64(3)}, data=b"x").to_bytes())
+    assert received.meta == {"count": 3}
+
+
+@needs_msgpack
+def test_json_safe_for_dashboard():
+    flags, buf = encode_meta({**_meta(), "raw": b"\x01\x02"}, binary=True)
+    safe = json_safe(decode_meta(buf, flags))
+    assert json.loads(json.dumps(safe))["boxes"] == [[10, 20, 30, 40], [50, 60, 70, 80]]
+    assert safe["raw"] == "0102"
@@ -0,0 +1,104 @@
+import time
+import uuid
+
+import pytest
+
+redis = pytest.importorskip("redis")
+np = pytest.importorskip("numpy")
+
+from edgeflow.comms import Frame, RedisListBroker
+from edgeflow.nodes.consumer import ConsumerNode
+from edgeflow.nodes.producer import ProducerNode
+from edgeflow.qos import QoS
+
+
+@pytest.fixture
+def name():
+    """테스트마다 새 노드 이름 (끝나면 해당 키만 삭제)"""
+    try:
+        redis.Redis(socket_connect_timeout=0.2).ping()
+    except redis.ConnectionError:
+        pytest.skip("needs Redis on localhost:6379")
+    name = f"test-{uuid.uuid4().hex[:8]}"
+    yield name
+    r = redis.Redis()
+    registered = [topic for topic in r.smembers("edgeflow:meta:topics") if topic.startswith(name.encode())]
+    if registered:
+        r.srem("edgeflow:meta:topics", *registered)
+    keys = r.keys(f"{name}*") + r.keys(f"edgeflow:meta:*{name}*")
+    if keys:
+        r.delete(*keys)
+
+
+def _producer(name, targets):
+    return ProducerNode(broker=RedisListBroker(), name=name, targets=targets)
+
+
+def test_fan_out_encodes_payload_once(name):
+    node = _producer(name, [{"name": "yolo", "qos": QoS.DURABLE}, {"name": "logger", "qos": QoS.DURABLE},
+                            {"name": "viewer", "qos": QoS.REALTIME}])
+    frame = Frame(frame_id=1, data=np.zeros((48, 64, 3), dtype=np.uint8))
+    node.send_result(frame)
+
+    assert frame.encode_count == 1
+    assert node.stats["handler_sends"] == 3 and node.stats["payload_encodes"] == 1
+    packets = [node.broker.pop(f"{name}:{target}", timeout=1) for target in ("yolo", "logger", "viewer")]
+    assert packets[0] == packets[1] == packets[2] is not None
+
+
+def test_stats_are_reported_every_interval(name, capsys):
+    node = ProducerNode(broker=RedisListBroker(), name=name, stats_interval=0.01,
+                        targets=[{"name": "yolo", "qos": QoS.DURABLE}])
+    node.send_result(Frame(frame_id=1, data=b"x"))
+    assert "📊" not in capsys.readouterr().out
+
+    time.sleep(0.02)
+    node.send_result(Frame(frame_id=2, data=b"x"))
+    assert f"📊 [{name}] frames_sent=2 handler_sends=2\n" in capsys.readouterr().out  # 0인 카운터는 생략
+
+
+class _BatchConsumer(ConsumerNode):
+    batch_size = 4
+    max_batch_latency = 0.05
+    input_format = "meta"
+
+    def setup(self):
+        self.batches = []
+
+    def loop_batch(self, batch):
+        self.batches.append([meta["i"] for meta in batch])
+        self.running = sum(map(len, self.batches)) < 6
+        return [None] * len(batch)
+
+
+def test_loop_batch_groups_queued_frames(name):
+    producer = _producer(name, [{"name": f"{name}-batch", "qos": QoS.DURABLE}])
+    consumer = _BatchConsumer(broker=RedisListBroker(), name=f"{name}-batch",
+                              sources=[{"name": name, "qos": QoS.DURABLE}])
+    for i in range(6):
+        producer.send_result(Frame(frame_id=i, meta={"i": i}, data=b"x"))
+
+    consumer.execute()
+    assert consumer.batches == [[0, 1, 2, 3], [4, 5]]
+    assert consumer.stats["batches"] == 2 and consumer.stats["frames_received"] == 6
+    assert consumer.stats["payload_decodes"] == 0
+
+
+def test_each_subscriber_gets_its_own_queue(name):
+    producer = _producer(name, [{"name": f"{name}-yolo", "qos": QoS.DURABLE},
+                                {"name": f"{name}-viewer", "qos": QoS.REALTIME}])
+    yolo = ConsumerNode(broker=RedisListBroker(), name=f"{name}-yolo", sources=[{"name": name, "qos": QoS.DURABLE}])
+    viewer = ConsumerNode(broker=RedisListBroker(), name=f"{name}-viewer", sources=[{"name": name}])
+    assert [h.topic for h in producer.output_handlers] == [yolo.input_topics[0]["topic"],
+                                                           viewer.input_topics[0]["topic"]]
+
+    for i in range(5):
+        producer.send_result(Frame(frame_id=i, data=b"x"))
+
+    def frame_ids(node):
+        topic = node.input_topics[0]["topic"]
+        return [Frame.from_bytes(p).frame_id for p in iter(lambda: node.broker.pop(topic, timeout=0.1), None)]
+
+    # DURABLE 구독자는 모든 프레임, REALTIME 구독자는 자기 큐 크기(1)만큼 최신 것만
+    assert frame_ids(yolo) == [0, 1, 2, 3, 4]
+    assert frame_ids(viewer) == [4]
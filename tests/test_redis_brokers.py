@@ -0,0 +1,233 @@
+import asyncio
+import socket
+import time
+import uuid
+
+import pytest
+
+redis = pytest.importorskip("redis")
+
+from edgeflow.comms import Frame, RedisBroker, RedisListBroker
+from edgeflow.comms.brokers import aio_redis
+from edgeflow.comms.brokers.aio_redis import AsyncRedisBroker, AsyncRedisListBroker
+from edgeflow.comms.brokers.connection import TOPICS_KEY
+from edgeflow.qos import MaxLag
+
+
+@pytest.fixture
+def topic():
+    """테스트마다 새 토픽 (끝나면 해당 키와 registry 항목만 삭제)"""
+    try:
+        redis.Redis(socket_connect_timeout=0.2).ping()
+    except redis.ConnectionError:
+        pytest.skip("needs Redis on localhost:6379")
+    name = f"test:{uuid.uuid4().hex[:8]}"
+    yield name
+    r = redis.Redis()
+    registered = [t for t in r.smembers(TOPICS_KEY) if t.startswith(name.encode())]
+    if registered:
+        r.srem(TOPICS_KEY, *registered)
+    keys = r.keys(f"{name}*") + r.keys(f"edgeflow:meta:*{name}*")
+    if keys:
+        r.delete(*keys)
+
+
+@pytest.fixture(params=[RedisListBroker, RedisBroker], ids=["list", "stream"])
+def broker(request):
+    return request.param()
+
+
+def _subscribe(broker, *topics):
+    """Stream: consumer group은 '$'에서 시작하므로 push 전에 만들어 둠"""
+    for topic in topics:
+        assert broker.pop(topic, timeout=0.01) is None
+
+
+def _pop_all(broker, topic, timeout=0.2):
+    received = []
+    while (data := broker.pop(topic, timeout=timeout)) is not None:
+        received.append(data)
+    return received
+
+
+def test_push_many_is_one_round_trip(broker, topic):
+    topics = [f"{topic}:a", f"{topic}:b", f"{topic}:c"]
+    _subscribe(broker, *topics)
+    before = broker.get_io_stats()["round_trips"]
+
+    items = [(t, [b"head-", t.encode(), b"-payload"]) for t in topics] + [(topics[0], b"second")]
+    broker.push_many(items, {t: 10 for t in topics})
+    assert broker.get_io_stats()["round_trips"] == before + 1
+
+    assert _pop_all(broker, topics[0]) == [b"head-" + topics[0].encode() + b"-payload", b"second"]
+    assert _pop_all(broker, topics[2]) == [b"head-" + topics[2].encode() + b"-payload"]
+
+
+def test_push_many_applies_limits(topic):
+    broker = RedisListBroker()
+    broker.push_many([(topic, b"%d" % i) for i in range(10)], {topic: 3})
+    assert _pop_all(broker, topic) == [b"7", b"8", b"9"]
+    assert redis.Redis().get(f"edgeflow:meta:limit:{topic}") == b"3"
+
+
+def test_pop_batch_waits_only_max_wait_after_first(broker, topic):
+    _subscribe(broker, topic)
+    broker.push_many([(topic, b"%d" % i) for i in range(6)])
+
+    assert broker.pop_batch(topic, max_items=4, max_wait_ms=50, timeout=1) == [b"0", b"1", b"2", b"3"]
+    start = time.monotonic()
+    assert broker.pop_batch(topic, max_items=4, max_wait_ms=50, timeout=1) == [b"4", b"5"]
+    assert time.monotonic() - start < 0.5
+    assert broker.pop_batch(topic, max_items=4, max_wait_ms=50, timeout=0.1) == []
+
+
+def test_brokers_share_one_pool_per_endpoint(topic):
+    first, second = RedisListBroker(), RedisBroker()
+    assert first._redis.connection_pool is second._redis.connection_pool
+
+    # 매 호출 PING 없음: push 1번 = 왕복 1번, 빈 pop도 BLPOP 1번 (limit은 trim으로 미리 알려 둠)
+    first.trim(topic, 10)
+    before = first.get_io_stats()["round_trips"]
+    first.push(topic, b"x")
+    assert first.pop(topic, timeout=0.1) == b"x"
+    assert first.pop(topic, timeout=0.1) is None
+    assert first.get_io_stats()["round_trips"] == before + 3
+
+
+def test_unreachable_redis_backs_off_without_blocking():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    broker = RedisListBroker(port=port)
+
+    broker.push("cam", b"dropped")
+    assert not broker._conn.available()
+    calls = broker.get_io_stats()["round_trips"]
+
+    start = time.monotonic()
+    assert broker.pop("cam", timeout=0.1) is None
+    broker.push("cam", b"dropped")
+    assert time.monotonic() - start < 0.3
+    assert broker.get_io_stats()["round_trips"] == calls  # backoff 중에는 Redis를 호출하지 않음
+
+
+class _Unreachable:
+    """모든 명령이 바로 ConnectionError (redis-py 재시도 없이)"""
+
+    def __getattr__(self, name):
+        async def fail(*args, **kwargs):
+            raise redis.ConnectionError("unreachable")
+        return fail
+
+
+@pytest.mark.parametrize("cls", [AsyncRedisListBroker, AsyncRedisBroker], ids=["list", "stream"])
+def test_async_pop_batch_backs_off_when_unreachable(cls, monkeypatch):
+    monkeypatch.setattr(aio_redis, "_RETRY_DELAY", 0.2)
+    broker = cls()
+    broker._redis = _Unreachable()
+
+    start = time.monotonic()
+    assert asyncio.run(broker.pop_batch("cam", max_items=4, max_wait_ms=10, timeout=0.01)) == []
+    assert time.monotonic() - start >= 0.2  # 바로 반환하면 호출 측 루프가 재연결을 반복하며 돔
+
+
+def test_stream_latest_skips_backlog_without_duplicates(topic):
+    broker = RedisBroker()
+    _subscribe(broker, topic)
+    broker.push_many([(topic, b"%d" % i) for i in range(5)])
+
+    assert broker.pop_latest(topic, timeout=0.1) == b"4"
+    assert broker.pop_latest(topic, timeout=0.1) is None  # 이미 받은 프레임/오래된 프레임은 다시 오지 않음
+    broker.push(topic, b"5")
+    assert broker.pop_latest(topic, timeout=0.1) == b"5"
+
+
+def test_stream_latest_delivers_each_entry_to_one_replica(topic):
+    replicas = [RedisBroker(), RedisBroker()]
+    _subscribe(replicas[0], topic)
+    replicas[0].push_many([(topic, b"%d" % i) for i in range(3)])
+
+    first = replicas[0].pop_latest(topic, timeout=0.1, consumer="a")
+    second = replicas[1].pop_latest(topic, timeout=0.1, consumer="b")
+    assert (first, second) == (b"2", None)
+
+
+def test_balanced_is_sequential_within_max_lag(broker, topic):
+    _subscribe(broker, topic)
+    broker.push_many([(topic, b"%d" % i) for i in range(3)])
+
+    assert [broker.pop_balanced(topic, MaxLag(frames=3), timeout=0.1) for _ in range(3)] == [b"0", b"1", b"2"]
+    assert broker.skipped_frames == 0
+
+
+def test_balanced_skips_to_newest_over_frame_lag(broker, topic):
+    _subscribe(broker, topic)
+    broker.push_many([(topic, b"%d" % i) for i in range(10)], {topic: 20})
+
+    assert broker.pop_balanced(topic, MaxLag(frames=3), timeout=0.1) == b"9"
+    assert broker.skipped_frames == 9
+    assert broker.pop_balanced(topic, MaxLag(frames=3), timeout=0.1) is None
+
+
+def test_balanced_skips_old_frames_by_age(broker, topic):
+    _subscribe(broker, topic)
+    broker.push_many([(topic, Frame(frame_id=i, timestamp=time.time(), data=b"x").to_bytes()) for i in range(3)])
+    time.sleep(0.3)
+    broker.push(topic, Frame(frame_id=3, timestamp=time.time(), data=b"x").to_bytes())
+
+    assert Frame.from_bytes(broker.pop_balanced(topic, MaxLag.parse("200ms"), timeout=0.1)).frame_id == 3
+    assert broker.skipped_frames == 3
+
+
+@pytest.mark.parametrize("value, expected", [
+    (10, MaxLag(frames=10)), ("10", MaxLag(frames=10)), ("200ms", MaxLag(ms=200)), ("0.5s", MaxLag(ms=500)),
+    (None, MaxLag(ms=500)),
+])
+def test_max_lag_parse(value, expected):
+    assert MaxLag.parse(value) == expected
+
+
+@pytest.mark.parametrize("value", [0, -1, "fast", "0ms", True])
+def test_max_lag_parse_rejects(value):
+    with pytest.raises(ValueError):
+        MaxLag.parse(value)
+
+
+def test_fan_out_sends_payload_once_to_every_subscriber_list(topic):
+    broker = RedisListBroker()
+    topics = [broker.subscriber_topic(topic, name) for name in ("yolo", "logger")]
+    payload = b"p" * (128 * 1024)
+    before = broker.get_io_stats()["round_trips"]
+    for i in range(3):
+        buffers = [b"%d" % i, payload]
+        broker.push_many([(t, buffers) for t in topics], {topics[0]: 10, topics[1]: 2})
+
+    assert broker.get_io_stats()["round_trips"] == before + 3
+    assert _pop_all(broker, topics[0]) == [b"%d" % i + payload for i in range(3)]
+    assert _pop_all(broker, topics[1]) == [b"%d" % i + payload for i in (1, 2)]
+
+
+def test_queue_stats_match_registry(broker, topic):
+    _subscribe(broker, f"{topic}:a")
+    broker.push_many([(f"{topic}:a", b"%d" % i) for i in range(3)], {f"{topic}:a": 7})
+    broker.trim(f"{topic}:b", 4)
+    redis.Redis().set(f"{topic}:unregistered", b"x")
+
+    stats = {t: s for t, s in broker.get_queue_stats().items() if t.startswith(topic)}
+    assert stats == {f"{topic}:a": {"current": 3, "max": 7}, f"{topic}:b": {"current": 0, "max": 4}}
+
+
+def test_queue_stats_tolerate_other_key_types(topic):
+    broker = RedisListBroker()
+    broker.trim(topic, 5)
+    redis.Redis().set(topic, b"not a list")
+    assert broker.get_queue_stats()[topic] == {"current": 0, "max": 5}
+
+
+def test_queue_stats_are_cached_briefly(topic):
+    broker = RedisListBroker()
+    broker.trim(topic, 5)
+    first = broker.get_queue_stats()
+    calls = broker.get_io_stats()["round_trips"]
+    assert broker.get_queue_stats() is first
+    assert broker.get_io_stats()["round_trips"] == calls
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from edgeflow.nodes.gateway.interfaces import web
+from edgeflow.nodes.gateway.interfaces.web import WebInterface
+
+
+class _Socket:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.messages = []
+        self.closed = False
+
+    async def send_text(self, text):
+        if self.fail:
+            await asyncio.sleep(10)
+        self.messages.append(json.loads(text))
+
+    async def close(self):
+        self.closed = True
+
+
+def _stats(queue_current=1, with_fps=True):
+    stats = {"fps": {"cam": {"total": 30.0}}, "buffers": {},
+             "queues": {"cam:yolo": {"current": queue_current, "max": 100}}, "status": {"cam": {"label": "dog"}}}
+    if not with_fps:
+        stats["fps"] = {}
+    return stats
+
+
+def test_new_clients_get_full_then_deltas():
+    interface = WebInterface()
+    first, second = _Socket(), _Socket()
+
+    async def run():
+        interface._new_websockets.add(first)
+        await interface._send_stats(_stats())
+        interface._new_websockets.add(second)
+        await interface._send_stats(_stats(queue_current=5, with_fps=False))
+        await interface._send_stats(_stats(queue_current=5, with_fps=False))
+
+    asyncio.run(run())
+    assert first.messages == [
+        {"type": "full", **_stats()},
+        {"type": "delta", "queues": {"cam:yolo": {"current": 5, "max": 100}}, "removed": {"fps": ["cam"]}},
+    ]
+    assert second.messages == [{"type": "full", **_stats(queue_current=5, with_fps=False)}]
+
+
+def test_slow_client_is_dropped_without_blocking_others(monkeypatch):
+    monkeypatch.setattr(web, "SEND_TIMEOUT", 0.05)
+    interface = WebInterface()
+    slow, fast = _Socket(fail=True), _Socket()
+
+    async def run():
+        interface._new_websockets.update({slow, fast})
+        await asyncio.wait_for(interface._send_stats(_stats()), 1)
+
+    asyncio.run(run())
+    assert fast.messages == [{"type": "full", **_stats()}]
+    assert slow.closed and slow not in interface._websockets and fast in interface._websockets